@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency for About Me Projects (25-26)
+
+An AIMD (additive increase, multiplicative decrease) window on the number of
+Codio API requests in flight, replacing a fixed max_concurrency guess:
+
+- Every healthy response widens the window by ``increase / window``, i.e. about
+  ``increase`` slots per window's worth of responses
+- Growth pauses while the smoothed latency is above ``latency_tolerance`` times
+  the best latency seen, or while responses are failing
+- A 429 or a timeout multiplies the window by ``decrease``, once per round trip:
+  requests that were already in flight when it shrank do not shrink it again
+- The window stays between ``min`` and ``max``; ``max_concurrency`` is where it starts
+
+Callers hold a slot for each request (``slot()`` in threads, ``slot_async()``
+on an event loop) and mark it throttled or timed out. The live window and
+throughput are available for progress bars, logs and run details.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import tracing
+
+
+DEFAULT_SETTINGS = {
+    'adaptive': True,          # False keeps the window fixed at max_concurrency
+    'min': 1,                  # Smallest window after repeated 429s
+    'max': 32,                 # Largest window (and download worker count)
+    'increase': 1.0,           # Slots added per window's worth of healthy responses
+    'decrease': 0.5,           # Window multiplier on a 429 or timeout
+    'latency_tolerance': 2.0,  # Stop growing above this multiple of the best latency
+    'retry_workers': 2         # Concurrency for the final pass over failed students
+}
+
+# Seconds of completions used for the live throughput figure
+THROUGHPUT_WINDOW = 10.0
+
+OUTCOMES = ['ok', 'error', 'throttled', 'timeout']
+
+
+class AdaptiveLimiter:
+    """AIMD window on concurrent requests, shared by every worker in a download"""
+    
+    def __init__(self, initial: int, settings: Optional[Dict] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.logger = logger or logging.getLogger('codio_downloader.concurrency')
+        if self.settings['adaptive']:
+            self.minimum = max(1, int(self.settings['min']))
+            self.maximum = max(self.minimum, int(self.settings['max']))
+        else:
+            self.minimum = self.maximum = max(1, int(initial))
+        self.window = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        
+        # Guards all of the state below, for threads and coroutines alike
+        self._cond = threading.Condition()
+        self._async_cond: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._latency: Optional[float] = None   # Smoothed latency of healthy responses
+        self._baseline: Optional[float] = None  # Best smoothed latency, drifting up slowly
+        self._last_decrease = 0.0
+        self._recent = deque()                  # Completion times for the live throughput
+        self._started = time.monotonic()
+        self._counts = {outcome: 0 for outcome in OUTCOMES}
+        self._decreases = 0
+        self._peak = self.window
+        self._window_total = 0.0                # Sum of the window at each completion
+    
+    @property
+    def limit(self) -> int:
+        """Requests allowed in flight right now"""
+        return max(self.minimum, int(self.window))
+    
+    def _try_acquire(self) -> bool:
+        """Take a place in the window if there is room (caller holds _cond)"""
+        if self.in_flight >= self.limit:
+            return False
+        self.in_flight += 1
+        return True
+    
+    def _try_acquire_locked(self) -> bool:
+        with self._cond:
+            return self._try_acquire()
+    
+    def _async_condition(self) -> asyncio.Condition:
+        """Condition that coroutines on the running event loop wait on"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._async_cond = asyncio.Condition()
+        return self._async_cond
+    
+    async def _notify_async(self) -> None:
+        async with self._async_cond:
+            self._async_cond.notify_all()
+    
+    def _wake_async_waiters(self) -> None:
+        """Let coroutines waiting in slot_async() re-check a window changed from a thread"""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            loop.create_task(self._notify_async())
+        else:
+            asyncio.run_coroutine_threadsafe(self._notify_async(), loop)
+    
+    def _release(self, started: float, outcome: str) -> None:
+        now = time.monotonic()
+        self.in_flight -= 1
+        self._counts[outcome] += 1
+        self._window_total += self.window
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - THROUGHPUT_WINDOW:
+            self._recent.popleft()
+        
+        before = self.limit
+        if outcome in ('throttled', 'timeout'):
+            # Only requests sent after the last cut may cut again
+            if started >= self._last_decrease:
+                self.window = max(self.minimum, self.window * self.settings['decrease'])
+                self._last_decrease = now
+                self._decreases += 1
+                reason = 'a 429' if outcome == 'throttled' else 'a timeout'
+                self.logger.info(f"Concurrency window {before} -> {self.limit} after {reason}")
+        elif outcome == 'ok':
+            latency = now - started
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            if self._baseline is None or self._latency < self._baseline:
+                self._baseline = self._latency
+            else:
+                # Let a server that is simply slower today become the new normal
+                self._baseline += (self._latency - self._baseline) * 0.01
+            if self._latency <= self._baseline * self.settings['latency_tolerance']:
+                self.window = min(self.maximum, self.window + self.settings['increase'] / self.window)
+        
+        self._peak = max(self._peak, self.window)
+        if self.limit != before:
+            tracing.counter('concurrency.window', window=self.limit)
+    
+    @contextmanager
+    def slot(self) -> Iterator[Dict]:
+        """Hold one place in the window; set the yielded dict's outcome to 'throttled' or 'timeout'"""
+        with self._cond:
+            while not self._try_acquire():
+                self._cond.wait()
+        result = {'outcome': 'ok'}
+        started = time.monotonic()
+        try:
+            yield result
+        except BaseException:
+            if result['outcome'] == 'ok':
+                result['outcome'] = 'error'
+            raise
+        finally:
+            with self._cond:
+                self._release(started, result['outcome'])
+                self._cond.notify_all()
+            self._wake_async_waiters()
+    
+    @asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[Dict]:
+        """slot() for coroutines on an event loop
+        
+        Coroutines wait on an asyncio.Condition, but the window itself is only
+        read and changed under the same lock the threaded slot() takes.
+        """
+        condition = self._async_condition()
+        async with condition:
+            await condition.wait_for(self._try_acquire_locked)
+        result = {'outcome': 'ok'}
+        started = time.monotonic()
+        try:
+            yield result
+        except BaseException:
+            if result['outcome'] == 'ok':
+                result['outcome'] = 'error'
+            raise
+        finally:
+            with self._cond:
+                self._release(started, result['outcome'])
+                self._cond.notify_all()
+            async with condition:
+                condition.notify_all()
+    
+    def resize(self, maximum: int) -> None:
+        """Cap the window (e.g. for the retry pass over failed students)"""
+        with self._cond:
+            self.maximum = max(1, maximum)
+            self.minimum = min(self.minimum, self.maximum)
+            self.window = min(self.window, float(self.maximum))
+            self._cond.notify_all()
+        self._wake_async_waiters()
+    
+    def throughput(self) -> float:
+        """Requests completed per second over the last few seconds"""
+        with self._cond:
+            now = time.monotonic()
+            while self._recent and self._recent[0] < now - THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            if not self._recent:
+                return 0.0
+            span = min(THROUGHPUT_WINDOW, now - self._started)
+            return len(self._recent) / span if span > 0 else 0.0
+    
+    def postfix(self) -> str:
+        """Live window and throughput for a progress bar"""
+        return f"window={self.limit} api={self.throughput():.1f}/s"
+    
+    def stats(self) -> Dict:
+        """Window and outcome counts for the run details"""
+        with self._cond:
+            requests = sum(self._counts.values())
+            elapsed = time.monotonic() - self._started
+            return {
+                'window': self.limit,
+                'peak_window': int(self._peak),
+                'mean_window': round(self._window_total / requests, 1) if requests else self.limit,
+                'min': self.minimum,
+                'max': self.maximum,
+                'requests': requests,
+                **self._counts,
+                'decreases': self._decreases,
+                'latency_ms': round(self._latency * 1000, 1) if self._latency is not None else None,
+                'baseline_ms': round(self._baseline * 1000, 1) if self._baseline is not None else None,
+                'requests_per_second': round(requests / elapsed, 2) if elapsed > 0 else 0.0
+            }
+    
+    def summary(self) -> str:
+        """One-line description of where the window settled"""
+        stats = self.stats()
+        return (f"window {stats['window']} (peak {stats['peak_window']}, mean {stats['mean_window']}), "
+                f"{stats['requests']} API requests at {stats['requests_per_second']}/s, "
+                f"{stats['throttled']} throttled, {stats['timeout']} timed out, {stats['decreases']} cuts")
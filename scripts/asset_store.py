@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Asset Store for About Me Projects (25-26)
+
+Most student projects ship byte-identical starter files (template.html,
+styles.css) and often the same downloaded images. Files are stored once under
+cache/objects keyed by their SHA-256, and student trees in build/ and site/ are
+materialized as hard links (or reflinks/copies where links are not possible).
+
+Because materialized files share an inode with the stored object, later stages
+must replace files (write a temp file + os.replace) rather than edit them in place.
+For the same reason every object carries the fixed mtime OBJECT_MTIME rather than
+the time of whichever archive stored it first.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Tuple
+
+try:
+    import fcntl  # Linux reflinks (FICLONE)
+except ImportError:
+    fcntl = None
+
+
+# ioctl request number for FICLONE on Linux (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+COPY_CHUNK = 1024 * 1024
+
+# mtime of every stored object (1980-01-01, the earliest a zip entry can carry)
+OBJECT_MTIME = 315532800
+
+
+def _reflink(src: Path, dest: Path) -> bool:
+    """Try a copy-on-write clone of src to dest; False if unsupported"""
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open(src, 'rb') as s, open(dest, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if dest.exists():
+            dest.unlink()
+        return False
+
+
+def link_or_copy(src, dest) -> str:
+    """Materialize src at dest as a hard link, else a reflink, else a copy
+    
+    Signature matches shutil.copytree's copy_function. Returns dest.
+    """
+    src, dest = Path(src), Path(dest)
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        # Cross-device or links unsupported
+        if not _reflink(src, dest):
+            shutil.copy2(src, dest)
+    return str(dest)
+
+
+def dedup_report(roots: Iterable[Path]) -> Dict:
+    """Logical vs on-disk bytes for the files under roots (hard links counted once)"""
+    logical_bytes = 0
+    physical_bytes = 0
+    files = 0
+    seen = set()
+    
+    for root in roots:
+        if not root.exists():
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                st = os.lstat(os.path.join(dirpath, filename))
+                files += 1
+                logical_bytes += st.st_size
+                if (st.st_dev, st.st_ino) not in seen:
+                    seen.add((st.st_dev, st.st_ino))
+                    physical_bytes += st.st_size
+    
+    return {
+        'files': files,
+        'unique_files': len(seen),
+        'logical_bytes': logical_bytes,
+        'physical_bytes': physical_bytes,
+        'saved_bytes': logical_bytes - physical_bytes
+    }
+
+
+class AssetStore:
+    """Content-addressed store of project files keyed by SHA-256"""
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.logger = logging.getLogger('asset_store')
+        
+        self._lock = threading.Lock()
+        self.stats = {'files': 0, 'bytes': 0, 'new_objects': 0, 'new_bytes': 0}
+        # (st_dev, st_ino) of every object stored or reused by this process -> its digest,
+        # so an inventory can recognize hard-linked files without reading them again
+        self.digests: Dict[Tuple[int, int], str] = {}
+    
+    def object_path(self, digest: str) -> Path:
+        """Location of an object in the store"""
+        return self.root / digest[:2] / digest[2:]
+    
+    def add_stream(self, stream: BinaryIO, dest: Path) -> str:
+        """Store the bytes of stream and materialize them at dest; returns the digest"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        
+        tmp_path = self.root / f".tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            for chunk in iter(lambda: stream.read(COPY_CHUNK), b''):
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        
+        hexdigest = digest.hexdigest()
+        self._commit(tmp_path, hexdigest, size)
+        
+        obj = self.object_path(hexdigest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        link_or_copy(obj, dest)
+        # Keyed on the object's inode: a copy made instead of a link is simply hashed again
+        st = obj.stat()
+        self.digests[(st.st_dev, st.st_ino)] = hexdigest
+        return hexdigest
+    
+    def _commit(self, tmp_path: Path, digest: str, size: int):
+        """Move a hashed temp file into the store unless the object already exists"""
+        obj = self.object_path(digest)
+        with self._lock:
+            self.stats['files'] += 1
+            self.stats['bytes'] += size
+            if obj.exists():
+                tmp_path.unlink()
+                return
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            os.utime(tmp_path, (OBJECT_MTIME, OBJECT_MTIME))
+            os.replace(tmp_path, obj)
+            self.stats['new_objects'] += 1
+            self.stats['new_bytes'] += size
+    
+    def prune(self) -> Tuple[int, int]:
+        """Delete objects nothing links to any more; returns (objects, bytes) removed
+        
+        Once every build/ and site/ file sharing an object is gone, the store holds
+        its only link. Content that was materialized as a copy is pruned too; it is
+        simply stored again if it comes back.
+        """
+        removed = freed = 0
+        if not self.root.is_dir():
+            return removed, freed
+        with self._lock:
+            for shard in os.scandir(self.root):
+                if not shard.is_dir(follow_symlinks=False):
+                    continue
+                for obj in os.scandir(shard.path):
+                    st = obj.stat(follow_symlinks=False)
+                    if st.st_nlink == 1:
+                        os.unlink(obj.path)
+                        # The inode number may be reused by an unrelated file
+                        self.digests.pop((st.st_dev, st.st_ino), None)
+                        removed += 1
+                        freed += st.st_size
+        return removed, freed
+    
+    def summary(self) -> str:
+        """One-line description of dedup achieved by add_stream calls so far"""
+        saved = self.stats['bytes'] - self.stats['new_bytes']
+        return (f"{self.stats['files']} files, {self.stats['new_objects']} new objects, "
+                f"{saved / 1024 / 1024:.1f} MB deduplicated")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark for About Me Projects (25-26)
+
+Runs download, build and local validation against scripts/fake_codio_server.py
+for rosters of increasing size and reports, for each size:
+- Students per minute and MB per second during download
+- API calls per student (and how many were rate limited)
+- Where the adaptive concurrency window peaked and averaged
+- Build and validation times
+
+Each run gets a fresh scratch project (config, build/, site/) and its own
+server process, and every stage runs as its own publish_about_me.py process,
+exactly like a real run.
+
+Usage:
+    python scripts/benchmark.py --students 30 300 3000
+    python scripts/benchmark.py --students 300 --mode async --latency 0.05 --rate-limit 50/10
+    python scripts/benchmark.py --students 300 --max-in-flight 12 [--fixed]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.request import urlopen
+
+import yaml
+
+from publish_about_me import DOWNLOAD_MODES
+from state_store import StateStore
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPTS_DIR.parent
+
+
+def start_fake_server(args: argparse.Namespace, students: int) -> Tuple[subprocess.Popen, Dict]:
+    """Launch the fake Codio server on a free port; returns the process and its ready message"""
+    cmd = [
+        sys.executable, str(SCRIPTS_DIR / 'fake_codio_server.py'), '--port', '0',
+        '--students', str(students), '--sections', str(args.sections),
+        '--project-kb', str(args.project_kb), '--latency', str(args.latency),
+        '--p429', str(args.p429), '--p401', str(args.p401),
+        '--rate-limit', args.rate_limit, '--export-polls', str(args.export_polls),
+        '--p-drop', str(args.p_drop), '--max-in-flight', str(args.max_in_flight)
+    ]
+    if args.bandwidth_kbps:
+        cmd += ['--bandwidth-kbps', str(args.bandwidth_kbps)]
+    server = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    for line in server.stdout:
+        if line.startswith('{'):
+            return server, json.loads(line)
+    raise RuntimeError("Fake Codio server exited before it was ready")
+
+
+def write_config(workdir: Path, courses: List[str], args: argparse.Namespace) -> Path:
+    """Scratch project layout: <workdir>/config/benchmark.yaml and templates/"""
+    (workdir / 'config').mkdir(parents=True)
+    shutil.copytree(PROJECT_ROOT / 'templates', workdir / 'templates')
+    config = {
+        'school_year': 'bench',
+        'site_title': 'Benchmark',
+        'assignment_name': 'About Me',
+        'sections': {f"S{index + 1}": course_id for index, course_id in enumerate(courses)},
+        'github': {'owner': 'benchmark', 'repo': 'benchmark', 'branch': 'gh-pages'},
+        'max_concurrency': args.concurrency,
+        'concurrency': {'adaptive': not args.fixed},
+        'download_mode': args.mode
+    }
+    config_path = workdir / 'config' / 'benchmark.yaml'
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return config_path
+
+
+def run_stage(config_path: Path, env: Dict[str, str], *command: str) -> float:
+    """Run one publish_about_me.py command; returns its wall time"""
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / 'publish_about_me.py'), '--config', str(config_path), *command],
+        env=env, capture_output=True, text=True
+    )
+    elapsed = time.time() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"'{' '.join(command)}' failed:\n{result.stderr[-2000:]}")
+    return elapsed
+
+
+def benchmark(students: int, args: argparse.Namespace) -> Dict:
+    """Download, build and validate one synthetic roster"""
+    workdir = Path(tempfile.mkdtemp(prefix=f"about-me-bench-{students}-", dir=args.workdir))
+    server, ready = start_fake_server(args, students)
+    try:
+        config_path = write_config(workdir, ready['courses'], args)
+        env = {
+            **os.environ,
+            'CODIO_API_BASE_URL': f"{ready['ready']}/api/v1",
+            'CODIO_OAUTH_URL': f"{ready['ready']}/oauth/token",
+            'CODIO_CLIENT_ID': 'benchmark',
+            'CODIO_CLIENT_SECRET': 'benchmark',
+            'CODIO_RATE_LIMIT_STATE': str(workdir / 'rate_limit.json'),
+            'CODIO_BURST_RATE_LIMIT': str(args.client_burst),
+            'CODIO_DAILY_LIMIT': str(10 ** 9)  # a benchmark should not trip the daily budget
+        }
+        
+        download_s = run_stage(config_path, env, 'download')
+        with urlopen(f"{ready['ready']}/_stats") as response:
+            stats = json.load(response)
+        store = StateStore(workdir / 'state' / 'about_me.db', logging.getLogger('benchmark'))
+        window = store.last_run('download')['details'].get('concurrency', {})
+        store.close()
+        build_s = run_stage(config_path, env, 'build')
+        validate_s = run_stage(config_path, env, '--local', 'validate')
+        
+        with open(workdir / 'build' / 'manifest.json') as f:
+            manifest = json.load(f)
+        failed = sum(1 for student in manifest if 'errors' in student)
+    finally:
+        server.terminate()
+        server.wait()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    
+    return {
+        'students': students,
+        'mode': args.mode,
+        'failed': failed,
+        'download_s': round(download_s, 2),
+        'students_per_min': round(students / download_s * 60, 1),
+        'mb_per_s': round(stats['bytes_sent'] / download_s / 1024 / 1024, 2),
+        'api_calls_per_student': round(stats['api_calls'] / students, 2),
+        'rate_limited': stats['rate_limited'],
+        'peak_window': window.get('peak_window'),
+        'mean_window': window.get('mean_window'),
+        'unauthorized': stats['unauthorized'],
+        'build_s': round(build_s, 2),
+        'validate_s': round(validate_s, 2),
+        'workdir': str(workdir) if args.keep else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the About Me pipeline against a fake Codio')
+    parser.add_argument('--students', type=int, nargs='+', default=[30, 300, 3000],
+                        help='Roster sizes to run (default: 30 300 3000)')
+    parser.add_argument('--sections', type=int, default=4)
+    parser.add_argument('--project-kb', type=int, default=100, help='Approximate size of each project')
+    parser.add_argument('--mode', choices=DOWNLOAD_MODES, default='threaded', help='download_mode to test')
+    parser.add_argument('--concurrency', type=int, default=8, help='max_concurrency (starting window) for the run')
+    parser.add_argument('--fixed', action='store_true', help='Keep the window at --concurrency instead of adapting')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds the server adds to each API call')
+    parser.add_argument('--p429', type=float, default=0.0, help='Probability of a random 429')
+    parser.add_argument('--p401', type=float, default=0.0, help='Probability of a random 401')
+    parser.add_argument('--bandwidth-kbps', type=int, help='Throttle each archive download (KB/s)')
+    parser.add_argument('--p-drop', type=float, default=0.0, help='Probability of cutting a download off halfway')
+    parser.add_argument('--rate-limit', default='none', metavar='BURST/SECONDS',
+                        help="Server-enforced burst limit, e.g. 50/10 like Codio (default none)")
+    parser.add_argument('--max-in-flight', type=int, default=0,
+                        help='Server answers API calls beyond this many at once with a 429 (default no limit)')
+    parser.add_argument('--client-burst', type=int, default=1000,
+                        help="Client burst budget per 10s (50 = Codio's real limit)")
+    parser.add_argument('--export-polls', type=int, default=2, help='Polls before an export is done')
+    parser.add_argument('--workdir', type=Path, help='Where to create scratch projects (default: system temp)')
+    parser.add_argument('--keep', action='store_true', help='Keep scratch projects for inspection')
+    parser.add_argument('--output', type=Path, help='Also write the results as JSON')
+    args = parser.parse_args()
+    
+    results = []
+    header = (f"{'students':>8}  {'download':>9}  {'stu/min':>8}  {'MB/s':>6}  {'calls/stu':>9}  "
+              f"{'429s':>5}  {'window':>9}  {'failed':>6}  {'build':>7}  {'validate':>8}")
+    print(header)
+    for students in args.students:
+        result = benchmark(students, args)
+        results.append(result)
+        print(f"{result['students']:>8}  {result['download_s']:>8.1f}s  {result['students_per_min']:>8.0f}  "
+              f"{result['mb_per_s']:>6.1f}  {result['api_calls_per_student']:>9.2f}  "
+              f"{result['rate_limited']:>5}  {result['peak_window']!s:>4}/{result['mean_window']!s:<4}  "
+              f"{result['failed']:>6}  {result['build_s']:>6.1f}s  "
+              f"{result['validate_s']:>7.1f}s", flush=True)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
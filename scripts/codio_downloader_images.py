@@ -11,29 +11,50 @@ Based on the original codio-downloader.py but modified to:
 This version is specifically designed for web projects where images and assets are critical.
 """
 
+import asyncio
+import bisect
+import fnmatch
+import heapq
+import io
 import json
 import logging
 import os
+import posixpath
 import re
 import shutil
-import subprocess
 import sys
 import tarfile
+import threading
 import time
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from urllib.parse import urlencode
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
 
 try:
     import requests
-    from dotenv import load_dotenv
+    import zstandard
     from tenacity import retry, stop_after_attempt, wait_exponential
 except ImportError as e:
     print(f"Error: Missing required library: {e}")
-    print("Install with: pip install requests python-dotenv tenacity")
+    print("Install with: pip install requests tenacity zstandard")
     sys.exit(1)
 
+import tracing
+from adaptive_concurrency import AdaptiveLimiter
+from asset_store import AssetStore, link_or_copy
+from http_transport import HTTPTransport
+
+try:
+    import fcntl  # POSIX file locking for the shared rate limit state
+except ImportError:
+    fcntl = None
+
+try:
+    import aiohttp  # Only needed for AsyncCodioAPI
+except ImportError:
+    aiohttp = None
+
 
 # ============================================================================
 # Configuration and Logging
@@ -42,13 +63,14 @@ except ImportError as e:
 class Config:
     """Global configuration"""
     CODIO_DOMAIN = "codio.com"
-    API_BASE_URL = f"https://octopus.{CODIO_DOMAIN}/api/v1"
-    OAUTH_URL = f"https://oauth.{CODIO_DOMAIN}/api/v1/token"
+    # Overridable so the pipeline can run against a local stand-in (scripts/fake_codio_server.py)
+    API_BASE_URL = os.getenv('CODIO_API_BASE_URL', f"https://octopus.{CODIO_DOMAIN}/api/v1")
+    OAUTH_URL = os.getenv('CODIO_OAUTH_URL', f"https://oauth.{CODIO_DOMAIN}/api/v1/token")
     
     # Rate limits from Codio API docs
-    BURST_RATE_LIMIT = 50  # requests per 10 seconds
+    BURST_RATE_LIMIT = int(os.getenv('CODIO_BURST_RATE_LIMIT', 50))  # requests per 10 seconds
     BURST_WINDOW = 10  # seconds
-    DAILY_LIMIT = 10000  # requests per day
+    DAILY_LIMIT = int(os.getenv('CODIO_DAILY_LIMIT', 10000))  # requests per day
     
     # Retry configuration
     MAX_RETRIES = 5
@@ -56,6 +78,15 @@ class Config:
     
     # Token expiry buffer (refresh 5 minutes before actual expiry)
     TOKEN_EXPIRY_BUFFER = 300  # seconds
+    
+    # Connections per host when the caller does not share its own transport
+    HTTP_POOL_SIZE = 8
+    
+    # Shared request-budget state (per user, so every config/run draws on one budget)
+    RATE_LIMIT_STATE = Path(os.getenv(
+        'CODIO_RATE_LIMIT_STATE',
+        Path.home() / '.cache' / 'codio_downloader' / 'rate_limit.json'
+    ))
 
 
 # ============================================================================
@@ -63,64 +94,157 @@ class Config:
 # ============================================================================
 
 class RateLimiter:
-    """Token bucket rate limiter for Codio API"""
+    """Token bucket rate limiter for Codio API
+    
+    Thread-safe. With a ``state_path`` the burst window, daily count and any
+    429 back-off are kept in a small JSON file guarded by an exclusive file lock,
+    so consecutive runs and concurrent processes draw on one shared budget.
+    """
     
     def __init__(self, burst_limit: int = Config.BURST_RATE_LIMIT, 
                  window: int = Config.BURST_WINDOW,
-                 daily_limit: int = Config.DAILY_LIMIT):
+                 daily_limit: int = Config.DAILY_LIMIT,
+                 state_path: Optional[Path] = None):
         self.burst_limit = burst_limit
         self.window = window
         self.daily_limit = daily_limit
+        self.state_path = state_path
         
-        self.request_times = deque()
+        self.request_times: List[float] = []  # sorted request slots, may include future reservations
         self.daily_count = 0
         self.daily_reset_time = time.time() + 86400  # 24 hours from now
+        self.blocked_until = 0.0  # set from Retry-After on 429
         
+        self._lock = threading.Lock()
         self.logger = logging.getLogger('codio_downloader.rate_limiter')
     
-    def wait_if_needed(self):
-        """Block if rate limit would be exceeded"""
+    @contextmanager
+    def _shared_state(self):
+        """Hold the thread lock (and file lock) with state refreshed from disk"""
+        with self._lock:
+            if self.state_path is None:
+                yield
+                return
+            
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path.with_suffix('.lock'), 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load_state()
+                    yield
+                    self._save_state()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _load_state(self):
+        """Read shared accounting written by this or another process"""
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self.request_times = sorted(state.get('request_times', []))
+            self.daily_count = state.get('daily_count', 0)
+            self.daily_reset_time = state.get('daily_reset_time', self.daily_reset_time)
+            self.blocked_until = state.get('blocked_until', 0.0)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable rate limit state {self.state_path}: {e}")
+    
+    def _save_state(self):
+        """Atomically write shared accounting back to disk"""
+        state = {
+            'request_times': self.request_times,
+            'daily_count': self.daily_count,
+            'daily_reset_time': self.daily_reset_time,
+            'blocked_until': self.blocked_until
+        }
+        tmp_path = self.state_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+    
+    def block_for(self, seconds: float):
+        """Hold back every client sharing this budget (e.g. after a 429 Retry-After)"""
+        with self._shared_state():
+            self.blocked_until = max(self.blocked_until, time.time() + seconds)
+    
+    def reserve(self) -> float:
+        """Claim the next request slot and return how long to wait before using it
+        
+        Reserving without sleeping lets both the blocking and the asyncio clients
+        share one limiter: each caller sleeps in its own way.
+        """
+        with self._shared_state():
+            return self._reserve_locked()
+    
+    def _reserve_locked(self) -> float:
         now = time.time()
+        delay = max(0.0, self.blocked_until - now)
         
-        # Reset daily counter if needed
+        # Move on to the next day's quota; reservations already pushed into it stay counted
         if now >= self.daily_reset_time:
-            self.daily_count = 0
-            self.daily_reset_time = now + 86400
+            while now >= self.daily_reset_time:
+                self.daily_count = max(0, self.daily_count - self.daily_limit)
+                self.daily_reset_time += 86400
             self.logger.info("Daily rate limit counter reset")
         
-        # Check daily limit
-        if self.daily_count >= self.daily_limit:
-            wait_time = self.daily_reset_time - now
-            self.logger.warning(
-                f"Daily limit ({self.daily_limit}) reached. "
-                f"Waiting {wait_time:.0f}s until reset."
-            )
-            time.sleep(wait_time)
-            self.daily_count = 0
-            self.daily_reset_time = time.time() + 86400
+        # Check daily limit: once today's quota is used up, every reservation takes a
+        # slot in a later day's quota (the count is only cleared when that day arrives)
+        days_ahead = self.daily_count // self.daily_limit
+        if days_ahead:
+            delay = max(delay, self.daily_reset_time + (days_ahead - 1) * 86400 - now)
+            if self.daily_count == self.daily_limit:
+                self.logger.warning(
+                    f"Daily limit ({self.daily_limit}) reached. "
+                    f"Waiting {delay:.0f}s until reset."
+                )
         
         # Remove old requests outside the window
         cutoff = now - self.window
-        while self.request_times and self.request_times[0] < cutoff:
-            self.request_times.popleft()
+        del self.request_times[:bisect.bisect_left(self.request_times, cutoff)]
         
-        # Check burst limit
+        # Check burst limit: the slot opens once the request `burst_limit` back leaves the window
+        slot = now + delay
         if len(self.request_times) >= self.burst_limit:
-            wait_time = self.request_times[0] + self.window - now
-            if wait_time > 0:
-                self.logger.debug(
-                    f"Burst limit reached. Waiting {wait_time:.2f}s"
-                )
-                time.sleep(wait_time + 0.1)  # Add small buffer
-                # Clean up old requests again after waiting
-                now = time.time()
-                cutoff = now - self.window
-                while self.request_times and self.request_times[0] < cutoff:
-                    self.request_times.popleft()
+            slot = max(slot, self.request_times[-self.burst_limit] + self.window + 0.1)
+            self.logger.debug(f"Burst limit reached. Waiting {slot - now:.2f}s")
         
         # Record this request
-        self.request_times.append(time.time())
+        bisect.insort(self.request_times, slot)
         self.daily_count += 1
+        return slot - now
+    
+    def wait_if_needed(self):
+        """Block if rate limit would be exceeded"""
+        delay = self.reserve()
+        if delay > 0:
+            tracing.add_sleep('rate_limiter', delay)
+            time.sleep(delay)
+
+
+class AsyncRateLimiter:
+    """Awaitable rate limiter shared by every coroutine of an AsyncCodioAPI
+    
+    The wrapped RateLimiter takes a thread lock and, with a state file, a file
+    lock and JSON I/O, so its calls run in a worker thread rather than on the
+    event loop.
+    """
+    
+    def __init__(self, limiter: Optional[RateLimiter] = None):
+        self.limiter = limiter or RateLimiter(state_path=Config.RATE_LIMIT_STATE)
+    
+    async def block_for(self, seconds: float):
+        """Hold back every client sharing this budget (e.g. after a 429 Retry-After)"""
+        await asyncio.to_thread(self.limiter.block_for, seconds)
+    
+    async def wait_if_needed(self):
+        """Sleep without blocking the event loop if rate limit would be exceeded"""
+        delay = await asyncio.to_thread(self.limiter.reserve)
+        if delay > 0:
+            tracing.add_sleep('rate_limiter', delay)
+            await asyncio.sleep(delay)
 
 
 # ============================================================================
@@ -130,7 +254,12 @@ class RateLimiter:
 class CodioAPI:
     """Client for Codio REST API - Modified to include all files"""
     
-    def __init__(self, client_id: str, client_secret: str, dry_run: bool = False):
+    def __init__(self, client_id: str, client_secret: str, dry_run: bool = False,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 exclude_globs: Optional[List[str]] = None,
+                 asset_store: Optional[AssetStore] = None,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.dry_run = dry_run
@@ -138,8 +267,13 @@ class CodioAPI:
         self.access_token: Optional[str] = None
         self.token_expiry: float = 0
         
-        self.session = requests.Session()
-        self.rate_limiter = RateLimiter()
+        # API calls and archive downloads share one pool of keep-alive connections
+        self.transport = transport or HTTPTransport(Config.HTTP_POOL_SIZE)
+        # Bounds API requests in flight; fixed at the pool size unless the caller passes an adaptive one
+        self.limiter = limiter or AdaptiveLimiter(Config.HTTP_POOL_SIZE, {'adaptive': False})
+        self.rate_limiter = rate_limiter or RateLimiter(state_path=Config.RATE_LIMIT_STATE)
+        self.extractor = ArchiveExtractor(dry_run, exclude_globs, asset_store,
+                                          read_size=self.transport.read_size)
         self.logger = logging.getLogger('codio_downloader.api')
         
         if not dry_run:
@@ -161,7 +295,7 @@ class CodioAPI:
         }
         
         try:
-            response = self.session.get(
+            response = self.transport.get(
                 Config.OAUTH_URL,
                 params=params,
                 timeout=30
@@ -199,36 +333,22 @@ class CodioAPI:
         url = f"{Config.API_BASE_URL}/{path.lstrip('/')}"
         headers = {'Authorization': f'Bearer {self.access_token}'}
         
-        response = self.session.request(
-            method,
-            url,
-            params=params,
-            json=json_data,
-            headers=headers,
-            stream=stream,
-            timeout=120 if not stream else None
-        )
+        response = self._send(method, url, path, params, json_data, headers, stream)
         
         # Handle 401 (refresh token and retry will be handled by tenacity)
         if response.status_code == 401:
             self.logger.warning("Got 401, refreshing token")
             self.authenticate()
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.request(
-                method,
-                url,
-                params=params,
-                json=json_data,
-                headers=headers,
-                stream=stream,
-                timeout=120 if not stream else None
-            )
+            response = self._send(method, url, path, params, json_data, headers, stream)
         
         # Handle 429 (rate limit)
         if response.status_code == 429:
             retry_after = int(response.headers.get('Retry-After', 10))
             self.logger.warning(f"Rate limited, waiting {retry_after}s")
-            time.sleep(retry_after)
+            # Every thread (and process) sharing the budget waits this out in wait_if_needed;
+            # _send has already narrowed the concurrency window
+            self.rate_limiter.block_for(retry_after)
             raise requests.exceptions.RequestException("Rate limited, retrying")
         
         response.raise_for_status()
@@ -238,6 +358,30 @@ class CodioAPI:
         else:
             return response.json() if response.content else {}
     
+    def _send(self, method: str, url: str, path: str, params: Optional[Dict], json_data: Optional[Dict],
+              headers: Dict, stream: bool) -> requests.Response:
+        """Send one request inside the concurrency window, reporting 429s and timeouts to it"""
+        with self.limiter.slot() as slot, tracing.span('api.request', 'api', method=method, path=path) as span:
+            try:
+                response = self.transport.request(
+                    method,
+                    url,
+                    params=params,
+                    json=json_data,
+                    headers=headers,
+                    stream=stream,
+                    timeout=120 if not stream else None
+                )
+            except requests.exceptions.Timeout:
+                slot['outcome'] = 'timeout'
+                raise
+            span['status'] = response.status_code
+            if response.status_code == 429:
+                slot['outcome'] = 'throttled'
+            elif response.status_code >= 500:
+                slot['outcome'] = 'error'
+        return response
+    
     def get_course(self, course_id: str) -> Dict:
         """Get course information including assignments"""
         self.logger.info(f"Fetching course info for {course_id}")
@@ -249,22 +393,61 @@ class CodioAPI:
         self.logger.info(f"Fetching students for course {course_id}")
         return self.request('GET', f'/courses/{course_id}/students')
     
-    def export_student_assignment(self, course_id: str, assignment_id: str, 
-                                 student_id: str) -> str:
-        """Export student assignment (returns download URL after polling)"""
+    def get_assignment_progress(self, course_id: str, assignment_id: str) -> List[Dict]:
+        """Get per-student progress (including modification metadata) for an assignment"""
+        self.logger.info(f"Fetching progress for assignment {assignment_id} in course {course_id}")
+        return self.request('GET', f'/courses/{course_id}/assignments/{assignment_id}/students')
+    
+    def start_student_export(self, course_id: str, assignment_id: str, student_id: str) -> str:
+        """Start an export of a student's assignment and return its taskUri"""
         self.logger.debug(
             f"Exporting assignment {assignment_id} for student {student_id}"
         )
         
-        # Initiate export
+        with tracing.span('export.start', 'student', student_id=student_id):
+            result = self.request(
+                'GET',
+                f'/courses/{course_id}/assignments/{assignment_id}/students/{student_id}/download'
+            )
+        
+        task_uri = result.get('taskUri')
+        if not task_uri:
+            raise ValueError("No taskUri in export response")
+        return task_uri
+    
+    def export_assignment(self, course_id: str, assignment_id: str) -> str:
+        """Export an assignment for every student in the course (returns download URL after polling)"""
+        self.logger.debug(f"Bulk exporting assignment {assignment_id} in course {course_id}")
+        
         result = self.request(
             'GET',
-            f'/courses/{course_id}/assignments/{assignment_id}/students/{student_id}/download'
+            f'/courses/{course_id}/assignments/{assignment_id}/download'
         )
         
         task_uri = result.get('taskUri')
         if not task_uri:
-            raise ValueError("No taskUri in export response")
+            raise ValueError("No taskUri in bulk export response")
+        
+        # Whole-course exports take longer than a single project
+        return self._wait_download_task(task_uri, max_wait=900)
+    
+    def poll_download_task(self, task_uri: str) -> Optional[str]:
+        """Check an export task once: download URL when done, None while still running"""
+        with tracing.span('export.poll', 'student') as span:
+            result = self.request('GET', task_uri.replace(Config.API_BASE_URL + '/', ''))
+            span['done'] = bool(result.get('done'))
+        
+        if result.get('done'):
+            if result.get('error'):
+                raise RuntimeError(f"Export task failed: {result['error']}")
+            return result['url']
+        return None
+    
+    def export_student_assignment(self, course_id: str, assignment_id: str, 
+                                 student_id: str) -> str:
+        """Export student assignment (returns download URL after polling)"""
+        # Initiate export
+        task_uri = self.start_student_export(course_id, assignment_id, student_id)
         
         # Poll until ready
         return self._wait_download_task(task_uri)
@@ -274,135 +457,658 @@ class CodioAPI:
         """Download and extract student assignment to directory"""
         # Get download URL
         url = self.export_student_assignment(course_id, assignment_id, student_id)
+        self.download_export(url, dest_path)
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    def download_export(self, url: str, dest_path: Path, spool: Optional[Path] = None,
+                        on_downloaded: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+        """Stream a finished export straight into the extractor
         
-        # Download to temporary file
-        temp_file = dest_path.with_suffix('.zst')
-        self._download_file(url, temp_file)
+        With a ``spool`` the archive is also kept on disk as it arrives, and a
+        partial spool from an interrupted attempt is continued with a Range request.
+        Returns the archive's newest member mtimes (see ArchiveExtractor.extract_stream).
+        """
+        self.logger.debug(f"Streaming {url} into {dest_path}")
         
-        # Extract to final destination
-        self._extract_assignment(temp_file, dest_path)
+        offset = spool_offset(spool)
+        # Direct download (not through API, no auth needed), over the shared keep-alive pool
+        with self.transport.get(url, stream=True, timeout=300, headers=range_headers(spool, offset)) as response:
+            if offset and response.status_code == 416:
+                # The spool already holds the whole archive
+                stream = SpooledStream(spool, None, offset, on_downloaded)
+            else:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                # Keep the body readable (returning b'') after EOF so tar can read its trailer
+                response.raw.auto_close = False
+                stream = response.raw
+                if spool is not None:
+                    offset = resumed_offset(offset, response.status_code, response.headers.get('Content-Range'))
+                    stream = SpooledStream(spool, response.raw, offset, on_downloaded)
+            
+            try:
+                mtimes = self.extractor.extract_stream(stream, dest_path)
+            finally:
+                stream.close()
         
-        # Cleanup
-        if temp_file.exists():
-            temp_file.unlink()
+        self.logger.debug(f"Download complete: {dest_path}")
+        return mtimes
     
     def _wait_download_task(self, task_uri: str, max_wait: int = 300) -> str:
         """Poll a download task until complete"""
         start_time = time.time()
         
         while time.time() - start_time < max_wait:
-            result = self.request('GET', task_uri.replace(Config.API_BASE_URL + '/', ''))
-            
-            if result.get('done'):
-                if result.get('error'):
-                    raise RuntimeError(f"Export task failed: {result['error']}")
-                return result['url']
+            url = self.poll_download_task(task_uri)
+            if url:
+                return url
             
+            tracing.add_sleep('export_poll', 0.5)
             time.sleep(0.5)
         
         raise TimeoutError(f"Task {task_uri} did not complete within {max_wait}s")
+
+
+# ============================================================================
+# Two-Phase Export Scheduler
+# ============================================================================
+
+class ExportScheduler:
+    """Starts every export first, then polls all outstanding tasks together
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def _download_file(self, url: str, dest_path: Path):
-        """Download a file from URL"""
-        self.logger.debug(f"Downloading {url} to {dest_path}")
-        
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Direct download (not through API, no auth needed)
-        response = requests.get(url, stream=True, timeout=300)
-        response.raise_for_status()
-        
-        with open(dest_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+    Each task is polled round-robin by due time with its own exponential
+    backoff, so polling a slow export does not crowd the burst budget, and
+    each finished URL goes straight to the download pool.
+    """
+    
+    def __init__(self, api: CodioAPI, max_workers: int = 8,
+                 initial_poll: float = 0.5, max_poll: float = 8.0,
+                 backoff: float = 2.0, max_wait: float = 300):
+        self.api = api
+        self.max_workers = max_workers
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.logger = logging.getLogger('codio_downloader.scheduler')
+    
+    def run(self, jobs: List[Dict], on_ready: Callable[[Dict, str], Any],
+            on_error: Callable[[Dict, Exception], Any]) -> Iterator[Any]:
+        """Export every job and yield on_ready/on_error results as downloads finish
         
-        self.logger.debug(f"Download complete: {dest_path}")
+        Each job needs ``course_id``, ``assignment_id`` and ``student_id``;
+        ``on_ready(job, url)`` runs on the download pool.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = set()
+            pending = []  # heap of (next poll time, sequence, job, task_uri, interval, started)
+            
+            # Phase 1: start every export
+            for seq, job in enumerate(jobs):
+                try:
+                    task_uri = self.api.start_student_export(
+                        job['course_id'], job['assignment_id'], job['student_id']
+                    )
+                    now = time.time()
+                    heapq.heappush(pending, (now + self.initial_poll, seq, job, task_uri,
+                                             self.initial_poll, now))
+                except Exception as e:
+                    yield on_error(job, e)
+            
+            self.logger.info(f"Started {len(pending)} exports; polling for completion")
+            
+            # Phase 2: poll outstanding tasks, handing finished ones to the pool
+            while pending:
+                due, seq, job, task_uri, interval, started = heapq.heappop(pending)
+                delay = due - time.time()
+                if delay > 0:
+                    tracing.add_sleep('export_poll', delay)
+                    time.sleep(delay)
+                
+                try:
+                    url = self.api.poll_download_task(task_uri)
+                except Exception as e:
+                    yield on_error(job, e)
+                    continue
+                
+                if url:
+                    futures.add(pool.submit(on_ready, job, url))
+                elif time.time() - started > self.max_wait:
+                    yield on_error(job, TimeoutError(
+                        f"Task {task_uri} did not complete within {self.max_wait}s"))
+                else:
+                    interval = min(interval * self.backoff, self.max_poll)
+                    heapq.heappush(pending, (time.time() + interval, seq, job, task_uri,
+                                             interval, started))
+                
+                # Report downloads that finished while we were polling
+                done = {f for f in futures if f.done()}
+                futures -= done
+                for future in done:
+                    yield future.result()
+            
+            for future in as_completed(futures):
+                yield future.result()
+
+
+# ============================================================================
+# Archive Extraction
+# ============================================================================
+
+DEFAULT_EXCLUDE_GLOBS = ['.git', '.guides', '.codio']  # Only exclude system files
+
+
+def safe_member_name(name: str) -> Optional[str]:
+    """Normalized relative archive path, or None if it is absolute or escapes the root"""
+    normalized = posixpath.normpath(name.replace('\\', '/'))
+    if (normalized.startswith('/') or normalized in ('.', '..')
+            or normalized.startswith('../')):
+        return None
+    return normalized
+
+
+class ExcludeMatcher:
+    """exclude_globs compiled into one regex, matched against each path component
     
-    def _extract_assignment(self, zst_file: Path, dest_dir: Path):
-        """Extract assignment archive (supports .zst and .tar files) - INCLUDES ALL FILES"""
-        self.logger.debug(f"Extracting {zst_file} to {dest_dir}")
+    So ``*.pyc`` excludes ``lib/a.pyc`` and ``node_modules`` excludes everything
+    below any ``node_modules`` directory. Configured patterns add to
+    DEFAULT_EXCLUDE_GLOBS rather than replacing them.
+    """
+    
+    def __init__(self, patterns: Optional[List[str]] = None):
+        self.patterns = list(dict.fromkeys(DEFAULT_EXCLUDE_GLOBS + list(patterns or [])))
+        regex = '|'.join(fnmatch.translate(p) for p in self.patterns)
+        self._match = re.compile(regex).match if regex else None
+    
+    def excludes(self, name: str, dir_cache: Optional[Dict[str, bool]] = None) -> bool:
+        """True if any component of the relative path matches a pattern
         
-        if dest_dir.exists():
-            shutil.rmtree(dest_dir)
-        dest_dir.mkdir(parents=True, exist_ok=True)
+        ``dir_cache`` memoizes parent directories across the members of one archive.
+        """
+        if self._match is None:
+            return False
         
-        # Handle .zst files (need decompression first)
-        if zst_file.suffix == '.zst':
-            tar_file = zst_file.with_suffix('.tar')
-            self._decompress_zstd(zst_file, tar_file)
-            self._extract_tar_inclusive(tar_file, dest_dir)
-            if tar_file.exists():
-                tar_file.unlink()
-        elif zst_file.suffix == '.tar':
-            self._extract_tar_inclusive(zst_file, dest_dir)
-        else:
-            raise ValueError(f"Unsupported archive format: {zst_file.suffix}")
+        parent, _, base = name.rpartition('/')
+        if parent:
+            if dir_cache is None:
+                dir_cache = {}
+            if parent not in dir_cache:
+                dir_cache[parent] = self.excludes(parent, dir_cache)
+            if dir_cache[parent]:
+                return True
+        return self._match(base) is not None
+
+
+class ArchiveExtractor:
+    """Extracts Codio assignment archives - shared by the blocking and asyncio clients
     
-    def _decompress_zstd(self, zst_path: Path, tar_path: Path):
-        """Decompress .zst file to .tar"""
-        if self.dry_run:
-            self.logger.debug(f"[DRY RUN] Would decompress {zst_path} to {tar_path}")
-            return
-        
-        # Try homebrew path first, then PATH
-        zstd_cmd = '/opt/homebrew/bin/zstd'
-        if not Path(zstd_cmd).exists():
-            zstd_cmd = 'zstd'
+    Archives are streamed: zstd is decompressed in-process and tar members are
+    written as they arrive, so no .zst/.tar copies ever touch the disk.
+    """
+    
+    ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+    READ_SIZE = 1024 * 1024
+    
+    def __init__(self, dry_run: bool = False, exclude_globs: Optional[List[str]] = None,
+                 asset_store: Optional[AssetStore] = None, read_size: int = READ_SIZE):
+        self.dry_run = dry_run
+        self.exclude = ExcludeMatcher(exclude_globs)
+        self.asset_store = asset_store
+        self.read_size = read_size
+        self.logger = logging.getLogger('codio_downloader.extract')
+    
+    def extract_assignment(self, archive: Path, dest_dir: Path) -> Dict[str, int]:
+        """Extract a local assignment archive (.zst or .tar) - INCLUDES ALL FILES"""
+        if archive.suffix not in ('.zst', '.tar'):
+            raise ValueError(f"Unsupported archive format: {archive.suffix}")
         
-        try:
-            subprocess.run(
-                [zstd_cmd, '-d', str(zst_path), '-o', str(tar_path)],
-                check=True,
-                capture_output=True
-            )
-            self.logger.debug(f"Decompressed {zst_path.name}")
-        except subprocess.CalledProcessError as e:
-            self.logger.error(f"Decompression failed: {e.stderr.decode()}")
-            raise
-        except FileNotFoundError:
-            self.logger.error("zstd not found. Install with: brew install zstd")
-            raise
+        with open(archive, 'rb') as f:
+            return self.extract_stream(f, dest_dir)
     
-    def _extract_tar_inclusive(self, tar_path: Path, dest_dir: Path, exclude_globs: List[str] = None):
-        """Extract tar file including ALL files (images, etc.) with optional exclusions"""
+    def extract_stream(self, stream: BinaryIO, dest_dir: Path) -> Dict[str, int]:
+        """Extract a zstd-compressed (or plain) tar stream into dest_dir
+        
+        Returns the newest mtime recorded in the archive for the files extracted, for
+        the whole archive ('') and for each directory up to two levels deep. Files
+        shared through the asset store do not keep their own mtimes, so this is the
+        archive's account of when the project last changed.
+        """
         if self.dry_run:
-            self.logger.debug(f"[DRY RUN] Would extract {tar_path} to {dest_dir}")
-            return
+            self.logger.debug(f"[DRY RUN] Would extract stream to {dest_dir}")
+            return {}
         
-        if exclude_globs is None:
-            exclude_globs = ['.git', '.guides', '.codio']  # Only exclude system files
+        self.logger.debug(f"Extracting stream to {dest_dir}")
         
+        if dest_dir.exists():
+            shutil.rmtree(dest_dir)
         dest_dir.mkdir(parents=True, exist_ok=True)
         
-        with tarfile.open(tar_path, 'r') as tar:
-            for member in tar.getmembers():
-                # Security check for path traversal
-                member_path = Path(dest_dir) / member.name
-                if not member_path.resolve().is_relative_to(dest_dir.resolve()):
-                    self.logger.warning(f"Skipping potentially unsafe path: {member.name}")
+        with tracing.span('download+extract', 'student', dest=dest_dir.name) as span:
+            start = time.perf_counter()
+            # Transfer, decompression and extraction interleave, so each is timed by its reads
+            downloaded = decompressed = None
+            if tracing.enabled():
+                stream = downloaded = tracing.CountingReader(stream)
+            
+            buffered = stream if hasattr(stream, 'peek') else io.BufferedReader(stream, self.read_size)
+            magic = buffered.peek(4)[:4]
+            peek_seconds = downloaded.seconds if downloaded is not None else 0.0
+            if magic == self.ZSTD_MAGIC:
+                decompressor = zstandard.ZstdDecompressor()
+                with decompressor.stream_reader(buffered, read_size=self.read_size) as tar_stream:
+                    if downloaded is not None:
+                        tar_stream = decompressed = tracing.CountingReader(tar_stream)
+                    mtimes = self._extract_tar_stream(tar_stream, dest_dir)
+            else:
+                mtimes = self._extract_tar_stream(buffered, dest_dir)
+            
+            if downloaded is not None:
+                # Reads of the decompressed stream include the network reads they trigger
+                read_seconds = peek_seconds + (decompressed.seconds if decompressed else
+                                               downloaded.seconds - peek_seconds)
+                span.update(
+                    bytes=downloaded.bytes,
+                    tar_bytes=decompressed.bytes if decompressed else downloaded.bytes,
+                    download_s=round(downloaded.seconds, 4),
+                    decompress_s=round(max(0.0, read_seconds - downloaded.seconds), 4),
+                    extract_s=round(time.perf_counter() - start - read_seconds, 4)
+                )
+        return mtimes
+    
+    def _extract_tar_stream(self, tar_stream: BinaryIO, dest_dir: Path) -> Dict[str, int]:
+        """Extract tar members as they arrive, including ALL files (images, etc.) except exclusions"""
+        excluded_dirs: Dict[str, bool] = {}
+        mtimes: Dict[str, int] = {}
+        
+        # 'r|' reads the archive sequentially, never loading the full member list
+        with tarfile.open(fileobj=tar_stream, mode='r|') as tar:
+            for member in tar:
+                if member.isdir() and posixpath.normpath(member.name) == '.':
+                    # The archive's root ("./"), which dest_dir already is
                     continue
                 
-                # Check exclusions
-                should_exclude = False
-                for pattern in exclude_globs:
-                    if pattern in member.name or member.name.startswith(pattern):
-                        should_exclude = True
-                        break
+                # Security check for path traversal (lexical - no filesystem resolve per member)
+                name = safe_member_name(member.name)
+                if name is None or not self._safe_link(member, name):
+                    self.logger.warning(f"Skipping potentially unsafe path: {member.name}")
+                    continue
                 
-                if should_exclude:
+                # Check exclusions (anything under an excluded directory is skipped too)
+                if self.exclude.excludes(name, excluded_dirs):
                     self.logger.debug(f"Excluding file: {member.name}")
                     continue
                 
                 # Extract everything else (including images, CSS, JS, etc.)
+                member.name = name
                 try:
-                    tar.extract(member, dest_dir)
+                    if self.asset_store is not None and member.isfile():
+                        # Stored once by content, hard-linked into the project
+                        self.asset_store.add_stream(tar.extractfile(member), dest_dir / name)
+                    elif member.islnk():
+                        # A stream cannot seek back to the target's data, so link (or copy)
+                        # the file already extracted; a target that was excluded is skipped
+                        target = dest_dir / safe_member_name(member.linkname)
+                        if not target.is_file():
+                            self.logger.warning(f"Skipping hard link to unextracted {member.linkname}: {member.name}")
+                            continue
+                        (dest_dir / name).parent.mkdir(parents=True, exist_ok=True)
+                        link_or_copy(target, dest_dir / name)
+                    else:
+                        tar.extract(member, dest_dir)
                 except Exception as e:
                     self.logger.warning(f"Failed to extract {member.name}: {e}")
                     continue
+                
+                if member.isfile():
+                    parts = name.split('/')[:-1]
+                    for prefix in ['', *('/'.join(parts[:depth]) for depth in (1, 2) if depth <= len(parts))]:
+                        mtimes[prefix] = max(mtimes.get(prefix, 0), int(member.mtime))
+        
+        self.logger.debug(f"Extracted stream to {dest_dir} (including all assets)")
+        return mtimes
+    
+    @staticmethod
+    def _safe_link(member: tarfile.TarInfo, name: str) -> bool:
+        """Links may only point inside the extraction directory; devices are never extracted"""
+        if member.isdev():
+            return False
+        if member.issym():
+            return safe_member_name(posixpath.join(posixpath.dirname(name), member.linkname)) is not None
+        if member.islnk():
+            return safe_member_name(member.linkname) is not None
+        return True
+
+
+class _AsyncStreamReader(io.RawIOBase):
+    """Blocking file object over an aiohttp response, read from a worker thread
+    
+    Lets the extractor consume the body as it arrives while the event loop keeps
+    running the download.
+    """
+    
+    def __init__(self, content: 'aiohttp.StreamReader', loop: asyncio.AbstractEventLoop):
+        self.content = content
+        self.loop = loop
+        self._pending = b''
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            self._pending = asyncio.run_coroutine_threadsafe(
+                self.content.readany(), self.loop
+            ).result()
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def spool_offset(spool: Optional[Path]) -> int:
+    """Bytes of an archive already on disk from an interrupted download"""
+    try:
+        return spool.stat().st_size if spool is not None else 0
+    except FileNotFoundError:
+        return 0
+
+
+def range_headers(spool: Optional[Path], offset: int) -> Dict[str, str]:
+    """Request headers for a (possibly resumed) spooled download"""
+    if spool is None:
+        return {}
+    # Spooled bytes must be the archive itself, so ranges line up with what is on disk
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = f"bytes={offset}-"
+    return headers
+
+
+def resumed_offset(requested: int, status: int, content_range: Optional[str]) -> int:
+    """Spool bytes a response continues from - 0 when the server sent the whole archive"""
+    if requested and status == 206 and (content_range or '').startswith(f"bytes {requested}-"):
+        return requested
+    return 0
+
+
+class SpooledStream(io.RawIOBase):
+    """Archive stream that is also written to a spool file as it arrives
+    
+    The first ``offset`` bytes are read back from the spool (an earlier, partial
+    download) and the rest from ``network``, which is appended to the spool. When
+    the network stream ends, ``on_downloaded`` is called with the archive size.
+    """
+    
+    # Network reads are kept small so a dropped connection loses little of what arrived
+    NETWORK_READ = 64 * 1024
+    
+    def __init__(self, spool: Path, network: Optional[BinaryIO], offset: int,
+                 on_downloaded: Optional[Callable[[int], None]] = None):
+        spool.parent.mkdir(parents=True, exist_ok=True)
+        if offset:
+            os.truncate(spool, offset)
+        self.prefix = open(spool, 'rb') if offset else None
+        self.remaining = offset
+        self.network = network
+        self.sink = open(spool, 'ab' if offset else 'wb') if network is not None else None
+        self.size = offset
+        self.on_downloaded = on_downloaded
+        self._finished = False
+        if offset:
+            logging.getLogger('codio_downloader.download').debug(f"Resuming {spool.name} at byte {offset}")
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self.remaining:
+            data = self.prefix.read(min(len(buffer), self.remaining))
+            self.remaining -= len(data)
+        elif self.network is not None:
+            data = self.network.read(min(len(buffer), self.NETWORK_READ))
+            self.sink.write(data)
+            self.size += len(data)
+        else:
+            data = b''
+        
+        if not data and not self._finished:
+            self._finished = True
+            if self.sink is not None:
+                self.sink.flush()
+            if self.on_downloaded is not None:
+                self.on_downloaded(self.size)
+        n = len(data)
+        buffer[:n] = data
+        return n
+    
+    def close(self):
+        for f in (self.prefix, self.sink):
+            if f is not None:
+                f.close()
+        super().close()
+
+
+# ============================================================================
+# Async Codio API Client
+# ============================================================================
+
+class AsyncCodioAPI:
+    """asyncio client for the Codio REST API - same endpoints as CodioAPI
+    
+    Use as an async context manager. All coroutines share one aiohttp session and
+    one AsyncRateLimiter, so many exports can be in flight without a thread each.
+    """
+    
+    def __init__(self, client_id: str, client_secret: str,
+                 rate_limiter: Optional[AsyncRateLimiter] = None,
+                 max_connections: int = 100, dry_run: bool = False,
+                 exclude_globs: Optional[List[str]] = None,
+                 asset_store: Optional[AssetStore] = None,
+                 read_size: int = ArchiveExtractor.READ_SIZE,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for async downloads. Install with: pip install aiohttp")
+        
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.dry_run = dry_run
+        self.max_connections = max_connections
+        self.read_size = read_size
+        
+        self.access_token: Optional[str] = None
+        self.token_expiry: float = 0
+        
+        self.session: Optional['aiohttp.ClientSession'] = None
+        self.rate_limiter = rate_limiter or AsyncRateLimiter()
+        self.limiter = limiter or AdaptiveLimiter(max_connections, {'adaptive': False})
+        self.extractor = ArchiveExtractor(dry_run, exclude_globs, asset_store, read_size=read_size)
+        self.logger = logging.getLogger('codio_downloader.async_api')
+        self._auth_lock = asyncio.Lock()
+    
+    async def __aenter__(self) -> 'AsyncCodioAPI':
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            read_bufsize=self.read_size
+        )
+        if not self.dry_run:
+            await self.authenticate()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    async def authenticate(self):
+        """Authenticate and get access token"""
+        async with self._auth_lock:
+            # Another coroutine may have refreshed the token while we waited
+            if self.access_token and time.time() < self.token_expiry:
+                return
+            
+            self.logger.info("Authenticating with Codio API")
+            params = {
+                'grant_type': 'client_credentials',
+                'client_id': self.client_id,
+                'client_secret': self.client_secret
+            }
+            
+            try:
+                async with self.session.get(Config.OAUTH_URL, params=params,
+                                            timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+                
+                self.access_token = data['access_token']
+                # Tokens typically expire in 1 hour, set expiry with buffer
+                self.token_expiry = time.time() + 3600 - Config.TOKEN_EXPIRY_BUFFER
+                
+                self.logger.info("Successfully authenticated with Codio")
+            except Exception as e:
+                self.logger.error(f"Authentication failed: {e}")
+                raise
+    
+    @retry(stop=stop_after_attempt(Config.MAX_RETRIES),
+           wait=wait_exponential(multiplier=Config.RETRY_BACKOFF_BASE, min=4, max=60))
+    async def request(self, method: str, path: str, params: Optional[Dict] = None,
+                      json_data: Optional[Dict] = None) -> Any:
+        """Make an authenticated API request with retry logic"""
+        if self.dry_run:
+            self.logger.debug(f"[DRY RUN] Would {method} {path}")
+            return {}
+        
+        if time.time() >= self.token_expiry:
+            self.logger.info("Token expired, re-authenticating")
+            self.access_token = None
+            await self.authenticate()
+        await self.rate_limiter.wait_if_needed()
+        
+        url = f"{Config.API_BASE_URL}/{path.lstrip('/')}"
+        
+        for attempt in range(2):
+            headers = {'Authorization': f'Bearer {self.access_token}'}
+            async with self.limiter.slot_async() as slot:
+                with tracing.span('api.request', 'api', method=method, path=path) as span:
+                    try:
+                        response = await self.session.request(method, url, params=params, json=json_data,
+                                                              headers=headers,
+                                                              timeout=aiohttp.ClientTimeout(total=120))
+                    except asyncio.TimeoutError:
+                        slot['outcome'] = 'timeout'
+                        raise
+                    span['status'] = response.status
+                if response.status == 429:
+                    slot['outcome'] = 'throttled'
+                elif response.status >= 500:
+                    slot['outcome'] = 'error'
+            async with response:
+                # Handle 401 (refresh token once, then let tenacity retry)
+                if response.status == 401 and attempt == 0:
+                    self.logger.warning("Got 401, refreshing token")
+                    self.access_token = None
+                    await self.authenticate()
+                    continue
+                
+                # Handle 429 (rate limit)
+                if response.status == 429:
+                    retry_after = int(response.headers.get('Retry-After', 10))
+                    self.logger.warning(f"Rate limited, waiting {retry_after}s")
+                    # Every coroutine sharing the budget waits this out in wait_if_needed
+                    await self.rate_limiter.block_for(retry_after)
+                    raise aiohttp.ClientError("Rate limited, retrying")
+                
+                response.raise_for_status()
+                body = await response.read()
+                return json.loads(body) if body else {}
+    
+    async def get_course(self, course_id: str) -> Dict:
+        """Get course information including assignments"""
+        self.logger.info(f"Fetching course info for {course_id}")
+        return await self.request('GET', f'/courses/{course_id}',
+                                  params={'withHiddenAssignments': 'true'})
+    
+    async def get_students(self, course_id: str) -> List[Dict]:
+        """Get list of students in a course"""
+        self.logger.info(f"Fetching students for course {course_id}")
+        return await self.request('GET', f'/courses/{course_id}/students')
+    
+    async def get_assignment_progress(self, course_id: str, assignment_id: str) -> List[Dict]:
+        """Get per-student progress (including modification metadata) for an assignment"""
+        self.logger.info(f"Fetching progress for assignment {assignment_id} in course {course_id}")
+        return await self.request('GET', f'/courses/{course_id}/assignments/{assignment_id}/students')
+    
+    async def export_student_assignment(self, course_id: str, assignment_id: str,
+                                        student_id: str) -> str:
+        """Export student assignment (returns download URL after polling)"""
+        self.logger.debug(f"Exporting assignment {assignment_id} for student {student_id}")
+        
+        with tracing.span('export.start', 'student', student_id=student_id):
+            result = await self.request(
+                'GET',
+                f'/courses/{course_id}/assignments/{assignment_id}/students/{student_id}/download'
+            )
+        
+        task_uri = result.get('taskUri')
+        if not task_uri:
+            raise ValueError("No taskUri in export response")
+        
+        return await self._wait_download_task(task_uri)
+    
+    async def download_student_assignment(self, course_id: str, assignment_id: str,
+                                          student_id: str, dest_path: Path):
+        """Download and extract student assignment to directory"""
+        url = await self.export_student_assignment(course_id, assignment_id, student_id)
+        await self.download_export(url, dest_path)
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    async def download_export(self, url: str, dest_path: Path, spool: Optional[Path] = None,
+                              on_downloaded: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+        """Stream a finished export into the extractor running on a worker thread
+        
+        ``spool`` and ``on_downloaded`` work as in CodioAPI.download_export.
+        """
+        self.logger.debug(f"Streaming {url} into {dest_path}")
+        
+        offset = spool_offset(spool)
+        # Direct download (not through API, no auth needed)
+        async with self.session.get(url, headers=range_headers(spool, offset),
+                                    timeout=aiohttp.ClientTimeout(total=300)) as response:
+            if offset and response.status == 416:
+                # The spool already holds the whole archive
+                reader = SpooledStream(spool, None, offset, on_downloaded)
+            else:
+                response.raise_for_status()
+                reader = _AsyncStreamReader(response.content, asyncio.get_running_loop())
+                if spool is not None:
+                    offset = resumed_offset(offset, response.status, response.headers.get('Content-Range'))
+                    reader = SpooledStream(spool, reader, offset, on_downloaded)
+            
+            try:
+                mtimes = await asyncio.to_thread(self.extractor.extract_stream, reader, dest_path)
+            finally:
+                reader.close()
+        
+        self.logger.debug(f"Download complete: {dest_path}")
+        return mtimes
+    
+    async def _wait_download_task(self, task_uri: str, max_wait: int = 300) -> str:
+        """Poll a download task until complete"""
+        start_time = time.time()
         
-        self.logger.debug(f"Extracted {tar_path.name} (including all assets)")
+        while time.time() - start_time < max_wait:
+            with tracing.span('export.poll', 'student') as span:
+                result = await self.request('GET', task_uri.replace(Config.API_BASE_URL + '/', ''))
+                span['done'] = bool(result.get('done'))
+            
+            if result.get('done'):
+                if result.get('error'):
+                    raise RuntimeError(f"Export task failed: {result['error']}")
+                return result['url']
+            
+            tracing.add_sleep('export_poll', 0.5)
+            await asyncio.sleep(0.5)
+        
+        raise TimeoutError(f"Task {task_uri} did not complete within {max_wait}s")
 
 
 # Export the classes needed by the main script
-__all__ = ['CodioAPI', 'Config']
\ No newline at end of file
+__all__ = ['CodioAPI', 'AsyncCodioAPI', 'AsyncRateLimiter', 'Config', 'ExportScheduler']
\ No newline at end of file
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Download Journal for About Me Projects (25-26)
+
+An append-only JSON-lines file (build/download_journal.jsonl) recording each
+student's progress through a download as it happens:
+
+    exported    Codio finished the export (the record carries its download URL)
+    downloaded  The whole archive is on disk in build/.partial/
+    extracted   The archive is unpacked into the student's staging directory
+    scanned     The project was inventoried (the record carries its manifest entry)
+    failed      The student's download gave up (retried on resume)
+
+Every record is flushed as it is written, so after a crash the journal holds
+everything that finished, and `download --resume` replays it to pick up where the
+run stopped. A torn last line from a crash mid-write is ignored.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+JOURNAL_STATES = ['exported', 'downloaded', 'extracted', 'scanned', 'failed']
+
+
+class DownloadJournal:
+    """Append-only record of per-student download states, replayed by --resume"""
+    
+    def __init__(self, path: Path, logger: logging.Logger):
+        self.path = path
+        self.logger = logger
+        self.states: Dict[str, Dict] = {}
+        self.completed = False
+        self._file = None
+        self._lock = threading.Lock()
+    
+    def load(self) -> bool:
+        """Replay the journal into the latest state per key; False if there is none"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        
+        for number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if number < len(lines):
+                    self.logger.warning(f"Skipping unreadable journal line {number} in {self.path}")
+                continue
+            
+            event = record.get('event')
+            if event == 'run':
+                self.completed = False
+            elif event == 'complete':
+                self.completed = True
+            elif record.get('state') in JOURNAL_STATES:
+                key = record['key']
+                if record['state'] == 'exported':
+                    # A new export starts the student over
+                    self.states[key] = record
+                else:
+                    self.states[key] = {**self.states.get(key, {}), **record}
+        return True
+    
+    def start(self, resume: bool = False, **info) -> None:
+        """Open the journal for this run - appending when resuming, otherwise starting afresh"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume:
+            self.states = {}
+            self.completed = False
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._write({'event': 'run', 'resume': resume, **info})
+    
+    def state(self, key: str) -> Optional[Dict]:
+        """Latest journalled record for a key, or None"""
+        return self.states.get(key)
+    
+    def record(self, key: str, state: str, **data) -> None:
+        """Append a state change for one student (or bulk export)"""
+        record = {'key': key, 'state': state, **data}
+        with self._lock:
+            if state == 'exported':
+                self.states[key] = record
+            else:
+                self.states[key] = {**self.states.get(key, {}), **record}
+        self._write(record)
+    
+    def finish(self) -> None:
+        """Mark the run complete and close the journal"""
+        self._write({'event': 'complete'})
+        with self._lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+    
+    def _write(self, record: Dict) -> None:
+        if self._file is None:
+            return
+        line = json.dumps({'ts': round(time.time(), 3), **record}) + '\n'
+        with self._lock:
+            # One write + flush per record: a crash loses at most the line being written
+            self._file.write(line)
+            self._file.flush()
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in for the Codio API (benchmarks and offline testing)
+
+Implements the endpoints codio_downloader_images.py uses - OAuth token,
+course, students, assignment progress, per-student and whole-course export
+tasks and archive downloads - over synthetic courses, so the downloader and
+the rest of the pipeline can be measured without touching real Codio.
+
+- Every API response can be delayed (--latency) and randomly fail with 429 or
+  401 (--p429, --p401)
+- The burst rate limit is enforced like Codio's (--rate-limit 50/10) with a
+  Retry-After header, and API calls beyond --max-in-flight at once get a 429
+- Exports need --export-polls polls before they report done
+- Archive downloads honour Range requests and can be cut off partway through
+  (--p-drop) to exercise resumed downloads
+- Archives are zstd-compressed tars generated on the fly from a seed: an
+  index.html, a shared stylesheet and starter image, and a unique photo that
+  brings each project to --project-kb
+- GET /_stats returns request, error and byte counters
+
+Point the pipeline at it with:
+    export CODIO_API_BASE_URL=http://127.0.0.1:8765/api/v1
+    export CODIO_OAUTH_URL=http://127.0.0.1:8765/oauth/token
+
+Usage:
+    python scripts/fake_codio_server.py --students 120 --sections 4 --project-kb 400
+"""
+
+import argparse
+import io
+import json
+import random
+import re
+import tarfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import zstandard
+
+
+ASSIGNMENT_ID = 'about-me'
+TOKEN_PREFIX = 'fake-token-'
+
+# Path segments that name an endpoint rather than an id (for the per-endpoint counters)
+ENDPOINT_WORDS = {'courses', 'students', 'assignments', 'download', 'tasks'}
+
+_FIRST_NAMES = ['Ava', 'Ben', 'Chloe', 'Diego', 'Emma', 'Finn', 'Grace', 'Hugo', 'Isla', 'Jack',
+                'Kai', 'Luna', 'Mia', 'Noah', 'Olivia', 'Priya', 'Quinn', 'Ruby', 'Sam', 'Theo']
+_LAST_NAMES = ['Adams', 'Brooks', 'Chen', 'Diaz', 'Evans', 'Fox', 'Garcia', 'Hill', 'Ito', 'Jones',
+               'Kim', 'Lopez', 'Moore', 'Nguyen', 'Ortiz', 'Patel', 'Reyes', 'Smith', 'Tran', 'Wu']
+
+SHARED_CSS = b"body { font-family: sans-serif; margin: 2em; }\nimg { max-width: 100%; }\n"
+
+
+def synthetic_courses(students: int, sections: int, assignment_name: str = 'About Me') -> Dict[str, Dict]:
+    """course id -> {name, assignment_name, students}, with students spread over the sections"""
+    courses = {}
+    for index in range(sections):
+        courses[f"course{index + 1}"] = {
+            'name': f"Grade 7 Section {index + 1}",
+            'assignment_name': assignment_name,
+            'students': []
+        }
+    course_ids = list(courses)
+    for n in range(students):
+        first = _FIRST_NAMES[n % len(_FIRST_NAMES)]
+        last = _LAST_NAMES[(n // len(_FIRST_NAMES)) % len(_LAST_NAMES)]
+        courses[course_ids[n % sections]]['students'].append({
+            'id': f"s{n:05d}",
+            'name': f"{first} {last}{n}",
+            'username': f"{first.lower()}{last.lower()}{n}",
+            'email': f"{first.lower()}.{last.lower()}{n}@example.org"
+        })
+    return courses
+
+
+def _random_bytes(rng: random.Random, size: int) -> bytes:
+    """Incompressible filler, like a real photo"""
+    return rng.getrandbits(size * 8).to_bytes(size, 'little') if size else b''
+
+
+def project_files(student: Dict, project_bytes: int, seed: int) -> List[Tuple[str, bytes]]:
+    """Deterministic synthetic About Me project for one student"""
+    rng = random.Random(f"{seed}:{student['id']}")
+    page = (
+        f"<!DOCTYPE html>\n<html><head><title>About {student['name']}</title>"
+        f"<link rel=\"stylesheet\" href=\"style.css\"></head>\n<body><h1>{student['name']}</h1>"
+        f"<img src=\"images/photo.jpg\" width=\"400\"><img src=\"images/starter.png\">"
+        f"<p>{' '.join(rng.choice(_FIRST_NAMES) for _ in range(60))}</p></body></html>\n"
+    ).encode()
+    starter = _random_bytes(random.Random(seed), 16 * 1024)  # same for everyone, like a starter asset
+    photo_size = max(1024, project_bytes - len(page) - len(SHARED_CSS) - len(starter))
+    return [
+        ('index.html', page),
+        ('style.css', SHARED_CSS),
+        ('images/starter.png', starter),
+        ('images/photo.jpg', _random_bytes(rng, photo_size)),
+        ('.guides/content.md', b'# Instructions\n')
+    ]
+
+
+def build_archive(members: List[Tuple[str, bytes]]) -> bytes:
+    """zstd-compressed tar of (path, data) members"""
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode='w') as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 1_700_000_000
+            tar.addfile(info, io.BytesIO(data))
+    return zstandard.ZstdCompressor(level=1).compress(tar_buffer.getvalue())
+
+
+class FakeCodio:
+    """State of the fake service: courses, tasks, rate limiting and counters"""
+    
+    def __init__(self, courses: Dict[str, Dict], project_bytes: int = 200_000, latency: float = 0.0,
+                 p429: float = 0.0, p401: float = 0.0, rate_limit: Optional[Tuple[int, float]] = None,
+                 export_polls: int = 2, bandwidth: Optional[int] = None, p_drop: float = 0.0,
+                 max_in_flight: Optional[int] = None, seed: int = 0):
+        self.courses = courses
+        self.project_bytes = project_bytes
+        self.latency = latency
+        self.p429 = p429
+        self.p401 = p401
+        self.rate_limit = rate_limit
+        self.export_polls = export_polls
+        self.bandwidth = bandwidth
+        self.p_drop = p_drop
+        self.max_in_flight = max_in_flight
+        self.seed = seed
+        
+        self.tasks: Dict[str, Dict] = {}
+        self.request_times: List[float] = []
+        self.in_flight = 0
+        self.stats = {'api_calls': 0, 'token_calls': 0, 'downloads': 0, 'bytes_sent': 0,
+                      'ranged_downloads': 0, 'dropped_downloads': 0, 'peak_in_flight': 0,
+                      'rate_limited': 0, 'unauthorized': 0, 'by_endpoint': {}}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._task_ids = iter(range(1, 1 << 62))
+    
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+    
+    @contextmanager
+    def serving(self) -> Iterator[int]:
+        """Count an API call as in flight while it is handled; yields how many are"""
+        with self._lock:
+            self.in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+            current = self.in_flight
+        try:
+            yield current
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+    
+    def admit(self, endpoint: str, in_flight: int = 1) -> Optional[Tuple[int, Dict]]:
+        """Rate-limit and fault-injection check for an API call; an error response or None"""
+        with self._lock:
+            self.stats['api_calls'] += 1
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+            now = time.time()
+            if self.max_in_flight and in_flight > self.max_in_flight:
+                self.stats['rate_limited'] += 1
+                return 429, {'Retry-After': '1'}
+            if self.rate_limit:
+                burst, window = self.rate_limit
+                self.request_times = [t for t in self.request_times if t > now - window]
+                if len(self.request_times) >= burst:
+                    self.stats['rate_limited'] += 1
+                    retry_after = max(1, int(self.request_times[0] + window - now + 1))
+                    return 429, {'Retry-After': str(retry_after)}
+                self.request_times.append(now)
+            if self._random.random() < self.p429:
+                self.stats['rate_limited'] += 1
+                return 429, {'Retry-After': '1'}
+            if self._random.random() < self.p401:
+                self.stats['unauthorized'] += 1
+                return 401, {}
+        return None
+    
+    def drop_download(self) -> bool:
+        """Whether to cut this archive download off partway (fault injection)"""
+        with self._lock:
+            return self._random.random() < self.p_drop
+    
+    def find_student(self, course_id: str, student_id: str) -> Optional[Dict]:
+        course = self.courses.get(course_id)
+        for student in (course or {}).get('students', []):
+            if student['id'] == student_id:
+                return student
+        return None
+    
+    def new_task(self, archive: Dict) -> str:
+        with self._lock:
+            task_id = f"t{next(self._task_ids)}"
+            self.tasks[task_id] = {'polls': 0, 'archive': archive}
+        return task_id
+    
+    def archive(self, task_id: str) -> Optional[bytes]:
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        source = task['archive']
+        if 'student' in source:
+            return build_archive(project_files(source['student'], self.project_bytes, self.seed))
+        
+        # Whole-course export: one folder per student, named by username
+        members = []
+        for student in self.courses[source['course']]['students']:
+            members += [(f"{student['username']}/{name}", data)
+                        for name, data in project_files(student, self.project_bytes, self.seed)]
+        return build_archive(members)
+
+
+class FakeCodioHandler(BaseHTTPRequestHandler):
+    """Routes the Codio endpoints used by the downloader"""
+    
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real service
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away (an interrupted run)
+    
+    @property
+    def codio(self) -> FakeCodio:
+        return self.server.codio
+    
+    def _send_json(self, data, status: int = 200, headers: Optional[Dict] = None) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _base_url(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+    
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path
+        
+        if path == '/_stats':
+            return self._send_json(self.codio.stats)
+        if path == '/oauth/token':
+            self.codio.count('token_calls')
+            query = parse_qs(parts.query)
+            if query.get('grant_type') != ['client_credentials']:
+                return self._send_json({'error': 'unsupported_grant_type'}, 400)
+            return self._send_json({'access_token': f"{TOKEN_PREFIX}{time.time()}", 'expires_in': 3600})
+        if path.startswith('/archives/'):
+            return self._send_archive(path.rsplit('/', 1)[1].split('.')[0])
+        if path.startswith('/api/v1/'):
+            return self._api(path[len('/api/v1'):])
+        self._send_json({'error': 'not found'}, 404)
+    
+    def _api(self, path: str) -> None:
+        with self.codio.serving() as in_flight:
+            self._handle_api(path, in_flight)
+    
+    def _handle_api(self, path: str, in_flight: int) -> None:
+        if self.codio.latency:
+            time.sleep(self.codio.latency)
+        if not self.headers.get('Authorization', '').startswith(f"Bearer {TOKEN_PREFIX}"):
+            return self._send_json({'error': 'unauthorized'}, 401)
+        
+        segments = path.strip('/').split('/')
+        endpoint = '/' + '/'.join(part if part in ENDPOINT_WORDS else ':id' for part in segments)
+        rejected = self.codio.admit(endpoint, in_flight)
+        if rejected:
+            status, headers = rejected
+            return self._send_json({'error': 'rejected'}, status, headers)
+        
+        if segments[0] == 'tasks' and len(segments) == 2:
+            return self._poll(segments[1])
+        if segments[0] != 'courses' or len(segments) < 2 or segments[1] not in self.codio.courses:
+            return self._send_json({'error': 'not found'}, 404)
+        
+        course_id = segments[1]
+        course = self.codio.courses[course_id]
+        rest = segments[2:]
+        if not rest:
+            return self._send_json({
+                'id': course_id,
+                'name': course['name'],
+                'modules': [{'name': 'Unit 1', 'assignments': [
+                    {'id': ASSIGNMENT_ID, 'name': course['assignment_name']}
+                ]}]
+            })
+        if rest == ['students']:
+            return self._send_json(course['students'])
+        if len(rest) >= 2 and rest[0] == 'assignments' and rest[1] == ASSIGNMENT_ID:
+            if rest[2:] == ['students']:
+                # Progress with a modification stamp that stays fixed for a given seed
+                return self._send_json([
+                    {'student_id': s['id'], 'completed': True, 'lastModified': f"{self.codio.seed}-{s['id']}"}
+                    for s in course['students']
+                ])
+            if rest[2:] == ['download']:
+                task_id = self.codio.new_task({'course': course_id})
+                return self._send_json({'taskUri': f"{self._base_url()}/api/v1/tasks/{task_id}"})
+            if len(rest) == 5 and rest[2] == 'students' and rest[4] == 'download':
+                student = self.codio.find_student(course_id, rest[3])
+                if student is None:
+                    return self._send_json({'error': 'no such student'}, 404)
+                task_id = self.codio.new_task({'student': student})
+                return self._send_json({'taskUri': f"{self._base_url()}/api/v1/tasks/{task_id}"})
+        self._send_json({'error': 'not found'}, 404)
+    
+    def _poll(self, task_id: str) -> None:
+        task = self.codio.tasks.get(task_id)
+        if task is None:
+            return self._send_json({'error': 'no such task'}, 404)
+        task['polls'] += 1
+        if task['polls'] < self.codio.export_polls:
+            return self._send_json({'done': False})
+        return self._send_json({'done': True, 'url': f"{self._base_url()}/archives/{task_id}.tar.zst"})
+    
+    def _send_archive(self, task_id: str) -> None:
+        data = self.codio.archive(task_id)
+        if data is None:
+            return self._send_json({'error': 'no such archive'}, 404)
+        self.codio.count('downloads')
+        
+        start = 0
+        match = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{len(data)}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.codio.count('ranged_downloads')
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/zstd')
+        self.send_header('Content-Length', str(len(data) - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        
+        # A dropped download stops halfway through what is left and closes the connection
+        end = len(data)
+        if self.codio.drop_download():
+            self.codio.count('dropped_downloads')
+            end = start + (len(data) - start) // 2
+            self.close_connection = True
+        
+        chunk = 256 * 1024
+        for offset in range(start, end, chunk):
+            piece = data[offset:min(offset + chunk, end)]
+            self.wfile.write(piece)
+            self.codio.count('bytes_sent', len(piece))
+            if self.codio.bandwidth:
+                time.sleep(len(piece) / self.codio.bandwidth)
+
+
+def make_server(codio: FakeCodio, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """HTTP server for codio; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), FakeCodioHandler)
+    server.daemon_threads = True
+    server.codio = codio
+    return server
+
+
+def parse_rate_limit(text: str) -> Optional[Tuple[int, float]]:
+    """'50/10' -> (50, 10.0); 'none' -> None"""
+    if text.lower() == 'none':
+        return None
+    burst, window = text.split('/')
+    return int(burst), float(window)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the Codio API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--students', type=int, default=120, help='Students across all sections')
+    parser.add_argument('--sections', type=int, default=4)
+    parser.add_argument('--assignment', default='About Me', help='Assignment name in every course')
+    parser.add_argument('--project-kb', type=int, default=200, help='Approximate size of each project')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every API call')
+    parser.add_argument('--p429', type=float, default=0.0, help='Probability of a random 429')
+    parser.add_argument('--p401', type=float, default=0.0, help='Probability of a random 401')
+    parser.add_argument('--rate-limit', type=parse_rate_limit, default=None, metavar='BURST/SECONDS',
+                        help="Enforced burst limit, e.g. 50/10 like Codio ('none' to disable)")
+    parser.add_argument('--export-polls', type=int, default=2, help='Polls before an export is done')
+    parser.add_argument('--bandwidth-kbps', type=int, help='Throttle archive downloads (KB/s per download)')
+    parser.add_argument('--p-drop', type=float, default=0.0,
+                        help='Probability of cutting an archive download off halfway')
+    parser.add_argument('--max-in-flight', type=int, default=0,
+                        help='Answer API calls beyond this many at once with a 429 (0 = no limit)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    courses = synthetic_courses(args.students, args.sections, args.assignment)
+    codio = FakeCodio(
+        courses,
+        project_bytes=args.project_kb * 1024,
+        latency=args.latency,
+        p429=args.p429,
+        p401=args.p401,
+        rate_limit=args.rate_limit,
+        export_polls=args.export_polls,
+        bandwidth=args.bandwidth_kbps * 1024 if args.bandwidth_kbps else None,
+        p_drop=args.p_drop,
+        max_in_flight=args.max_in_flight or None,
+        seed=args.seed
+    )
+    server = make_server(codio, args.host, args.port)
+    
+    base = f"http://{args.host}:{server.server_port}"
+    print(f"Fake Codio serving {args.students} students in {args.sections} sections on {base}")
+    print(f"  export CODIO_API_BASE_URL={base}/api/v1")
+    print(f"  export CODIO_OAUTH_URL={base}/oauth/token")
+    print("Sections (course ids):")
+    for course_id, course in courses.items():
+        print(f"  {course_id}: {len(course['students'])} students")
+    print(json.dumps({'ready': base, 'courses': list(courses)}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Rewriting for About Me Projects (25-26)
+
+Student pages typically show photos at width="200" while the browser downloads
+the full-size file. This stage parses each student's HTML and, for every local
+<img>:
+- Adds loading="lazy" and decoding="async" (the first image on a page stays eager)
+- Fills in width/height from the image file so the layout does not jump, unless
+  a style rule that could match the image sizes it (the attributes would then
+  fight the stylesheet and distort the image)
+- Adds a srcset of right-sized variants (<stem>-<w>w.<ext>) plus sizes
+
+Tags are edited by splicing at the parser's reported positions, so the rest of
+the student's markup is left byte-for-byte as written. Each HTML file's original
+is kept in cache/html, and a page is only reprocessed when it or one of its
+images changes. Students are processed in parallel.
+"""
+
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+from asset_store import link_or_copy
+
+
+HTML_EXTENSIONS = {'.html', '.htm'}
+VARIANT_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+# EXIF orientations that rotate the image by 90 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'variant_widths': [320, 640, 960, 1280],  # used when the page gives no display width
+    'min_savings': 0.2,                        # skip variants within 20% of the original width
+    'workers': None                            # defaults to os.cpu_count()
+}
+
+# Bumped when the rewriting rules change, so pages rewritten by older rules are redone
+REWRITE_VERSION = 2
+
+_STYLE_WIDTH = re.compile(r'(?:^|;)\s*width\s*:\s*(\d+)px', re.I)
+_STYLE_SIZE = re.compile(r'(?:^|;)\s*(?:(?:max|min)-)?(?:width|height)\s*:', re.I)
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+# Innermost style rules (rules inside @media blocks included)
+_CSS_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_CSS_SIZE_DECL = re.compile(r'(?<![-\w])(?:(?:max|min)-)?(?:width|height)\s*:', re.I)
+_CSS_COMBINATOR = re.compile(r'\s*[>+~]\s*|\s+')
+_CSS_PSEUDO = re.compile(r'::?[-\w]+(?:\([^)]*\))?')
+
+
+class _ImageTagParser(HTMLParser):
+    """Collects the position and attributes of every <img> start tag"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tags: List[Tuple[Tuple[int, int], str, Dict[str, Optional[str]]]] = []
+        self.picture_depth = 0
+        self.in_style = False
+        self.styles: List[str] = []
+        self.stylesheets: List[str] = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'picture':
+            self.picture_depth += 1
+        elif tag == 'style':
+            self.in_style = True
+        else:
+            self.handle_startendtag(tag, attrs)
+    
+    def handle_startendtag(self, tag, attrs):
+        attr_map = dict(attrs)
+        if tag == 'img' and not self.picture_depth:
+            self.tags.append((self.getpos(), self.get_starttag_text(), attr_map))
+        elif tag == 'link' and 'stylesheet' in (attr_map.get('rel') or '').lower() and attr_map.get('href'):
+            self.stylesheets.append(attr_map['href'])
+    
+    def handle_endtag(self, tag):
+        if tag == 'picture' and self.picture_depth:
+            self.picture_depth -= 1
+        elif tag == 'style':
+            self.in_style = False
+    
+    def handle_data(self, data):
+        if self.in_style:
+            self.styles.append(data)
+
+
+def _line_offsets(text: str) -> List[int]:
+    """Character offset of the start of each line (parser positions are line/column)"""
+    offsets = [0]
+    for match in re.finditer('\n', text):
+        offsets.append(match.end())
+    return offsets
+
+
+def _local_file(page: Path, src: Optional[str]) -> Optional[Path]:
+    """Resolve a relative src/href to a file in the student's project, if it is one"""
+    if not src:
+        return None
+    parts = urlsplit(src.strip())
+    if parts.scheme or parts.netloc or not parts.path or parts.path.startswith('/'):
+        return None
+    path = page.parent / unquote(parts.path)
+    return path if path.is_file() else None
+
+
+def _image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """Displayed (width, height) of an image, honouring EXIF rotation"""
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            if img.getexif().get(0x0112) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+            return width, height
+    except Exception:
+        return None
+
+
+def _sizing_subjects(css: str) -> List[Tuple[Optional[str], Set[str], Set[str]]]:
+    """(tag, classes, ids) of the element each width/height-setting selector applies to
+    
+    Only the last compound selector matters for whether a rule can reach an
+    image; its ancestors are assumed to match.
+    """
+    subjects = []
+    for prelude, body in _CSS_RULE.findall(_CSS_COMMENT.sub('', css)):
+        if prelude.strip().startswith('@') or not _CSS_SIZE_DECL.search(body):
+            continue
+        for selector in prelude.split(','):
+            parts = _CSS_COMBINATOR.split(selector.strip())
+            compound = _CSS_PSEUDO.sub('', parts[-1])
+            tag = re.match(r'[-\w]+', compound)
+            subjects.append((
+                tag.group().lower() if tag else None,
+                set(re.findall(r'\.([-\w]+)', compound)),
+                set(re.findall(r'#([-\w]+)', compound))
+            ))
+    return subjects
+
+
+def _int_attr(value: Optional[str]) -> Optional[int]:
+    if value and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def _file_signature(path: Path) -> List[int]:
+    st = path.stat()
+    # Store-backed files share one mtime, so the inode tells a replaced file apart
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class _PageRewriter:
+    """Rewrites the <img> tags of one HTML page"""
+    
+    def __init__(self, page: Path, settings: Dict, variants_dir: Path, created: Dict[str, str]):
+        self.page = page
+        self.settings = settings
+        self.variants_dir = variants_dir
+        self.created = created  # variants already placed for this student (site file -> cached)
+        self.dependencies: Dict[str, List[int]] = {}
+        self.variants: List[Tuple[str, str]] = []  # (site file, cached variant)
+        self.sizing_subjects: List[Tuple[Optional[str], Set[str], Set[str]]] = []
+    
+    def rewrite(self, text: str) -> str:
+        parser = _ImageTagParser()
+        parser.feed(text)
+        parser.close()
+        self.sizing_subjects = self._css_sizing_subjects(parser)
+        
+        offsets = _line_offsets(text)
+        pieces = []
+        last = 0
+        for index, ((line, col), raw, attrs) in enumerate(parser.tags):
+            start = offsets[line - 1] + col
+            if not raw or text[start:start + len(raw)] != raw:
+                continue
+            new_attrs = self._new_attributes(attrs, eager=(index == 0))
+            if not new_attrs:
+                continue
+            pieces.append(text[last:start])
+            pieces.append(self._splice(raw, new_attrs))
+            last = start + len(raw)
+        pieces.append(text[last:])
+        return ''.join(pieces)
+    
+    def _css_sizing_subjects(self, parser: _ImageTagParser) -> List[Tuple[Optional[str], Set[str], Set[str]]]:
+        """Selector subjects of the page's own CSS rules that set a width or height"""
+        css = list(parser.styles)
+        for href in parser.stylesheets:
+            sheet = _local_file(self.page, href)
+            if sheet is not None:
+                self.dependencies[os.path.relpath(sheet, self.page.parent)] = _file_signature(sheet)
+                css.append(sheet.read_text(encoding='utf-8', errors='replace'))
+        return [subject for text in css for subject in _sizing_subjects(text)]
+    
+    def _css_sizes(self, attrs: Dict[str, Optional[str]]) -> bool:
+        """Whether a sizing rule could apply to an <img> with these attributes"""
+        classes = set((attrs.get('class') or '').split())
+        ids = {(attrs.get('id') or '').strip()}
+        return any(
+            tag in (None, '*', 'img') and rule_classes <= classes and rule_ids <= ids
+            for tag, rule_classes, rule_ids in self.sizing_subjects
+        )
+    
+    @staticmethod
+    def _splice(raw: str, new_attrs: List[Tuple[str, str]]) -> str:
+        """Insert attributes just before the tag's closing > or />"""
+        body = raw[:-2] if raw.endswith('/>') else raw[:-1]
+        closing = raw[len(body):]
+        added = ''.join(f' {name}="{html.escape(value, quote=True)}"' for name, value in new_attrs)
+        stripped = body.rstrip()
+        return stripped + added + body[len(stripped):] + closing
+    
+    def _new_attributes(self, attrs: Dict[str, Optional[str]], eager: bool) -> List[Tuple[str, str]]:
+        new_attrs = []
+        if 'loading' not in attrs and not eager:
+            new_attrs.append(('loading', 'lazy'))
+        if 'decoding' not in attrs:
+            new_attrs.append(('decoding', 'async'))
+        
+        image = _local_file(self.page, attrs.get('src'))
+        if image is None:
+            return new_attrs
+        self.dependencies[os.path.relpath(image, self.page.parent)] = _file_signature(image)
+        size = _image_size(image)
+        if size is None:
+            return new_attrs
+        intrinsic_w, intrinsic_h = size
+        
+        # Keep the author's displayed size and fill in the missing dimension,
+        # unless CSS sizes the image (attributes would then fight the stylesheet)
+        styled = self._css_sizes(attrs) or _STYLE_SIZE.search(attrs.get('style') or '')
+        width = _int_attr(attrs.get('width'))
+        height = _int_attr(attrs.get('height'))
+        if styled:
+            pass
+        elif 'width' not in attrs and 'height' not in attrs:
+            new_attrs += [('width', str(intrinsic_w)), ('height', str(intrinsic_h))]
+        elif width and 'height' not in attrs:
+            new_attrs.append(('height', str(round(width * intrinsic_h / intrinsic_w))))
+        elif height and 'width' not in attrs:
+            new_attrs.append(('width', str(round(height * intrinsic_w / intrinsic_h))))
+        
+        if 'srcset' not in attrs:
+            new_attrs += self._srcset(attrs, image, intrinsic_w, intrinsic_h)
+        else:
+            self._restore_variants(attrs['srcset'], image, intrinsic_w)
+        return new_attrs
+    
+    def _restore_variants(self, srcset: str, image: Path, intrinsic_w: int) -> None:
+        """Recreate our own variants named in an existing srcset
+        
+        A page carried over from an earlier build keeps its srcset, but a later
+        stage may have changed it since, so it is processed again as new input.
+        """
+        pattern = re.compile(re.escape(image.stem) + r'-(\d+)w' + re.escape(image.suffix))
+        for candidate in srcset.split(','):
+            url = candidate.strip().split(' ')[0]
+            match = pattern.fullmatch(unquote(urlsplit(url).path).rpartition('/')[2])
+            if match and not (image.parent / match.group()).exists():
+                self._variant(image, int(match.group(1)), intrinsic_w)
+    
+    def _display_width(self, attrs: Dict[str, Optional[str]], intrinsic_w: int, intrinsic_h: int) -> Optional[int]:
+        """CSS pixel width the page displays the image at, when the markup says"""
+        width = _int_attr(attrs.get('width'))
+        if width:
+            return width
+        height = _int_attr(attrs.get('height'))
+        if height:
+            return round(height * intrinsic_w / intrinsic_h)
+        match = _STYLE_WIDTH.search(attrs.get('style') or '')
+        return int(match.group(1)) if match else None
+    
+    def _srcset(self, attrs: Dict[str, Optional[str]], image: Path,
+                intrinsic_w: int, intrinsic_h: int) -> List[Tuple[str, str]]:
+        if image.suffix.lower() not in VARIANT_EXTENSIONS:
+            return []
+        
+        display_w = self._display_width(attrs, intrinsic_w, intrinsic_h)
+        if display_w:
+            # 1x and 2x densities for the displayed size
+            targets = [display_w, display_w * 2]
+            sizes = f"{display_w}px"
+        else:
+            targets = list(self.settings['variant_widths'])
+            sizes = f"(max-width: {intrinsic_w}px) 100vw, {intrinsic_w}px"
+        
+        limit = intrinsic_w * (1 - self.settings['min_savings'])
+        widths = sorted({w for w in targets if w <= limit})
+        if not widths:
+            return []
+        
+        src_dir = unquote(urlsplit(attrs['src'].strip()).path).rpartition('/')[0]
+        prefix = quote(src_dir + '/') if src_dir else ''
+        candidates = []
+        for width in widths:
+            variant = self._variant(image, width, intrinsic_w)
+            if variant is not None:
+                candidates.append(f"{prefix}{quote(variant.name)} {width}w")
+        if not candidates:
+            return []
+        candidates.append(f"{prefix}{quote(image.name)} {intrinsic_w}w")
+        return [('srcset', ', '.join(candidates)), ('sizes', sizes)]
+    
+    def _variant(self, image: Path, width: int, intrinsic_w: int) -> Optional[Path]:
+        """Create (or reuse from the cache) a width-w copy of image beside it"""
+        dest = image.with_name(f"{image.stem}-{width}w{image.suffix}")
+        if str(dest) in self.created:
+            self.variants.append((str(dest), self.created[str(dest)]))
+            return dest
+        if dest.exists():
+            # A real student file by that name - never overwrite it
+            return None
+        
+        digest = _sha256(image.read_bytes())
+        cached = self.variants_dir / f"{digest}-{width}w{image.suffix.lower()}"
+        if not cached.exists():
+            self.variants_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cached.with_name(f".{cached.name}.{os.getpid()}.tmp")
+            with Image.open(image) as img:
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((width, round(width * img.height / img.width) or 1), Image.LANCZOS)
+                fmt = 'JPEG' if image.suffix.lower() in ('.jpg', '.jpeg') else img.format or image.suffix[1:].upper()
+                if fmt == 'JPEG' and img.mode not in ('RGB', 'L'):
+                    img = img.convert('RGB')
+                img.save(tmp_path, fmt, quality=82, optimize=True)
+            os.replace(tmp_path, cached)
+        
+        link_or_copy(cached, dest)
+        self.created[str(dest)] = str(cached)
+        self.variants.append((str(dest), str(cached)))
+        return dest
+
+
+def _rewrite_student(student_dir: str, previous: Dict[str, Dict], settings: Dict,
+                     cache_dir: str) -> Tuple[Dict[str, Dict], Dict[str, int]]:
+    """Process-pool worker: rewrite every HTML page of one student
+    
+    previous maps page paths (relative to student_dir) to their state from the
+    last build. Returns the new state and counts.
+    """
+    root = Path(student_dir)
+    cache = Path(cache_dir)
+    state = {}
+    counts = {'pages': 0, 'rewritten': 0, 'unchanged': 0}
+    created: Dict[str, str] = {}
+    
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            page = Path(dirpath) / filename
+            if page.suffix.lower() not in HTML_EXTENSIONS:
+                continue
+            counts['pages'] += 1
+            rel = page.relative_to(root).as_posix()
+            data = page.read_bytes()
+            current_hash = _sha256(data)
+            entry = previous.get(rel)
+            
+            if entry and current_hash == entry['output']:
+                # The page is our own output from last time; check its images and stylesheets
+                images_same = entry.get('version') == REWRITE_VERSION and all(
+                    (page.parent / name).is_file() and _file_signature(page.parent / name) == sig
+                    for name, sig in entry['dependencies'].items()
+                )
+                if images_same:
+                    for site_path, cached in entry['variants']:
+                        if str(root / site_path) not in created:
+                            link_or_copy(cached, root / site_path)
+                            created[str(root / site_path)] = cached
+                    state[rel] = entry
+                    counts['unchanged'] += 1
+                    continue
+                data = (cache / 'pages' / entry['input']).read_bytes()
+            
+            input_hash = _sha256(data)
+            pages_dir = cache / 'pages'
+            pages_dir.mkdir(parents=True, exist_ok=True)
+            if not (pages_dir / input_hash).exists():
+                tmp_path = pages_dir / f".{input_hash}.{os.getpid()}.tmp"
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, pages_dir / input_hash)
+            
+            rewriter = _PageRewriter(page, settings, cache / 'variants', created)
+            text = data.decode('utf-8', errors='surrogateescape')
+            output = rewriter.rewrite(text).encode('utf-8', errors='surrogateescape')
+            
+            # Replace rather than edit: site files may be hard links into the store
+            if output != data or current_hash != input_hash:
+                tmp_path = page.with_name(f".{page.name}.tmp")
+                tmp_path.write_bytes(output)
+                os.replace(tmp_path, page)
+            counts['rewritten'] += 1
+            
+            state[rel] = {
+                'version': REWRITE_VERSION,
+                'input': input_hash,
+                'output': _sha256(output),
+                'dependencies': rewriter.dependencies,
+                'variants': [(os.path.relpath(site, root), cached) for site, cached in rewriter.variants]
+            }
+    return state, counts
+
+
+class ResponsiveImageRewriter:
+    """Adds lazy loading, intrinsic dimensions and srcset to student pages"""
+    
+    def __init__(self, settings: Dict, cache_dir: Path, state_path: Path, logger: logging.Logger):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.cache_dir = cache_dir
+        self.state_path = state_path
+        self.logger = logger
+    
+    def rewrite_site(self, site_dir: Path, only: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Rewrite every student's (or only the given <section>/<slug>) pages under site_dir
+        
+        A targeted build keeps the recorded state of every other student.
+        """
+        if Image is None:
+            self.logger.warning("Pillow not installed - skipping responsive image rewriting (pip install Pillow)")
+            return {}
+        
+        previous = {}
+        if self.state_path.exists():
+            with open(self.state_path) as f:
+                previous = json.load(f)
+        
+        student_dirs = [
+            student_dir
+            for section_dir in sorted(site_dir.iterdir()) if section_dir.is_dir()
+            for student_dir in sorted(section_dir.iterdir()) if student_dir.is_dir()
+            if only is None or student_dir.relative_to(site_dir).as_posix() in only
+        ]
+        
+        state = {} if only is None else {key: value for key, value in previous.items() if key not in only}
+        totals = {'pages': 0, 'rewritten': 0, 'unchanged': 0}
+        workers = self.settings['workers'] or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for student_dir in student_dirs:
+                key = student_dir.relative_to(site_dir).as_posix()
+                futures[pool.submit(_rewrite_student, str(student_dir), previous.get(key, {}),
+                                    self.settings, str(self.cache_dir))] = key
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    state[key], counts = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Could not rewrite pages for {key}: {e}")
+                    continue
+                for name, count in counts.items():
+                    totals[name] += count
+        
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        
+        self.logger.info(
+            f"Responsive images: {totals['pages']} pages, {totals['rewritten']} rewritten, "
+            f"{totals['unchanged']} unchanged"
+        )
+        return totals
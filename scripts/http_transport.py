@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Transport for About Me Projects (25-26)
+
+One keep-alive requests.Session for everything a stage sends over HTTP: Codio
+API calls, archive downloads and link checks. Without it each bare
+requests.get/head opened (and threw away) its own TCP+TLS connection, and the
+API session's default pools held fewer connections than there were workers.
+
+- Each host gets a connection pool sized to the caller's concurrency
+  (max_concurrency for downloads, validation.max_workers for link checks)
+- Connections are kept alive and reused across requests and threads
+- The socket receive buffer and the read size for streamed archives are tunable
+  (``http`` in the config)
+- Requests and new connections are counted per host, so reuse can be checked
+"""
+
+import socket
+import threading
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+DEFAULT_SETTINGS = {
+    'socket_buffer_kb': 1024,  # Kernel receive buffer per connection (None = OS default)
+    'read_size_kb': 1024,      # Read size when streaming archive bodies
+    'max_hosts': 10            # Hosts whose pools are kept open at once
+}
+
+
+def _counting_pool(pool_cls, record: Callable[[str, str], None]):
+    """Subclass of a urllib3 pool class that reports each request and each new connection"""
+    class CountingConnection(pool_cls.ConnectionCls):
+        def connect(self):
+            record(self.host, 'connections')
+            super().connect()
+    
+    class CountingPool(pool_cls):
+        ConnectionCls = CountingConnection
+        
+        def _make_request(self, *args, **kwargs):
+            record(self.host, 'requests')
+            return super()._make_request(*args, **kwargs)
+    
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools count requests and connections, with extra socket options"""
+    
+    def __init__(self, record: Callable[[str, str], None], socket_options: list, **kwargs):
+        self._record = record
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs['socket_options'] = self._socket_options
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool(pool_cls, self._record)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class HTTPTransport:
+    """Pooled keep-alive session shared by every HTTP client in a stage"""
+    
+    def __init__(self, pool_size: int, settings: Optional[Dict] = None):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.pool_size = pool_size
+        self.read_size = self.settings['read_size_kb'] * 1024
+        
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        
+        socket_options = list(HTTPConnection.default_socket_options)
+        if self.settings['socket_buffer_kb']:
+            socket_options.append((socket.SOL_SOCKET, socket.SO_RCVBUF, self.settings['socket_buffer_kb'] * 1024))
+        
+        # pool_maxsize is per host: one connection for every worker that may hit it at once
+        adapter = _CountingAdapter(self._record, socket_options,
+                                   pool_connections=self.settings['max_hosts'], pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def _record(self, host: str, name: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(host, {'requests': 0, 'connections': 0})
+            counts[name] += 1
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, **kwargs)
+    
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.session.head(url, **kwargs)
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per host: requests sent, connections opened and requests that reused a connection"""
+        with self._lock:
+            return {
+                host: {**counts, 'reused': max(0, counts['requests'] - counts['connections'])}
+                for host, counts in sorted(self._stats.items())
+            }
+    
+    def summary(self) -> str:
+        """One-line description of connection reuse per host"""
+        parts = []
+        for host, counts in self.stats().items():
+            rate = counts['reused'] / counts['requests'] if counts['requests'] else 0.0
+            parts.append(f"{host} {counts['requests']} requests over {counts['connections']} connections "
+                         f"({rate:.0%} reused)")
+        return '; '.join(parts) or 'no requests'
+    
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Image Optimization Stage for About Me Projects (25-26)
+
+Students upload phone-camera photos straight into their projects. This stage
+runs on the built site tree and:
+- Downscales images larger than a configurable maximum dimension
+- Recompresses JPEG/PNG (keeping the original when that is not smaller)
+- Converts HEIC/HEIF (which browsers cannot render) to JPEG and updates the
+  student's HTML/CSS references
+
+Work is spread over a process pool and results are cached by source hash in
+cache/images, so an unchanged image is only ever processed once (an image that
+cannot be decoded is remembered as failed and left as it is).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+try:
+    import pillow_heif  # HEIC/HEIF decoding for Pillow
+    pillow_heif.register_heif_opener()
+except ImportError:
+    pillow_heif = None
+
+from asset_store import link_or_copy
+
+
+RASTER_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+HEIC_EXTENSIONS = {'.heic', '.heif'}
+REFERENCE_EXTENSIONS = {'.html', '.htm', '.css'}
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'max_dimension': 1600,   # longest side, in pixels
+    'jpeg_quality': 82,
+    'min_bytes': 150_000,    # smaller images are left alone
+    'convert_heic': True,
+    'workers': None          # defaults to os.cpu_count()
+}
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def replace_file(src: Path, dest: Path) -> None:
+    """Point dest at src's content without writing through dest's inode
+    
+    Site files are hard links into the asset store, so they must be replaced,
+    never rewritten in place.
+    """
+    tmp_path = dest.with_name(f".{dest.name}.tmp")
+    link_or_copy(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Replace a text file's contents via temp file + rename (see replace_file)"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8', errors='surrogateescape', newline='') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _optimize_image(source: str, output: str, settings: Dict) -> Dict:
+    """Process-pool worker: write an optimized copy of source to output
+    
+    Returns a cache record; ``keep`` means the original was already as good.
+    """
+    src_path = Path(source)
+    is_heic = src_path.suffix.lower() in HEIC_EXTENSIONS
+    original_bytes = src_path.stat().st_size
+    
+    with Image.open(src_path) as img:
+        # Phone photos rely on EXIF orientation, which is dropped on save
+        img = ImageOps.exif_transpose(img)
+        resized = max(img.size) > settings['max_dimension']
+        if resized:
+            img.thumbnail((settings['max_dimension'], settings['max_dimension']), Image.LANCZOS)
+        
+        if is_heic or src_path.suffix.lower() in ('.jpg', '.jpeg'):
+            fmt, ext = 'JPEG', '.jpg'
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            save_args = {'quality': settings['jpeg_quality'], 'optimize': True, 'progressive': True}
+        else:
+            fmt, ext = 'PNG', '.png'
+            save_args = {'optimize': True}
+        
+        img.save(output, fmt, **save_args)
+        width, height = img.size
+    
+    output_bytes = Path(output).stat().st_size
+    keep = not is_heic and not resized and output_bytes >= original_bytes
+    if keep:
+        os.unlink(output)
+    
+    return {
+        'keep': keep,
+        'ext': ext,
+        'width': width,
+        'height': height,
+        'original_bytes': original_bytes,
+        'output_bytes': original_bytes if keep else output_bytes
+    }
+
+
+class ImageOptimizer:
+    """Optimizes images in a built site tree with a persistent result cache"""
+    
+    def __init__(self, settings: Dict, cache_dir: Path, logger: logging.Logger):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.cache_dir = cache_dir
+        self.logger = logger
+        
+        self.index_path = cache_dir / 'index.json'
+        self.index: Dict[str, Dict] = {}
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+    
+    @property
+    def params_key(self) -> str:
+        """Settings that affect output - part of every cache key"""
+        return f"{self.settings['max_dimension']}-{self.settings['jpeg_quality']}"
+    
+    def _candidates(self, site_dir: Path, only: Optional[Set[str]] = None) -> List[Path]:
+        """Images in the site (or only the given <section>/<slug> directories) that this stage should look at"""
+        roots = [site_dir / rel for rel in sorted(only)] if only is not None else [site_dir]
+        candidates = []
+        for root in roots:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    ext = path.suffix.lower()
+                    if ext in HEIC_EXTENSIONS and self.settings['convert_heic']:
+                        candidates.append(path)
+                    elif ext in RASTER_EXTENSIONS and path.stat().st_size >= self.settings['min_bytes']:
+                        candidates.append(path)
+        return candidates
+    
+    def _output_path(self, source_hash: str, ext: str) -> Path:
+        return self.cache_dir / f"{source_hash}-{self.params_key}{ext}"
+    
+    def optimize_site(self, site_dir: Path, known_hashes: Optional[Dict[str, str]] = None,
+                      only: Optional[Set[str]] = None) -> Dict:
+        """Optimize every candidate image under site_dir in place (by replacement)
+        
+        known_hashes maps site-relative paths to the hash of their source file
+        (from the inventory). A carried-over file may already be optimized, but
+        replacing it with its source's cached output gives the same result.
+        ``only`` limits a targeted build to some <section>/<slug> directories.
+        """
+        if Image is None:
+            self.logger.warning("Pillow not installed - skipping image optimization (pip install Pillow)")
+            return {}
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        candidates = self._candidates(site_dir, only)
+        
+        # Hash every candidate not already known; only cache misses go to the pool
+        known_hashes = known_hashes or {}
+        jobs: Dict[str, List[Path]] = {}
+        for path in candidates:
+            source_hash = known_hashes.get(path.relative_to(site_dir).as_posix()) or file_sha256(path)
+            jobs.setdefault(source_hash, []).append(path)
+        
+        misses = [h for h in jobs if f"{h}:{self.params_key}" not in self.index]
+        stats = {'images': len(candidates), 'processed': len(misses),
+                 'cached': len(jobs) - len(misses), 'failed': 0,
+                 'bytes_before': 0, 'bytes_after': 0, 'heic_converted': 0}
+        
+        if misses:
+            self.logger.info(f"Optimizing {len(misses)} images ({stats['cached']} cached)")
+            workers = self.settings['workers'] or os.cpu_count()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(_optimize_image, str(jobs[h][0]),
+                                str(self._output_path(h, '.tmp')), self.settings): h
+                    for h in misses
+                }
+                for future in as_completed(futures):
+                    source_hash = futures[future]
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        self.logger.warning(f"Could not optimize {jobs[source_hash][0]}: {e}")
+                        self._output_path(source_hash, '.tmp').unlink(missing_ok=True)
+                        # Remembered too, so later builds do not decode the same broken file again
+                        self.index[f"{source_hash}:{self.params_key}"] = {'error': str(e)}
+                        continue
+                    if not record['keep']:
+                        os.replace(self._output_path(source_hash, '.tmp'),
+                                   self._output_path(source_hash, record['ext']))
+                    self._remember(source_hash, record)
+        
+        for source_hash, paths in jobs.items():
+            record = self.index.get(f"{source_hash}:{self.params_key}")
+            if record is None:
+                continue
+            if 'error' in record:
+                # Left as uploaded; only new content or new settings are tried again
+                stats['failed'] += 1
+                self.logger.debug(f"Skipping {paths[0]}, which failed before: {record['error']}")
+                continue
+            for path in paths:
+                self._apply(site_dir, path, source_hash, record, stats)
+        
+        self._save_index()
+        saved = stats['bytes_before'] - stats['bytes_after']
+        self.logger.info(
+            f"Images: {stats['images']} checked, {stats['processed']} processed, {stats['cached']} cached, "
+            f"{stats['heic_converted']} HEIC converted, {saved / 1024 / 1024:.1f} MB saved"
+        )
+        return stats
+    
+    def _remember(self, source_hash: str, record: Dict) -> None:
+        """Cache a result, and mark the optimized output itself as already optimal"""
+        key = f"{source_hash}:{self.params_key}"
+        self.index[key] = record
+        if not record['keep']:
+            output_hash = file_sha256(self._output_path(source_hash, record['ext']))
+            self.index.setdefault(f"{output_hash}:{self.params_key}", {**record, 'keep': True,
+                                                                       'original_bytes': record['output_bytes']})
+    
+    def _apply(self, site_dir: Path, path: Path, source_hash: str, record: Dict, stats: Dict) -> None:
+        """Swap the optimized output into the site for one image"""
+        stats['bytes_before'] += record['original_bytes']
+        stats['bytes_after'] += record['output_bytes']
+        if record['keep']:
+            return
+        
+        output = self._output_path(source_hash, record['ext'])
+        if path.suffix.lower() not in HEIC_EXTENSIONS:
+            replace_file(output, path)
+            return
+        
+        # HEIC: publish a JPEG beside it and point the student's pages at it
+        new_path = path.with_suffix(record['ext'])
+        if new_path.exists():
+            new_path = path.with_name(path.name + record['ext'])
+        replace_file(output, new_path)
+        path.unlink()
+        stats['heic_converted'] += 1
+        
+        rel = path.relative_to(site_dir).parts
+        student_dir = site_dir.joinpath(*rel[:2]) if len(rel) > 2 else path.parent
+        self._rewrite_references(student_dir, path.name, new_path.name)
+    
+    def _rewrite_references(self, student_dir: Path, old_name: str, new_name: str) -> None:
+        """Replace references to a renamed file in a student's HTML and CSS"""
+        replacements: List[Tuple[str, str]] = [(old_name, new_name)]
+        if quote(old_name) != old_name:
+            replacements.append((quote(old_name), quote(new_name)))
+        
+        for dirpath, _, filenames in os.walk(student_dir):
+            for filename in filenames:
+                page = Path(dirpath) / filename
+                if page.suffix.lower() not in REFERENCE_EXTENSIONS:
+                    continue
+                # Undecodable bytes and CRLF line endings round-trip unchanged
+                with open(page, encoding='utf-8', errors='surrogateescape', newline='') as f:
+                    text = f.read()
+                updated = text
+                for old, new in replacements:
+                    pattern = r'(?<![\w.-])' + re.escape(old) + r'(?![\w])'
+                    updated = re.sub(pattern, lambda _: new, updated)
+                if updated != text:
+                    write_text_atomic(page, updated)
+                    self.logger.debug(f"Updated reference {old_name} -> {new_name} in {page}")
+    
+    def _save_index(self) -> None:
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
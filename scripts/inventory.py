@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Project Inventory Scanner for About Me Projects (25-26)
+
+Each student's project is scanned once, right after extraction, with
+os.scandir. The inventory records every file's relative path, size, mtime,
+type and SHA-256 and is stored in the manifest, so entry-page detection,
+copying and the optimization stages read it instead of walking and hashing
+the same trees again.
+
+Files extracted through the asset store were hashed on the way in; the store's
+digests are passed to the scan so those files are not read again. Other large
+files are hashed with memory-mapped reads on a shared thread pool (hashlib
+releases the GIL while hashing).
+"""
+
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Files at least this big are hashed via mmap on the worker pool
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def file_digest(path: str, size: int) -> str:
+    """SHA-256 of a file, memory-mapping it when it is large"""
+    with open(path, 'rb') as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def inventory_fingerprint(inventory: List[Dict]) -> str:
+    """Content hash of a project from its inventory (relative paths + file hashes)"""
+    digest = hashlib.sha256()
+    for entry in inventory:
+        digest.update(entry['path'].encode('utf-8', errors='surrogateescape'))
+        digest.update(b'\0')
+        digest.update(entry['sha256'].encode('ascii'))
+        digest.update(b'\0')
+    return f"sha256:{digest.hexdigest()}"
+
+
+def entries_under(inventory: List[Dict], subdir: Optional[str]) -> List[Dict]:
+    """Inventory entries inside subdir, with paths made relative to it"""
+    if not subdir:
+        return inventory
+    prefix = subdir.rstrip('/') + '/'
+    return [
+        {**entry, 'path': entry['path'][len(prefix):]}
+        for entry in inventory if entry['path'].startswith(prefix)
+    ]
+
+
+class InventoryScanner:
+    """Scans project trees into inventories, sharing one hashing pool"""
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                        thread_name_prefix='inventory')
+    
+    def scan(self, root: Path, known_digests: Optional[Dict[Tuple[int, int], str]] = None) -> List[Dict]:
+        """Inventory of every file under root, sorted by relative path
+        
+        ``known_digests`` maps (st_dev, st_ino) to the SHA-256 of files already
+        hashed (AssetStore.digests); only the other files are read.
+        """
+        known_digests = known_digests or {}
+        entries = []
+        pending = []
+        stack = [('', str(root))]
+        
+        while stack:
+            rel_dir, dir_path = stack.pop()
+            with os.scandir(dir_path) as it:
+                for item in it:
+                    rel = f"{rel_dir}{item.name}"
+                    if item.is_dir(follow_symlinks=False):
+                        stack.append((rel + '/', item.path))
+                        continue
+                    if not item.is_file():
+                        # Dangling or non-regular entries are never published
+                        continue
+                    
+                    st = item.stat()
+                    entry = {
+                        'path': rel,
+                        'size': st.st_size,
+                        'mtime_ns': st.st_mtime_ns,
+                        'type': 'symlink' if item.is_symlink() else 'file'
+                    }
+                    digest = known_digests.get((st.st_dev, st.st_ino))
+                    if digest is not None:
+                        entry['sha256'] = digest
+                    elif st.st_size >= MMAP_THRESHOLD:
+                        pending.append((entry, self._pool.submit(file_digest, item.path, st.st_size)))
+                    else:
+                        entry['sha256'] = file_digest(item.path, st.st_size)
+                    entries.append(entry)
+        
+        for entry, future in pending:
+            entry['sha256'] = future.result()
+        
+        entries.sort(key=lambda entry: entry['path'])
+        return entries
+    
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+HTML/CSS Minification and Unused-CSS Pruning for About Me Projects (25-26)
+
+Many projects carry a copied stylesheet that their pages barely use. This
+optional stage:
+- Prunes CSS rules whose selectors cannot match any page in that student's project
+- Minifies CSS (comments and insignificant whitespace)
+- Minifies HTML (comments and whitespace between tags; <pre>, <textarea>,
+  <script> and tag contents are left alone, <style> blocks are minified as CSS)
+
+Pruning is conservative: a selector is kept unless one of its tag names,
+classes or ids appears nowhere in the student's HTML (or as a word in their
+JavaScript, inline on* handlers included, which may add classes at runtime),
+and anything the parser does not understand is kept as written. Scripts can
+still build class names the parser never sees, so pruning is off by default.
+Outputs are cached by content hash in cache/minify and students are processed
+in parallel.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+HTML_EXTENSIONS = {'.html', '.htm'}
+CSS_EXTENSIONS = {'.css'}
+JS_EXTENSIONS = {'.js'}
+
+# Elements browsers create even when the markup leaves them out
+IMPLICIT_TAGS = {'html', 'head', 'body', 'tbody'}
+
+# At-rules whose blocks hold ordinary style rules that can be pruned
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+DEFAULT_SETTINGS = {
+    'enabled': False,
+    'minify_html': True,
+    'minify_css': True,
+    'prune_css': False,
+    'workers': None  # defaults to os.cpu_count()
+}
+
+_HTML_TOKENS = re.compile(
+    r'<!--.*?-->|<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>|<[^>]*>',
+    re.I | re.S
+)
+_CSS_TOKENS = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|url\([^)]*\)', re.S)
+_SELECTOR_CLASS = re.compile(r'\.(-?[_a-zA-Z][-\w]*)')
+_SELECTOR_ID = re.compile(r'#(-?[_a-zA-Z][-\w]*)')
+_SELECTOR_TAG = re.compile(r'(?:^|[\s>+~(])([a-zA-Z][a-zA-Z0-9-]*)')
+
+
+def _sha256(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8', errors='surrogateescape'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and insignificant whitespace, leaving strings and url() intact"""
+    pieces = []
+    pending = ''  # CSS since the last string/url(); removed comments join their neighbours
+    last = 0
+    for match in _CSS_TOKENS.finditer(css):
+        pending += css[last:match.start()]
+        last = match.end()
+        if match.group().startswith('/*'):
+            pending += ' '
+            continue
+        pieces.append(_squeeze_css(pending))
+        pieces.append(match.group())
+        pending = ''
+    pieces.append(_squeeze_css(pending + css[last:]))
+    return ''.join(pieces).strip()
+
+
+def _squeeze_css(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r'(?<=[{;])([-\w]+):\s+', r'\1:', text)
+    return text.replace(';}', '}')
+
+
+def minify_html(text: str) -> str:
+    """Drop comments and collapse whitespace between tags"""
+    pieces = []
+    pending = ''  # text since the last kept token; removed comments join their neighbours
+    last = 0
+    for match in _HTML_TOKENS.finditer(text):
+        pending += text[last:match.start()]
+        last = match.end()
+        token = match.group()
+        if token.startswith('<!--') and not token.startswith('<!--[if'):
+            # Conditional comments, which some templates still carry, are kept
+            continue
+        pieces.append(_squeeze_text(pending))
+        pending = ''
+        if (match.group(1) or '').lower() == 'style':
+            open_end = token.index('>') + 1
+            close_start = token.lower().rindex('</style')
+            pieces.append(token[:open_end] + minify_css(token[open_end:close_start]) + token[close_start:])
+        else:
+            pieces.append(token)
+    pieces.append(_squeeze_text(pending + text[last:]))
+    return ''.join(pieces).strip() + '\n'
+
+
+def _squeeze_text(text: str) -> str:
+    return re.sub(r'\s+', lambda m: '\n' if '\n' in m.group() else ' ', text)
+
+
+class _UsageParser(HTMLParser):
+    """Collects the tag names, classes and ids a page uses"""
+    
+    def __init__(self, usage: Dict[str, Set[str]]):
+        super().__init__(convert_charrefs=True)
+        self.usage = usage
+        self.in_script = False
+    
+    def handle_starttag(self, tag, attrs):
+        self.usage['tags'].add(tag)
+        for name, value in attrs:
+            if name == 'class' and value:
+                self.usage['classes'].update(value.split())
+            elif name == 'id' and value:
+                self.usage['ids'].add(value.strip())
+            elif value and (name.startswith('on') or value.lstrip().lower().startswith('javascript:')):
+                # Inline handlers (onclick="this.classList.add('open')") are scripts too
+                self.usage['words'].update(re.findall(r'[-\w]+', value))
+        self.in_script = tag == 'script'
+    
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self.in_script = False
+    
+    def handle_data(self, data):
+        if self.in_script:
+            self.usage['words'].update(re.findall(r'[-\w]+', data))
+
+
+def _split_blocks(css: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+    """Split CSS into top-level (prelude, block body) pairs; body is None for ; statements
+    
+    Returns None when braces do not balance, so the caller can leave the CSS alone.
+    """
+    blocks = []
+    depth = 0
+    start = 0
+    body_start = 0
+    prelude = ''
+    i = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            end = css.find(char, i + 1)
+            while end != -1 and css[end - 1] == '\\':
+                end = css.find(char, end + 1)
+            if end == -1:
+                return None
+            i = end + 1
+            continue
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            if end == -1:
+                return None
+            i = end + 2
+            continue
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:i]
+                body_start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0:
+                blocks.append((prelude, css[body_start:i]))
+                start = i + 1
+        elif char == ';' and depth == 0:
+            blocks.append((css[start:i + 1], None))
+            start = i + 1
+        i += 1
+    if depth != 0:
+        return None
+    if css[start:].strip():
+        blocks.append((css[start:], None))
+    return blocks
+
+
+def _split_selectors(prelude: str) -> List[str]:
+    """Split a selector list on commas outside parentheses and brackets"""
+    selectors = []
+    depth = 0
+    current = ''
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            selectors.append(current)
+            current = ''
+        else:
+            current += char
+    selectors.append(current)
+    return selectors
+
+
+def selector_may_match(selector: str, usage: Dict[str, Set[str]]) -> bool:
+    """False only when the selector needs a tag, class or id the project never uses"""
+    # Comments and attribute selectors can hold anything; ignore their contents
+    simplified = re.sub(r'/\*.*?\*/', ' ', selector, flags=re.S)
+    simplified = re.sub(r'\[[^\]]*\]', '', simplified)
+    simplified = re.sub(r'::?[-\w]+(\([^)]*\))?', ' ', simplified)
+    for name in _SELECTOR_CLASS.findall(simplified):
+        if name not in usage['classes'] and name not in usage['words']:
+            return False
+    for name in _SELECTOR_ID.findall(simplified):
+        if name not in usage['ids'] and name not in usage['words']:
+            return False
+    for name in _SELECTOR_TAG.findall(re.sub(r'[.#][-\w]+', ' ', simplified)):
+        if name.lower() not in usage['tags']:
+            return False
+    return True
+
+
+def prune_css(css: str, usage: Dict[str, Set[str]]) -> str:
+    """Remove style rules that cannot match any element the project uses"""
+    blocks = _split_blocks(css)
+    if blocks is None:
+        return css
+    
+    kept = []
+    for prelude, body in blocks:
+        stripped = prelude.strip()
+        if body is None:
+            kept.append(prelude)
+        elif stripped.startswith('@'):
+            if stripped.lower().startswith(NESTED_AT_RULES):
+                inner = prune_css(body, usage)
+                if inner.strip():
+                    kept.append(f"{prelude}{{{inner}}}")
+            else:
+                # @font-face, @keyframes, @page... are not selector-based
+                kept.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [s for s in _split_selectors(prelude) if selector_may_match(s, usage)]
+            if selectors:
+                kept.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(kept)
+
+
+def _project_usage(root: Path) -> Dict[str, Set[str]]:
+    """Everything the student's pages and scripts could select on"""
+    usage = {'tags': set(IMPLICIT_TAGS), 'classes': set(), 'ids': set(), 'words': set()}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            ext = path.suffix.lower()
+            if ext in HTML_EXTENSIONS:
+                parser = _UsageParser(usage)
+                parser.feed(path.read_text(encoding='utf-8', errors='replace'))
+                parser.close()
+            elif ext in JS_EXTENSIONS:
+                usage['words'].update(re.findall(r'[-\w]+', path.read_text(encoding='utf-8', errors='replace')))
+    return usage
+
+
+def _usage_key(usage: Dict[str, Set[str]]) -> str:
+    return _sha256(json.dumps({k: sorted(v) for k, v in usage.items()}))
+
+
+def _minify_student(student_dir: str, settings: Dict, cache_dir: str) -> Dict[str, int]:
+    """Process-pool worker: minify (and prune) one student's HTML and CSS"""
+    root = Path(student_dir)
+    cache = Path(cache_dir)
+    counts = {'files': 0, 'cached': 0, 'bytes_before': 0, 'bytes_after': 0}
+    
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            if path.suffix.lower() in HTML_EXTENSIONS | CSS_EXTENSIONS:
+                files.append(path)
+    
+    usage_key = ''
+    usage = None
+    if settings['prune_css'] and any(p.suffix.lower() in CSS_EXTENSIONS for p in files):
+        usage = _project_usage(root)
+        usage_key = _usage_key(usage)
+    
+    for path in files:
+        is_css = path.suffix.lower() in CSS_EXTENSIONS
+        if (is_css and not (settings['minify_css'] or usage)) or (not is_css and not settings['minify_html']):
+            continue
+        
+        data = path.read_bytes()
+        # Files carried over from the last build are our own output; work from the original
+        origin = cache / 'origin' / hashlib.sha256(data).hexdigest()
+        source = origin.read_bytes() if origin.exists() else data
+        text = source.decode('utf-8', errors='surrogateescape')
+        mode = f"css:{settings['minify_css']}:{usage_key}" if is_css else 'html'
+        key = _sha256(mode, text)
+        cached = cache / key[:2] / key[2:]
+        
+        if cached.exists():
+            output = cached.read_bytes()
+            counts['cached'] += 1
+        else:
+            if is_css:
+                result = prune_css(text, usage) if usage else text
+                if settings['minify_css']:
+                    result = minify_css(result) + '\n'
+            else:
+                result = minify_html(text)
+            output = result.encode('utf-8', errors='surrogateescape')
+            if len(output) >= len(source):
+                output = source
+            _store(cached, output)
+            if output != source:
+                _store(cache / 'origin' / hashlib.sha256(output).hexdigest(), source)
+        
+        counts['files'] += 1
+        counts['bytes_before'] += len(source)
+        counts['bytes_after'] += len(output)
+        if output != data:
+            # Replace rather than edit: site files may be hard links into the store
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            tmp_path.write_bytes(output)
+            os.replace(tmp_path, path)
+    return counts
+
+
+def _store(path: Path, data: bytes) -> None:
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class AssetMinifier:
+    """Minifies student HTML/CSS and prunes unused CSS rules, with a content-hash cache"""
+    
+    def __init__(self, settings: Dict, cache_dir: Path, logger: logging.Logger):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.cache_dir = cache_dir
+        self.logger = logger
+    
+    def minify_site(self, site_dir: Path, only: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Minify every student's (or only the given <section>/<slug>) pages and stylesheets under site_dir"""
+        student_dirs = [
+            student_dir
+            for section_dir in sorted(site_dir.iterdir()) if section_dir.is_dir()
+            for student_dir in sorted(section_dir.iterdir()) if student_dir.is_dir()
+            if only is None or student_dir.relative_to(site_dir).as_posix() in only
+        ]
+        
+        totals = {'files': 0, 'cached': 0, 'bytes_before': 0, 'bytes_after': 0}
+        workers = self.settings['workers'] or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_minify_student, str(student_dir), self.settings, str(self.cache_dir)): student_dir
+                for student_dir in student_dirs
+            }
+            for future in as_completed(futures):
+                try:
+                    counts = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Could not minify {futures[future]}: {e}")
+                    continue
+                for name, count in counts.items():
+                    totals[name] += count
+        
+        saved = totals['bytes_before'] - totals['bytes_after']
+        self.logger.info(
+            f"Minify: {totals['files']} files ({totals['cached']} cached), "
+            f"{saved / 1024:.1f} KB saved"
+        )
+        return totals
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Page-Weight Audit for About Me Projects (25-26)
+
+For every student's entry page this adds up what a browser actually downloads
+on first load: the HTML, its stylesheets (and their @imports, fonts and
+background images), scripts, icons and <img> sources. An <img> with a srcset
+counts the candidate a browser would pick at the configured viewport width and
+pixel ratio rather than its full-size src. Text files are counted at their gzip
+size, as GitHub Pages serves them compressed. Each page is also
+checked for:
+- Render-blocking resources (stylesheets and synchronous scripts in <head>)
+- Oversized single assets
+- Large inline base64 blobs (data: URIs in HTML or CSS)
+
+Budgets come from the `page_weight` section of the config. The ranked report is
+written to reports/page_weight.json and page_weight.html (outside site/, so it is
+never published).
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from site_crawler import css_references, resolve_reference
+
+
+TEXT_EXTENSIONS = {'.html', '.htm', '.css', '.js', '.mjs', '.svg', '.json', '.txt', '.xml'}
+ASSET_TYPES = {
+    'css': {'.css'},
+    'script': {'.js', '.mjs'},
+    'image': {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.svg', '.ico', '.bmp'},
+    'font': {'.woff', '.woff2', '.ttf', '.otf', '.eot'}
+}
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'max_page_bytes': 2_000_000,     # Total transfer size of an entry page
+    'max_asset_bytes': 500_000,      # Any single file it loads
+    'max_inline_bytes': 20_000,      # Any single data: URI in HTML or CSS
+    'max_render_blocking': 4,        # Stylesheets and sync scripts in <head>
+    'viewport_width': 1366,          # CSS pixels, for choosing srcset candidates
+    'pixel_ratio': 1.0,              # Device pixels per CSS pixel, likewise
+    'fail_on_budget': False,         # Stop the build when a page is over budget
+    'workers': None                  # defaults to os.cpu_count()
+}
+
+_DATA_URI = re.compile(r'data:[\w/+.-]*(?:;[\w=.-]+)*;base64,[A-Za-z0-9+/=\s]+', re.I)
+_MEDIA_WIDTH = re.compile(r'\(\s*(min|max)-width\s*:\s*(\d+(?:\.\d+)?)px\s*\)', re.I)
+_LENGTH = re.compile(r'(\d+(?:\.\d+)?)(px|vw)\s*$', re.I)
+
+
+def asset_type(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in {'.html', '.htm'}:
+        return 'html'
+    for name, extensions in ASSET_TYPES.items():
+        if suffix in extensions:
+            return name
+    return 'other'
+
+
+def transfer_size(path: Path) -> Tuple[int, int]:
+    """(bytes on disk, bytes over the wire) for one file"""
+    data = path.read_bytes()
+    if path.suffix.lower() in TEXT_EXTENSIONS:
+        return len(data), len(gzip.compress(data, compresslevel=6, mtime=0))
+    return len(data), len(data)
+
+
+def _slot_width(sizes: str, viewport_width: int) -> float:
+    """CSS pixel width a sizes attribute gives the image (100vw when nothing applies)"""
+    for entry in (sizes or '').split(','):
+        entry = entry.strip()
+        length = _LENGTH.search(entry)
+        if not length:
+            continue
+        condition = entry[:length.start()]
+        if all((viewport_width >= float(value)) if kind.lower() == 'min' else (viewport_width <= float(value))
+               for kind, value in _MEDIA_WIDTH.findall(condition)):
+            value = float(length.group(1))
+            return value * viewport_width / 100 if length.group(2).lower() == 'vw' else value
+    return float(viewport_width)
+
+
+def srcset_choice(srcset: str, sizes: str, viewport_width: int, pixel_ratio: float) -> Optional[str]:
+    """URL a browser would load from a srcset: the smallest candidate covering the slot's device pixels"""
+    candidates = []
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        descriptor = parts[1].lower() if len(parts) > 1 else '1x'
+        try:
+            if descriptor.endswith('w'):
+                density = float(descriptor[:-1]) / _slot_width(sizes, viewport_width)
+            elif descriptor.endswith('x'):
+                density = float(descriptor[:-1])
+            else:
+                continue
+        except (ValueError, ZeroDivisionError):
+            continue
+        candidates.append((density, parts[0]))
+    if not candidates:
+        return None
+    covering = [candidate for candidate in candidates if candidate[0] >= pixel_ratio]
+    return min(covering)[1] if covering else max(candidates)[1]
+
+
+def inline_blobs(text: str) -> List[int]:
+    """Sizes of the base64 data: URIs in a piece of HTML or CSS"""
+    return [len(match.group()) for match in _DATA_URI.finditer(text)]
+
+
+class _PageLoadParser(HTMLParser):
+    """Collects the resources a page loads and which of them block rendering"""
+    
+    def __init__(self, viewport_width: int = DEFAULT_SETTINGS['viewport_width'],
+                 pixel_ratio: float = DEFAULT_SETTINGS['pixel_ratio']):
+        super().__init__(convert_charrefs=True)
+        self.viewport_width = viewport_width
+        self.pixel_ratio = pixel_ratio
+        self.resources: List[str] = []
+        self.stylesheets: List[str] = []
+        self.blocking: List[str] = []
+        self.inline_css: List[str] = []
+        self.in_head = True
+        self.in_style = False
+    
+    def handle_starttag(self, tag, attrs):
+        attr_map = {name: value or '' for name, value in attrs}
+        if tag == 'body':
+            self.in_head = False
+        elif tag == 'style':
+            self.in_style = True
+        elif tag == 'link' and attr_map.get('href'):
+            rel = attr_map.get('rel', '').lower().split()
+            if 'stylesheet' in rel:
+                self.stylesheets.append(attr_map['href'])
+                if self.in_head and attr_map.get('media', 'all').lower() not in ('print', 'none'):
+                    self.blocking.append(attr_map['href'])
+            elif 'icon' in rel or 'preload' in rel:
+                self.resources.append(attr_map['href'])
+        elif tag == 'script' and attr_map.get('src'):
+            self.resources.append(attr_map['src'])
+            sync = not ({'async', 'defer'} & attr_map.keys()) and attr_map.get('type') != 'module'
+            if self.in_head and sync:
+                self.blocking.append(attr_map['src'])
+        elif tag == 'img' and attr_map.get('srcset'):
+            chosen = srcset_choice(attr_map['srcset'], attr_map.get('sizes', ''),
+                                   self.viewport_width, self.pixel_ratio)
+            if chosen or attr_map.get('src'):
+                self.resources.append(chosen or attr_map['src'])
+        elif tag in ('img', 'input') and attr_map.get('src'):
+            if tag == 'img' or attr_map.get('type', '').lower() == 'image':
+                self.resources.append(attr_map['src'])
+        elif tag == 'video' and attr_map.get('poster'):
+            self.resources.append(attr_map['poster'])
+        
+        if attr_map.get('style'):
+            self.inline_css.append(attr_map['style'])
+    
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.in_head = False
+        elif tag == 'style':
+            self.in_style = False
+    
+    def handle_data(self, data):
+        if self.in_style:
+            self.inline_css.append(data)
+
+
+def _audit_page(site_dir: str, page_rel: str, base_path: str, settings: Dict) -> Dict:
+    """Process-pool worker: weigh one entry page and everything it loads"""
+    root = Path(site_dir)
+    page_text = (root / page_rel).read_text(encoding='utf-8', errors='replace')
+    parser = _PageLoadParser(settings['viewport_width'], settings['pixel_ratio'])
+    parser.feed(page_text)
+    parser.close()
+    
+    loaded: Dict[str, str] = {}  # site path -> how it was referenced
+    
+    def add(from_rel: str, url: str) -> Optional[str]:
+        target = resolve_reference(from_rel, url, base_path)
+        if target and target not in loaded and (root / target).is_file():
+            loaded[target] = url
+            return target
+        return None
+    
+    blobs = [('page', size) for size in inline_blobs(page_text)]
+    css_queue = [target for target in (add(page_rel, href) for href in parser.stylesheets) if target]
+    for url in parser.resources:
+        add(page_rel, url)
+    for css in parser.inline_css:
+        for _, url in css_references(css):
+            add(page_rel, url)
+    
+    # Stylesheets pull in fonts, images and further stylesheets
+    while css_queue:
+        sheet = css_queue.pop()
+        text = (root / sheet).read_text(encoding='utf-8', errors='replace')
+        blobs += [(sheet, size) for size in inline_blobs(text)]
+        for _, url in css_references(text):
+            target = add(sheet, url)
+            if target and asset_type(target) == 'css':
+                css_queue.append(target)
+    
+    raw_total, total = transfer_size(root / page_rel)
+    by_type = {'html': total}
+    assets = []
+    for target in sorted(loaded):
+        raw, transfer = transfer_size(root / target)
+        kind = asset_type(target)
+        raw_total += raw
+        total += transfer
+        by_type[kind] = by_type.get(kind, 0) + transfer
+        assets.append({'path': target, 'type': kind, 'bytes': transfer})
+    assets.sort(key=lambda asset: -asset['bytes'])
+    
+    oversized = [asset for asset in assets if asset['bytes'] > settings['max_asset_bytes']]
+    large_blobs = [{'in': where, 'bytes': size} for where, size in blobs if size > settings['max_inline_bytes']]
+    
+    violations = []
+    if total > settings['max_page_bytes']:
+        violations.append(f"page weight {total:,} B over {settings['max_page_bytes']:,} B")
+    if oversized:
+        violations.append(f"{len(oversized)} assets over {settings['max_asset_bytes']:,} B")
+    if large_blobs:
+        violations.append(f"{len(large_blobs)} inline data: URIs over {settings['max_inline_bytes']:,} B")
+    if len(parser.blocking) > settings['max_render_blocking']:
+        violations.append(f"{len(parser.blocking)} render-blocking resources")
+    
+    return {
+        'page': page_rel,
+        'transfer_bytes': total,
+        'raw_bytes': raw_total,
+        'requests': len(assets) + 1,
+        'by_type': by_type,
+        'largest_assets': assets[:5],
+        'oversized_assets': oversized,
+        'inline_blobs': large_blobs,
+        'render_blocking': parser.blocking,
+        'violations': violations
+    }
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class PageWeightAuditor:
+    """Weighs every student's entry page against the configured budgets"""
+    
+    def __init__(self, settings: Dict, pages_base_url: str, reports_dir: Path,
+                 logger: logging.Logger, jinja_env=None):
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.base_path = urlsplit(pages_base_url).path.rstrip('/')
+        self.reports_dir = reports_dir
+        self.logger = logger
+        self.jinja_env = jinja_env
+    
+    def audit(self, site_dir: Path, manifest: List[Dict], only: Optional[Set[str]] = None) -> Dict:
+        """Audit the entry page of every student in the manifest and write the reports
+        
+        With ``only`` just those <section>/<slug> pages are weighed again; every
+        other student's result is kept from the existing report.
+        """
+        start = time.time()
+        students = {}
+        for student in manifest:
+            if 'errors' in student or not student.get('entry_page_file'):
+                continue
+            page_rel = f"{student['section']}/{student['slug']}/{student['entry_page_file']}"
+            if (site_dir / page_rel).is_file():
+                students[page_rel] = student
+        
+        results = []
+        if only is not None:
+            previous = {result['page']: result for result in self._previous_results(self.reports_dir)}
+            kept = {page_rel for page_rel, student in students.items()
+                    if page_rel in previous and f"{student['section']}/{student['slug']}" not in only}
+            results = [previous[page_rel] for page_rel in kept]
+            students = {page_rel: student for page_rel, student in students.items() if page_rel not in kept}
+        
+        workers = self.settings['workers'] or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_audit_page, str(site_dir), page_rel, self.base_path, self.settings): page_rel
+                for page_rel in sorted(students)
+            }
+            for future in as_completed(futures):
+                student = students[futures[future]]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Could not audit {futures[future]}: {e}")
+                    continue
+                results.append({
+                    'section': student['section'],
+                    'slug': student['slug'],
+                    'name': student.get('display_name_short', student['slug']),
+                    **result
+                })
+        
+        # Heaviest first; ties broken by path so the report is stable
+        results.sort(key=lambda result: (-result['transfer_bytes'], result['page']))
+        sections = {}
+        for result in results:
+            section = sections.setdefault(result['section'], {'pages': 0, 'transfer_bytes': 0, 'over_budget': 0})
+            section['pages'] += 1
+            section['transfer_bytes'] += result['transfer_bytes']
+            section['over_budget'] += bool(result['violations'])
+        for section in sections.values():
+            section['average_bytes'] = section['transfer_bytes'] // section['pages']
+        
+        budgets = {name: value for name, value in self.settings.items() if name.startswith('max_')}
+        report = {
+            'budgets': budgets,
+            'pages': len(results),
+            'over_budget': sum(1 for result in results if result['violations']),
+            'transfer_bytes': sum(result['transfer_bytes'] for result in results),
+            'sections': dict(sorted(sections.items())),
+            'students': results
+        }
+        self._write_reports(self.reports_dir, report)
+        
+        self.logger.info(
+            f"Page weight: {report['pages']} entry pages, {report['transfer_bytes'] / 1024 / 1024:.1f} MB total, "
+            f"{report['over_budget']} over budget ({time.time() - start:.1f}s)"
+        )
+        return report
+    
+    def _previous_results(self, reports_dir: Path) -> List[Dict]:
+        try:
+            with open(reports_dir / 'page_weight.json', encoding='utf-8') as f:
+                return json.load(f)['students']
+        except (OSError, ValueError, KeyError):
+            return []
+    
+    def _write_reports(self, reports_dir: Path, report: Dict) -> None:
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(reports_dir / 'page_weight.json', json.dumps(report, indent=2))
+        if self.jinja_env is not None:
+            template = self.jinja_env.get_template('page_weight.html.j2')
+            _write_atomic(reports_dir / 'page_weight.html', template.render(report=report))
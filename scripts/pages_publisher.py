@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Incremental gh-pages Publisher for About Me Projects (25-26)
+
+Builds the gh-pages commit with git plumbing in a dedicated repository
+(cache/pages.git) instead of ghp-import's force-pushed snapshot:
+- Files whose (size, mtime, inode, ctime) are unchanged reuse their cached blob
+  id, so they are never hashed or written again. ctime is what catches a
+  rewrite: reproducible builds give every file the same mtime, and a full
+  rebuild can hand a deleted file's inode to a new one
+- New files are written with one `git hash-object -w --stdin-paths`
+- The tree is assembled with `update-index --index-info` + `write-tree`
+- The commit is made on top of the existing branch and pushed without --force,
+  so each push only transfers new objects
+- Only the branch tip is fetched (--depth 1), so the local repository holds one
+  snapshot plus what it has pushed since, never the branch's whole history
+
+The branch's history on the remote still grows by one commit (holding only the
+changed files) per publish; publishing once with ghp-import starts it afresh.
+
+The remote can be any git URL, including a local bare repository for testing.
+"""
+
+import json
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import tracing
+
+
+# Blob id of an empty file (used for .nojekyll)
+EMPTY_BLOB = 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+
+
+class PublishError(Exception):
+    """Raised when a git step of publishing fails"""
+
+
+class GitPagesPublisher:
+    """Publishes a directory to a branch using git plumbing and a blob cache"""
+    
+    def __init__(self, git_dir: Path, remote: str, branch: str, logger: logging.Logger,
+                 author_name: str = 'About Me Publisher', author_email: str = 'publisher@localhost'):
+        self.git_dir = git_dir
+        self.remote = remote
+        self.branch = branch
+        self.logger = logger
+        self.author_name = author_name
+        self.author_email = author_email
+        
+        self.cache_path = git_dir / 'blob_cache.json'
+        self.index_path = git_dir / 'publish-index'
+    
+    def _git(self, *args: str, input: Optional[bytes] = None, check: bool = True) -> subprocess.CompletedProcess:
+        env = {
+            **os.environ,
+            'GIT_DIR': str(self.git_dir),
+            'GIT_INDEX_FILE': str(self.index_path),
+            'GIT_AUTHOR_NAME': self.author_name,
+            'GIT_AUTHOR_EMAIL': self.author_email,
+            'GIT_COMMITTER_NAME': self.author_name,
+            'GIT_COMMITTER_EMAIL': self.author_email
+        }
+        result = subprocess.run(['git', *args], input=input, capture_output=True, env=env)
+        if check and result.returncode != 0:
+            raise PublishError(f"git {args[0]} failed: {result.stderr.decode(errors='replace').strip()}")
+        return result
+    
+    def _ensure_repo(self) -> None:
+        if not (self.git_dir / 'HEAD').exists():
+            self.git_dir.parent.mkdir(parents=True, exist_ok=True)
+            subprocess.run(['git', 'init', '--bare', '-q', str(self.git_dir)], check=True)
+    
+    def _fetch(self) -> Optional[str]:
+        """Fetch the remote branch; returns its commit id, or None if it does not exist yet"""
+        listing = self._git('ls-remote', '--heads', self.remote, self.branch).stdout.decode()
+        if not listing.strip():
+            return None
+        ref = f"refs/remotes/origin/{self.branch}"
+        self._git('fetch', '-q', '--no-tags', '--depth', '1', self.remote, f"+refs/heads/{self.branch}:{ref}")
+        return self._git('rev-parse', ref).stdout.decode().strip()
+    
+    def _load_cache(self) -> Dict[str, List]:
+        """rel path -> [size, mtime_ns, inode, ctime_ns, blob], dropping blobs missing from the repo"""
+        if not self.cache_path.exists():
+            return {}
+        with open(self.cache_path) as f:
+            cache = json.load(f)
+        
+        blobs = sorted({entry[-1] for entry in cache.values()})
+        if not blobs:
+            return cache
+        result = self._git('cat-file', '--batch-check', input=('\n'.join(blobs) + '\n').encode())
+        missing = {line.split()[0] for line in result.stdout.decode().splitlines() if line.endswith(' missing')}
+        return {path: entry for path, entry in cache.items() if entry[-1] not in missing}
+    
+    def _save_cache(self, cache: Dict[str, List]) -> None:
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.cache_path)
+    
+    def _blobs(self, site_dir: Path) -> Tuple[Dict[str, str], Dict[str, int]]:
+        """Blob id for every file under site_dir, hashing only new or changed files"""
+        cache = self._load_cache()
+        new_cache = {}
+        blobs = {}
+        to_hash = []
+        
+        for dirpath, _, filenames in os.walk(site_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                rel = os.path.relpath(path, site_dir).replace(os.sep, '/')
+                st = os.stat(path)
+                signature = [st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns]
+                cached = cache.get(rel)
+                if cached and cached[:-1] == signature:
+                    blobs[rel] = cached[-1]
+                    new_cache[rel] = cached
+                else:
+                    to_hash.append((rel, path, signature))
+        
+        if to_hash:
+            paths = ''.join(f"{path}\n" for _, path, _ in to_hash).encode('utf-8', errors='surrogateescape')
+            ids = self._git('hash-object', '-w', '--no-filters', '--stdin-paths', input=paths).stdout.decode().split()
+            for (rel, _, signature), blob in zip(to_hash, ids):
+                blobs[rel] = blob
+                new_cache[rel] = signature + [blob]
+        
+        self._save_cache(new_cache)
+        return blobs, {'files': len(blobs), 'hashed': len(to_hash), 'reused': len(blobs) - len(to_hash)}
+    
+    def _write_tree(self, blobs: Dict[str, str]) -> str:
+        if self.index_path.exists():
+            self.index_path.unlink()
+        records = b''.join(
+            f"100644 {blob}\t{rel}".encode('utf-8', errors='surrogateescape') + b'\0'
+            for rel, blob in sorted(blobs.items())
+        )
+        self._git('update-index', '-z', '--index-info', input=records)
+        return self._git('write-tree').stdout.decode().strip()
+    
+    def publish(self, site_dir: Path, message: str) -> Optional[str]:
+        """Commit site_dir on top of the remote branch and push it; returns the new commit or None"""
+        self._ensure_repo()
+        with tracing.span('publish.fetch', 'publish'):
+            parent = self._fetch()
+        
+        with tracing.span('publish.hash', 'publish') as span:
+            blobs, stats = self._blobs(site_dir)
+            span.update(stats)
+        if '.nojekyll' not in blobs:
+            # GitHub Pages would otherwise run the site through Jekyll
+            self._git('hash-object', '-w', '--stdin', input=b'')
+            blobs['.nojekyll'] = EMPTY_BLOB
+        with tracing.span('publish.tree', 'publish'):
+            tree = self._write_tree(blobs)
+        self.logger.info(f"Publish tree: {stats['files']} files, {stats['hashed']} hashed, {stats['reused']} reused")
+        
+        if parent and self._git('rev-parse', f"{parent}^{{tree}}").stdout.decode().strip() == tree:
+            self.logger.info(f"{self.branch} is already up to date - nothing to publish")
+            return None
+        
+        args = ['commit-tree', tree, '-m', message]
+        if parent:
+            args += ['-p', parent]
+        commit = self._git(*args).stdout.decode().strip()
+        
+        # Plain push: fails instead of overwriting if someone else moved the branch
+        with tracing.span('publish.push', 'publish'):
+            self._git('push', '-q', self.remote, f"{commit}:refs/heads/{self.branch}")
+        self._git('update-ref', f"refs/remotes/origin/{self.branch}", commit)
+        self.logger.info(f"Pushed {commit[:10]} to {self.branch}")
+        # Snapshots left behind by earlier shallow fetches are unreachable; let git drop them
+        self._git('gc', '--auto', '--quiet', check=False)
+        return commit
@@ -56,6 +56,9 @@ Usage:
 """
 
 import argparse
+import asyncio
+import ctypes
+import hashlib
 import json
 import logging
 import os
@@ -63,12 +66,16 @@ import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urljoin
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
 
 import requests
 import yaml
@@ -78,7 +85,24 @@ from tqdm import tqdm
 
 # Import our modified Codio downloader
 sys.path.append(str(Path(__file__).parent))
-from codio_downloader_images import CodioAPI, Config as CodioConfig
+import tracing
+from adaptive_concurrency import AdaptiveLimiter
+from asset_store import OBJECT_MTIME, AssetStore, dedup_report, link_or_copy
+from download_journal import DownloadJournal
+from html_rewriter import ResponsiveImageRewriter
+from http_transport import HTTPTransport
+from image_optimizer import ImageOptimizer
+from inventory import InventoryScanner, entries_under, inventory_fingerprint
+from minifier import AssetMinifier
+from page_weight import PageWeightAuditor
+from pages_publisher import GitPagesPublisher
+from site_crawler import SiteCrawler
+from state_store import StateStore
+from codio_downloader_images import AsyncCodioAPI, CodioAPI, ExportScheduler
+
+
+# Ways AboutMeDownloader can fetch projects (config `download_mode` / --download-mode)
+DOWNLOAD_MODES = ['threaded', 'async', 'two_phase', 'bulk']
 
 
 class PublishConfig:
@@ -125,22 +149,101 @@ class PublishConfig:
     def build_dir(self) -> Path:
         return self.project_root / self.data.get('build_dir', 'build')
     
+    @property
+    def cache_dir(self) -> Path:
+        # Caches and build state that must outlive build/, which a full download wipes
+        return self.project_root / self.data.get('cache_dir', 'cache')
+    
     @property
     def site_dir(self) -> Path:
         return self.project_root / self.data.get('output_dir', 'site')
     
+    @property
+    def reports_dir(self) -> Path:
+        # Kept outside site/ so reports are never published
+        return self.project_root / self.data.get('reports_dir', 'reports')
+    
     @property
     def templates_dir(self) -> Path:
         return self.project_root / 'templates'
     
     @property
     def exclude_globs(self) -> List[str]:
-        return self.data.get('exclude_globs', ['.git', '.guides', '.codio'])
+        # Added to the extractor's defaults (.git, .guides, .codio)
+        return self.data.get('exclude_globs', [])
     
     @property
     def max_concurrency(self) -> int:
         return self.data.get('max_concurrency', 8)
     
+    @property
+    def concurrency(self) -> Dict[str, Any]:
+        return self.data.get('concurrency', {})
+    
+    @property
+    def download_mode(self) -> str:
+        return self.data.get('download_mode', 'threaded')
+    
+    @property
+    def spool_archives(self) -> bool:
+        return self.data.get('spool_archives', False)
+    
+    @property
+    def async_max_in_flight(self) -> int:
+        return self.data.get('async_max_in_flight', 100)
+    
+    @property
+    def dedup_assets(self) -> bool:
+        return self.data.get('dedup_assets', True)
+    
+    @property
+    def state_db(self) -> Path:
+        return self.project_root / self.data.get('state_db', 'state/about_me.db')
+    
+    @property
+    def asset_store_dir(self) -> Path:
+        return self.cache_dir / 'objects'
+    
+    @property
+    def incremental_build(self) -> bool:
+        return self.data.get('incremental_build', True)
+    
+    @property
+    def reproducible_build(self) -> bool:
+        return self.data.get('reproducible_build', False)
+    
+    @property
+    def incremental_download(self) -> bool:
+        return self.data.get('incremental_download', False)
+    
+    @property
+    def image_optimization(self) -> Dict[str, Any]:
+        return self.data.get('image_optimization', {})
+    
+    @property
+    def image_cache_dir(self) -> Path:
+        return self.cache_dir / 'images'
+    
+    @property
+    def site_state_path(self) -> Path:
+        return self.cache_dir / 'site_state.json'
+    
+    @property
+    def responsive_images(self) -> Dict[str, Any]:
+        return self.data.get('responsive_images', {})
+    
+    @property
+    def minify(self) -> Dict[str, Any]:
+        return self.data.get('minify', {})
+    
+    @property
+    def page_weight(self) -> Dict[str, Any]:
+        return self.data.get('page_weight', {})
+    
+    @property
+    def http(self) -> Dict[str, Any]:
+        return self.data.get('http', {})
+    
     @property
     def timeouts(self) -> Dict[str, int]:
         return self.data.get('timeouts', {
@@ -148,6 +251,27 @@ class PublishConfig:
             'download_seconds': 120,
             'http_seconds': 20
         })
+    
+    @property
+    def publisher(self) -> Dict[str, str]:
+        github = self.github_config
+        defaults = {
+            'method': 'git',  # 'git' (incremental plumbing) or 'ghp-import'
+            'remote': f"https://github.com/{github['owner']}/{github['repo']}.git",
+            'author_name': 'About Me Publisher',
+            'author_email': 'publisher@localhost'
+        }
+        return {**defaults, **self.data.get('publisher', {})}
+    
+    @property
+    def validation(self) -> Dict[str, int]:
+        defaults = {
+            'max_workers': 16,           # Concurrent link checks
+            'per_host': 8,               # Concurrent checks against any one host
+            'abort_after_failures': 25,  # Stop early when the site is clearly down (0 = never)
+            'fail_on_broken_references': False  # Stop 'all' before publish if the offline check fails
+        }
+        return {**defaults, **self.data.get('validation', {})}
 
 
 def setup_logging(project_root: Path, verbose: bool = False) -> logging.Logger:
@@ -202,67 +326,342 @@ def slugify(text: str) -> str:
 
 
 
-def find_entry_page(project_dir: Path) -> Optional[Tuple[str, str]]:
-    """Find the main entry page (index.html) in a project directory or subdirectories
+def find_entry_page(inventory: List[Dict]) -> Optional[Tuple[str, str]]:
+    """Find the main entry page (index.html) in a project's inventory, at the root or in subdirectories
     Returns (relative_path, filename) or None if not found
     """
     # Search patterns for main page
     patterns = ['index.html', 'Index.html', 'INDEX.HTML', 'index.htm', 'Index.htm']
     fallback_patterns = ['home.html', 'start.html', 'main.html']
     
+    files = {entry['path'] for entry in inventory}
+    subdirs: Dict[str, set] = {}
+    for path in files:
+        parts = path.split('/')
+        if len(parts) > 2:
+            subdirs.setdefault(parts[0], set()).add(parts[1])
+        elif len(parts) == 2:
+            subdirs.setdefault(parts[0], set())
+    
     # First check the root directory
     for pattern in patterns:
-        entry_file = project_dir / pattern
-        if entry_file.exists() and entry_file.is_file():
+        if pattern in files:
             return ("", pattern)  # Empty path means root
     
     # Then search subdirectories (up to 2 levels deep)
-    for subdir in project_dir.iterdir():
-        if subdir.is_dir() and not subdir.name.startswith('.'):
+    for subdir in sorted(subdirs):
+        if subdir.startswith('.'):
+            continue
+        for pattern in patterns:
+            if f"{subdir}/{pattern}" in files:
+                return (subdir, pattern)
+        
+        # Check one level deeper
+        for subsubdir in sorted(subdirs[subdir]):
+            if subsubdir.startswith('.'):
+                continue
             for pattern in patterns:
-                entry_file = subdir / pattern
-                if entry_file.exists() and entry_file.is_file():
-                    return (subdir.name, pattern)
-            
-            # Check one level deeper
-            for subsubdir in subdir.iterdir():
-                if subsubdir.is_dir() and not subsubdir.name.startswith('.'):
-                    for pattern in patterns:
-                        entry_file = subsubdir / pattern
-                        if entry_file.exists() and entry_file.is_file():
-                            return (f"{subdir.name}/{subsubdir.name}", pattern)
+                if f"{subdir}/{subsubdir}/{pattern}" in files:
+                    return (f"{subdir}/{subsubdir}", pattern)
     
     # Fallback patterns in root only
     for pattern in fallback_patterns:
-        entry_file = project_dir / pattern
-        if entry_file.exists() and entry_file.is_file():
+        if pattern in files:
             return ("", pattern)
     
     return None
 
 
+# Progress fields Codio may use to report when a student's project last changed
+REMOTE_MODIFIED_FIELDS = ['lastModified', 'last_modified', 'modifiedAt', 'modified_at',
+                          'updatedAt', 'updated_at', 'lastActivity', 'last_activity']
+
+
+def student_key(section: str, codio_id: str) -> str:
+    """Stable manifest key for a student within a section"""
+    return f"{section}/{codio_id}"
+
+
+def student_prefix(rel: str) -> str:
+    """The <section>/<slug> a site-relative path belongs to"""
+    return '/'.join(rel.split('/')[:2])
+
+
+class RunFilter:
+    """The students a targeted run touches (--section, --student, --only-failed)
+    
+    Students are named by slug or Codio id. --only-failed means the students whose
+    manifest entry has errors; build and validate also take those whose last
+    download fixed an earlier failure. The set is resolved once, so every stage
+    of `all` works on the students its download retried.
+    """
+    
+    def __init__(self, sections: Optional[List[str]] = None, students: Optional[List[str]] = None,
+                 only_failed: bool = False):
+        self.sections = set(sections) if sections else None
+        self.students = set(students) if students else None
+        self.only_failed = only_failed
+        self.failed: Optional[Set[str]] = None
+        # Sections the named students were in last time (None if any is new to the store)
+        self.located: Optional[Set[str]] = None
+        self._bound = False
+    
+    def __str__(self) -> str:
+        parts = []
+        if self.sections:
+            parts.append(f"section {', '.join(sorted(self.sections))}")
+        if self.students:
+            parts.append(f"student {', '.join(sorted(self.students))}")
+        if self.only_failed:
+            parts.append('failed students')
+        return '; '.join(parts)
+    
+    def bind(self, store: StateStore, recovered: bool = False) -> None:
+        """Resolve failed students and known student sections from the state store (first call only)
+        
+        ``recovered`` also counts students a later download has since fixed.
+        """
+        if self._bound:
+            return
+        self._bound = True
+        if self.only_failed:
+            self.failed = {student_key(entry['section'], entry['codio_id'])
+                           for entry in store.students(status='failed', inventory=False)}
+            if recovered:
+                self.failed.update(store.recovered())
+        if self.students:
+            keys = [store.locate(name) for name in sorted(self.students)]
+            if all(keys):
+                self.located = {key.split('/')[0] for found in keys for key in found}
+    
+    def wants_section(self, section: str) -> bool:
+        """Whether any student in the section can match (so its roster is worth fetching)"""
+        if self.sections is not None and section not in self.sections:
+            return False
+        if self.failed is not None and not any(key.startswith(f"{section}/") for key in self.failed):
+            return False
+        return self.located is None or section in self.located
+    
+    def matches(self, section: str, slug: str, codio_id: str) -> bool:
+        if not self.wants_section(section):
+            return False
+        if self.students is not None and slug not in self.students and codio_id not in self.students:
+            return False
+        return self.failed is None or student_key(section, codio_id) in self.failed
+    
+    def matches_entry(self, entry: Dict) -> bool:
+        """matches() for a manifest entry"""
+        return self.matches(entry['section'], entry['slug'], entry['codio_id'])
+    
+    def query(self) -> Dict:
+        """StateStore.students()/roster() filters selecting the students matches_entry() accepts"""
+        return {'sections': self.sections, 'names': self.students, 'keys': self.failed}
+
+
+def import_manifest_json(config: PublishConfig, store: StateStore) -> None:
+    """Seed an empty state store from a build/manifest.json written before the store existed"""
+    manifest_path = config.build_dir / 'manifest.json'
+    if not store.student_count() and manifest_path.exists():
+        with open(manifest_path) as f:
+            store.import_manifest(json.load(f))
+
+
+def load_manifest(config: PublishConfig, store: StateStore, inventory: bool = True,
+                  run_filter: Optional[RunFilter] = None) -> List[Dict]:
+    """Every student in the state store (or the bound filter's), raising if no download has run yet"""
+    import_manifest_json(config, store)
+    if not store.student_count():
+        raise FileNotFoundError("No students in the state store or manifest.json. Run download first.")
+    filters = run_filter.query() if run_filter is not None else {}
+    return list(store.students(inventory=inventory, **filters))
+
+
+def write_manifest(config: PublishConfig, store: StateStore) -> None:
+    """Export build/manifest.json from the state store, in (section, slug) order"""
+    store.export_manifest(config.build_dir / 'manifest.json')
+
+
+def build_stamp(manifest: List[Dict], site_title: str) -> str:
+    """Short content-derived identifier for a build (same inputs, same stamp)"""
+    digest = hashlib.sha256(site_title.encode('utf-8'))
+    for student in sorted(manifest, key=lambda s: (s['section'], s.get('slug', ''))):
+        record = [student['section'], student.get('slug'), student.get('content_hash') or student.get('fingerprint'),
+                  student.get('entry_page'), 'errors' in student]
+        digest.update(json.dumps(record).encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def source_date_epoch(manifest: List[Dict]) -> int:
+    """Timestamp for a reproducible build: $SOURCE_DATE_EPOCH, else the newest project file"""
+    if os.getenv('SOURCE_DATE_EPOCH'):
+        return int(os.environ['SOURCE_DATE_EPOCH'])
+    # Store-backed files all carry OBJECT_MTIME, so the date comes from the mtimes
+    # recorded in Codio's archives; entries from before that was recorded fall back
+    # to their inventory
+    newest = 0
+    for student in manifest:
+        if student.get('source_mtime'):
+            newest = max(newest, student['source_mtime'])
+        else:
+            newest = max([newest, *(entry['mtime_ns'] // 1_000_000_000 for entry in student.get('inventory', []))])
+    return newest
+
+
+def normalize_mtimes(root: Path, epoch: int) -> None:
+    """Set every file and directory under root to the same mtime
+    
+    Files hard-linked to the asset store keep OBJECT_MTIME: changing theirs would
+    change the shared object and every other tree linked to it.
+    """
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            st = os.lstat(path)
+            if st.st_nlink > 1 and st.st_mtime == OBJECT_MTIME:
+                continue
+            os.utime(path, (epoch, epoch), follow_symlinks=False)
+        os.utime(dirpath, (epoch, epoch))
+
+
+def traced_by_student(items, name: str) -> Iterator:
+    """Pass through (rel, value) pairs, recording one trace span per <section>/<slug> run"""
+    if not tracing.enabled():
+        yield from items
+        return
+    current, start, count = None, 0.0, 0
+    for rel, value in items:
+        student = student_prefix(rel)
+        if student != current:
+            if current is not None:
+                tracing.record(name, 'student', start, time.perf_counter() - start, student=current, files=count)
+            current, start, count = student, time.perf_counter(), 0
+        count += 1
+        yield rel, value
+    if current is not None:
+        tracing.record(name, 'student', start, time.perf_counter() - start, student=current, files=count)
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write JSON to a temp file and rename it over path"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def swap_directories(new_dir: Path, target: Path) -> None:
+    """Put new_dir in place of target as atomically as the platform allows
+    
+    Uses renameat2(RENAME_EXCHANGE) on Linux; elsewhere two renames leave target
+    missing (never half-written) for an instant.
+    """
+    if target.exists():
+        exchanged = False
+        if sys.platform.startswith('linux'):
+            try:
+                libc = ctypes.CDLL(None, use_errno=True)
+                AT_FDCWD, RENAME_EXCHANGE = -100, 2
+                exchanged = libc.renameat2(AT_FDCWD, os.fsencode(new_dir),
+                                           AT_FDCWD, os.fsencode(target), RENAME_EXCHANGE) == 0
+            except (AttributeError, OSError):
+                exchanged = False
+        
+        if exchanged:
+            # new_dir now holds the previous tree
+            shutil.rmtree(new_dir)
+            return
+        
+        old_dir = target.with_name(f".{target.name}.old")
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        target.rename(old_dir)
+        new_dir.rename(target)
+        shutil.rmtree(old_dir)
+    else:
+        new_dir.rename(target)
+
+
+@contextmanager
+def serve_directory(directory: Path) -> Iterator[str]:
+    """Serve a directory over HTTP on a free local port; yields the base URL"""
+    class QuietHandler(SimpleHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like GitHub Pages
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def remote_fingerprint(progress: Optional[Dict]) -> Optional[str]:
+    """Fingerprint from Codio modification metadata, or None if the API gave none"""
+    if not progress:
+        return None
+    for field in REMOTE_MODIFIED_FIELDS:
+        value = progress.get(field)
+        if value:
+            return f"codio:{value}"
+    return None
+
+
 class AboutMeDownloader:
     """Downloads About Me projects from Codio with images included"""
     
-    def __init__(self, config: PublishConfig, logger: logging.Logger):
+    def __init__(self, config: PublishConfig, logger: logging.Logger,
+                 download_mode: Optional[str] = None):
         self.config = config
         self.logger = logger
+        self.download_mode = download_mode or config.download_mode
         
         # Initialize Codio API
-        client_id = os.getenv('CODIO_CLIENT_ID')
-        client_secret = os.getenv('CODIO_CLIENT_SECRET')
+        self.client_id = os.getenv('CODIO_CLIENT_ID')
+        self.client_secret = os.getenv('CODIO_CLIENT_SECRET')
         
-        if not client_id or not client_secret:
+        if not self.client_id or not self.client_secret:
             raise ValueError("CODIO_CLIENT_ID and CODIO_CLIENT_SECRET environment variables must be set")
         
-        self.codio_api = CodioAPI(client_id, client_secret, dry_run=False)
+        # Identical files across students are stored once and hard-linked into build/
+        self.asset_store = AssetStore(config.asset_store_dir) if config.dedup_assets else None
+        
+        # Every extracted project is inventoried once; later stages read the manifest
+        self.scanner = InventoryScanner()
+        
+        # Per-student progress, so an interrupted download can be resumed
+        self.journal = DownloadJournal(config.build_dir / 'download_journal.jsonl', logger)
+        # Archives are streamed straight into the extractor unless kept for a byte-level resume
+        self.spool_archives = config.spool_archives
+        
+        # Each finished student is written to the state store as it completes
+        self.store = StateStore(config.state_db, logger)
+        self.run_id: Optional[int] = None
+        self.run_filter: Optional[RunFilter] = None
+        
+        # Codio API requests in flight: starts at max_concurrency, then follows Codio's 429s and latency
+        self.limiter = AdaptiveLimiter(config.max_concurrency, config.concurrency, logger)
+        
+        # API calls and archive downloads share keep-alive connections, one per worker per host
+        self.transport = HTTPTransport(self.limiter.maximum, config.http)
+        
+        # The async mode opens its own client inside the event loop
+        self.codio_api = None
+        if self.download_mode != 'async':
+            self.codio_api = CodioAPI(self.client_id, self.client_secret, dry_run=False,
+                                      exclude_globs=config.exclude_globs,
+                                      asset_store=self.asset_store,
+                                      transport=self.transport,
+                                      limiter=self.limiter)
         self.manifest = []
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def download_student_project(self, section: str, student: Dict, assignment_id: str, course_id: str) -> Dict:
-        """Download a single student's project"""
+    def _student_identity(self, section: str, student: Dict) -> Dict:
+        """Names, slug and build directories for a student"""
         student_name = student['name']
-        student_id = student['id']
         
         # Determine username and slug
         username = student.get('username', '')
@@ -270,136 +669,400 @@ class AboutMeDownloader:
             username = slugify(student_name)
         
         student_slug = sanitize_name(username)
-        display_name = parse_display_name(student_name)
-        
-        # Set up directories
         section_dir = self.config.build_dir / section
-        student_dir = section_dir / student_slug
         
-        self.logger.info(f"Downloading {student_name} ({section}) -> {student_slug}")
+        return {
+            'section': section,
+            'name': student_name,
+            'id': student['id'],
+            'key': student_key(section, student['id']),
+            'username': username,
+            'slug': student_slug,
+            'display_name': parse_display_name(student_name),
+            'student_dir': section_dir / student_slug,
+            # Download into a staging directory so an unchanged tree can be left alone
+            'staging_dir': section_dir / f".{student_slug}.incoming",
+            # The archive as it arrives, kept until extracted so a download can resume
+            'spool': self.config.build_dir / '.partial' / section / f"{student_slug}.zst"
+        }
+    
+    def _unchanged_result(self, ident: Dict, previous: Optional[Dict],
+                          remote_fp: Optional[str]) -> Optional[Dict]:
+        """Previous manifest entry if Codio says nothing changed, else None"""
+        if (previous and remote_fp and previous.get('fingerprint') == remote_fp
+                and 'errors' not in previous and ident['student_dir'].exists()):
+            self.logger.info(f"Unchanged since last download: {ident['name']} ({ident['section']})")
+            return self._record_result(ident, {**previous, 'changed': False})
+        return None
+    
+    def _prepare_staging(self, ident: Dict) -> Path:
+        """Create an empty staging directory for a student's download"""
+        staging_dir = ident['staging_dir']
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        return staging_dir
+    
+    def _finalize_student(self, ident: Dict, previous: Optional[Dict],
+                          remote_fp: Optional[str], source_mtime: Optional[int] = None) -> Dict:
+        """Swap a downloaded staging tree into place and build its manifest entry
         
-        try:
-            # Clean up any existing files
-            if student_dir.exists():
-                shutil.rmtree(student_dir)
-            
-            student_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Download using Codio API - this downloads and extracts to student_dir
-            self.codio_api.download_student_assignment(
-                course_id, assignment_id, student_id, student_dir
-            )
-            
-            # Find entry page
-            entry_page_result = find_entry_page(student_dir)
-            warnings = []
-            entry_page_path = None
-            entry_page_file = None
-            
-            if entry_page_result:
-                entry_page_path, entry_page_file = entry_page_result
-                full_entry_path = f"{entry_page_path}/{entry_page_file}" if entry_page_path else entry_page_file
-                self.logger.debug(f"Found entry page for {student_name}: {full_entry_path}")
-            else:
-                warnings.append("No index.html or entry page found")
-                self.logger.warning(f"No entry page found for {student_name}")
-            
-            # Create student metadata
-            student_meta = {
-                'section': section,
-                'full_name': student_name,
-                'display_name_short': display_name,
-                'username': username,
-                'slug': student_slug,
-                'codio_id': student_id,
-                'local_path': str(student_dir.relative_to(self.config.project_root)),
-                'entry_page': full_entry_path if entry_page_result else None,
-                'entry_page_path': entry_page_path,
-                'entry_page_file': entry_page_file,
-                'warnings': warnings,
-                'download_timestamp': time.time()
-            }
-            
-            return student_meta
-            
-        except Exception as e:
-            error_msg = f"Failed to download {student_name}: {str(e)}"
-            self.logger.error(error_msg)
-            
-            return {
-                'section': section,
-                'full_name': student_name,
-                'display_name_short': display_name,
-                'username': username,
-                'slug': student_slug,
-                'codio_id': student_id,
-                'local_path': None,
-                'entry_page': None,
-                'entry_page_path': None,
-                'entry_page_file': None,
-                'warnings': [],
-                'errors': [error_msg],
-                'download_timestamp': time.time()
-            }
+        ``source_mtime`` is the newest file mtime in the project's archive; it is
+        read from the journal's extracted record when not given.
+        """
+        student_name = ident['name']
+        student_dir = ident['student_dir']
+        staging_dir = ident['staging_dir']
+        if source_mtime is None:
+            source_mtime = (self.journal.state(ident['key']) or {}).get('source_mtimes', {}).get('')
+        
+        known_digests = self.asset_store.digests if self.asset_store is not None else None
+        with tracing.span('scan', 'student', slug=ident['slug']) as span:
+            inventory = self.scanner.scan(staging_dir, known_digests)
+            span['files'] = len(inventory)
+        content_hash = inventory_fingerprint(inventory)
+        fingerprint = remote_fp or content_hash
+        
+        if (previous and previous.get('content_hash') == content_hash
+                and 'errors' not in previous and student_dir.exists()):
+            self.logger.info(f"Content unchanged: {student_name} ({ident['section']})")
+            shutil.rmtree(staging_dir)
+            return self._record_result(ident, {
+                **previous,
+                'inventory': previous.get('inventory') or self.scanner.scan(student_dir, known_digests),
+                'fingerprint': fingerprint,
+                'source_mtime': source_mtime or previous.get('source_mtime'),
+                'changed': False
+            })
+        
+        if student_dir.exists():
+            shutil.rmtree(student_dir)
+        staging_dir.rename(student_dir)
+        
+        # Find entry page
+        entry_page_result = find_entry_page(inventory)
+        warnings = []
+        entry_page_path = None
+        entry_page_file = None
+        
+        if entry_page_result:
+            entry_page_path, entry_page_file = entry_page_result
+            full_entry_path = f"{entry_page_path}/{entry_page_file}" if entry_page_path else entry_page_file
+            self.logger.debug(f"Found entry page for {student_name}: {full_entry_path}")
+        else:
+            warnings.append("No index.html or entry page found")
+            self.logger.warning(f"No entry page found for {student_name}")
+        
+        # Create student metadata
+        result = {
+            'section': ident['section'],
+            'full_name': student_name,
+            'display_name_short': ident['display_name'],
+            'username': ident['username'],
+            'slug': ident['slug'],
+            'codio_id': ident['id'],
+            'local_path': str(student_dir.relative_to(self.config.project_root)),
+            'entry_page': full_entry_path if entry_page_result else None,
+            'entry_page_path': entry_page_path,
+            'entry_page_file': entry_page_file,
+            'warnings': warnings,
+            'fingerprint': fingerprint,
+            'fingerprint_source': 'codio' if remote_fp else 'content',
+            'content_hash': content_hash,
+            'source_mtime': source_mtime,
+            'changed': True,
+            'download_timestamp': time.time(),
+            'inventory': inventory
+        }
+        return self._record_result(ident, result)
     
-    def download_all_students(self) -> List[Dict]:
-        """Download all student projects from all sections"""
-        self.logger.info("Starting download of all student projects")
+    def _record_result(self, ident: Dict, result: Dict) -> Dict:
+        """Journal a student's final manifest entry and commit it to the state store"""
+        if 'errors' in result:
+            self.journal.record(ident['key'], 'failed', error=result['errors'][0])
+        else:
+            self.journal.record(ident['key'], 'scanned', result=result)
+        self.store.save_student(result, self.run_id)
+        return result
+    
+    def _error_result(self, ident: Dict, error: Exception) -> Dict:
+        """Manifest entry for a student whose download failed"""
+        error_msg = f"Failed to download {ident['name']}: {str(error)}"
+        self.logger.error(error_msg)
         
-        # Clean build directory
-        if self.config.build_dir.exists():
-            shutil.rmtree(self.config.build_dir)
-        self.config.build_dir.mkdir(parents=True, exist_ok=True)
+        return self._record_result(ident, {
+            'section': ident['section'],
+            'full_name': ident['name'],
+            'display_name_short': ident['display_name'],
+            'username': ident['username'],
+            'slug': ident['slug'],
+            'codio_id': ident['id'],
+            'local_path': None,
+            'entry_page': None,
+            'entry_page_path': None,
+            'entry_page_file': None,
+            'warnings': [],
+            'errors': [error_msg],
+            'download_timestamp': time.time()
+        })
+    
+    def _journal_downloaded(self, key: str) -> Callable[[int], None]:
+        return lambda size: self.journal.record(key, 'downloaded', bytes=size)
+    
+    def _resume_from(self, key: str, spool: Optional[Path]) -> Tuple[Optional[str], Optional[str]]:
+        """(state, export URL) a journalled export can be resumed from, or (None, None)"""
+        entry = self.journal.state(key) or {}
+        if entry.get('state') == 'downloaded' and spool is not None and spool.exists():
+            return 'downloaded', entry.get('url')
+        if entry.get('state') == 'exported':
+            return 'exported', entry['url']
+        return None, None
+    
+    def _fetch_export(self, key: str, label: str, spool: Path, dest_dir: Path,
+                      start_export: Callable[[], str]) -> None:
+        """Download and extract an export into dest_dir, continuing a journalled one where possible
+        
+        A downloaded archive is extracted straight from its spool, and a partial
+        one resumes from its last byte; ``start_export`` runs only when neither works.
+        Archives are only spooled with ``spool_archives`` (or when resuming).
+        """
+        spool = spool if self.spool_archives else None
+        state, url = self._resume_from(key, spool)
+        if state == 'downloaded':
+            self.logger.info(f"Resuming {label} from its downloaded archive")
+            mtimes = self.codio_api.extractor.extract_assignment(spool, dest_dir)
+        else:
+            resumed = False
+            if state == 'exported':
+                self.logger.info(f"Resuming {label} from its last export")
+                try:
+                    mtimes = self.codio_api.download_export(url, dest_dir, spool, self._journal_downloaded(key))
+                    resumed = True
+                except Exception as e:
+                    self.logger.warning(f"Could not resume {label} ({e}); exporting again")
+                    if spool is not None:
+                        spool.unlink(missing_ok=True)
+            if not resumed:
+                url = start_export()
+                self.journal.record(key, 'exported', url=url)
+                mtimes = self.codio_api.download_export(url, dest_dir, spool, self._journal_downloaded(key))
+        
+        if spool is not None:
+            spool.unlink(missing_ok=True)
+        self.journal.record(key, 'extracted', source_mtimes=mtimes)
+    
+    async def _fetch_export_async(self, api: AsyncCodioAPI, key: str, label: str, spool: Path,
+                                  dest_dir: Path, start_export: Callable[[], Awaitable[str]]) -> None:
+        """Async counterpart of _fetch_export"""
+        spool = spool if self.spool_archives else None
+        state, url = self._resume_from(key, spool)
+        if state == 'downloaded':
+            self.logger.info(f"Resuming {label} from its downloaded archive")
+            mtimes = await asyncio.to_thread(api.extractor.extract_assignment, spool, dest_dir)
+        else:
+            resumed = False
+            if state == 'exported':
+                self.logger.info(f"Resuming {label} from its last export")
+                try:
+                    mtimes = await api.download_export(url, dest_dir, spool, self._journal_downloaded(key))
+                    resumed = True
+                except Exception as e:
+                    self.logger.warning(f"Could not resume {label} ({e}); exporting again")
+                    if spool is not None:
+                        spool.unlink(missing_ok=True)
+            if not resumed:
+                url = await start_export()
+                self.journal.record(key, 'exported', url=url)
+                mtimes = await api.download_export(url, dest_dir, spool, self._journal_downloaded(key))
+        
+        if spool is not None:
+            spool.unlink(missing_ok=True)
+        self.journal.record(key, 'extracted', source_mtimes=mtimes)
+    
+    def _already_extracted(self, ident: Dict) -> bool:
+        """True if a resumed student's staging tree was fully extracted before the interruption"""
+        entry = self.journal.state(ident['key']) or {}
+        return entry.get('state') == 'extracted' and ident['staging_dir'].exists()
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    def download_student_project(self, section: str, student: Dict, assignment_id: str, course_id: str,
+                                 previous: Optional[Dict] = None,
+                                 remote_fp: Optional[str] = None) -> Dict:
+        """Download a single student's project
+        
+        ``previous`` is the student's entry from the last manifest and ``remote_fp``
+        the fingerprint from Codio's modification metadata (incremental mode only).
+        """
+        ident = self._student_identity(section, student)
+        self.logger.info(f"Downloading {ident['name']} ({section}) -> {ident['slug']}")
         
+        with tracing.span('student', 'student', section=section, slug=ident['slug']):
+            try:
+                unchanged = self._unchanged_result(ident, previous, remote_fp)
+                if unchanged:
+                    return unchanged
+                
+                # Download using Codio API - this downloads and extracts to the staging dir
+                if not self._already_extracted(ident):
+                    staging_dir = self._prepare_staging(ident)
+                    self._fetch_export(
+                        ident['key'], ident['name'], ident['spool'], staging_dir,
+                        lambda: self.codio_api.export_student_assignment(course_id, assignment_id, ident['id'])
+                    )
+                
+                return self._finalize_student(ident, previous, remote_fp)
+                
+            except Exception as e:
+                return self._error_result(ident, e)
+    
+    async def _download_student_project_async(self, api: AsyncCodioAPI, in_flight: asyncio.Semaphore,
+                                              section: str, student: Dict, assignment_id: str,
+                                              course_id: str, previous: Optional[Dict] = None,
+                                              remote_fp: Optional[str] = None) -> Dict:
+        """Async counterpart of download_student_project"""
+        ident = self._student_identity(section, student)
+        
+        async with in_flight:
+            self.logger.info(f"Downloading {ident['name']} ({section}) -> {ident['slug']}")
+            with tracing.span('student', 'student', section=section, slug=ident['slug']):
+                try:
+                    unchanged = self._unchanged_result(ident, previous, remote_fp)
+                    if unchanged:
+                        return unchanged
+                    
+                    if not self._already_extracted(ident):
+                        staging_dir = self._prepare_staging(ident)
+                        await self._fetch_export_async(
+                            api, ident['key'], ident['name'], ident['spool'], staging_dir,
+                            lambda: api.export_student_assignment(course_id, assignment_id, ident['id'])
+                        )
+                    
+                    # Hashing and swapping the tree is disk bound - keep it off the event loop
+                    return await asyncio.to_thread(self._finalize_student, ident, previous, remote_fp)
+                    
+                except Exception as e:
+                    return self._error_result(ident, e)
+    
+    def _find_assignment(self, section: str, course: Dict) -> Optional[Dict]:
+        """Find the About Me assignment in a course"""
+        self.logger.info(f"Course: {course['name']}")
+        
+        for module in course.get('modules', []):
+            for a in module.get('assignments', []):
+                if a['name'].lower() == self.config.assignment_name.lower():
+                    self.logger.info(f"Found assignment: {a['name']} (ID: {a['id']})")
+                    return a
+        
+        self.logger.error(f"Assignment '{self.config.assignment_name}' not found in section {section}")
+        return None
+    
+    def _remote_fingerprints(self, progress: Optional[List[Dict]]) -> Dict[str, str]:
+        """Map Codio student id -> modification fingerprint, where the API reports one"""
+        fingerprints = {}
+        for entry in progress or []:
+            sid = entry.get('student_id') or entry.get('studentId') or entry.get('id')
+            fp = remote_fingerprint(entry)
+            if sid and fp:
+                fingerprints[sid] = fp
+        return fingerprints
+    
+    def _sections(self) -> Dict[str, str]:
+        """Sections to fetch rosters for (only those a targeted run can match)"""
+        if self.run_filter is None:
+            return self.config.sections
+        return {section: course_id for section, course_id in self.config.sections.items()
+                if self.run_filter.wants_section(section)}
+    
+    def _section_tasks(self, section: str, course_id: str, assignment_id: str, students: List[Dict],
+                       remote_fps: Dict[str, str], incremental: bool) -> List[Tuple]:
+        """Download tasks for one section (with each student's stored entry when incremental)"""
+        self.logger.info(f"Found {len(students)} students in section {section}")
+        if self.run_filter is not None:
+            students = [student for student in students if self.run_filter.matches(
+                section, self._student_identity(section, student)['slug'], student['id'])]
+            self.logger.info(f"{len(students)} of them match {self.run_filter}")
+        
+        return [
+            (section, student, assignment_id, course_id,
+             self.store.student(student_key(section, student['id'])) if incremental else None,
+             remote_fps.get(student['id']))
+            for student in students
+        ]
+    
+    def _collect_tasks(self, incremental: bool) -> List[Tuple]:
+        """Fetch course, roster and progress for each section, one section at a time"""
         all_tasks = []
         
-        # Gather all download tasks
-        for section, course_id in self.config.sections.items():
+        for section, course_id in self._sections().items():
             self.logger.info(f"Processing section {section} (course: {course_id})")
             
             try:
-                # Get course info
                 course = self.codio_api.get_course(course_id)
-                course_name = course['name']
-                self.logger.info(f"Course: {course_name}")
-                
-                # Find the About Me assignment
-                assignment = None
-                for module in course.get('modules', []):
-                    for a in module.get('assignments', []):
-                        if a['name'].lower() == self.config.assignment_name.lower():
-                            assignment = a
-                            break
-                    if assignment:
-                        break
-                
+                assignment = self._find_assignment(section, course)
                 if not assignment:
-                    self.logger.error(f"Assignment '{self.config.assignment_name}' not found in section {section}")
                     continue
                 
-                assignment_id = assignment['id']
-                self.logger.info(f"Found assignment: {assignment['name']} (ID: {assignment_id})")
-                
-                # Get students
                 students = self.codio_api.get_students(course_id)
-                self.logger.info(f"Found {len(students)} students in section {section}")
                 
-                # Add download tasks
-                for student in students:
-                    all_tasks.append((section, student, assignment_id, course_id))
-                    
+                # Fetched on full runs too, so the next incremental run has a baseline
+                try:
+                    progress = self.codio_api.get_assignment_progress(course_id, assignment['id'])
+                except Exception as e:
+                    self.logger.warning(f"Could not fetch assignment progress for {course_id}: {e}")
+                    progress = []
+                
+                all_tasks.extend(self._section_tasks(
+                    section, course_id, assignment['id'], students,
+                    self._remote_fingerprints(progress), incremental
+                ))
+                
             except Exception as e:
                 self.logger.error(f"Failed to process section {section}: {e}")
                 continue
         
-        self.logger.info(f"Total students to download: {len(all_tasks)}")
+        return all_tasks
+    
+    async def _collect_section_async(self, api: AsyncCodioAPI, section: str, course_id: str,
+                                     incremental: bool) -> List[Tuple]:
+        """Async counterpart of one iteration of _collect_tasks"""
+        self.logger.info(f"Processing section {section} (course: {course_id})")
+        
+        try:
+            course = await api.get_course(course_id)
+            assignment = self._find_assignment(section, course)
+            if not assignment:
+                return []
+            
+            students, progress = await asyncio.gather(
+                api.get_students(course_id),
+                api.get_assignment_progress(course_id, assignment['id']),
+                return_exceptions=True
+            )
+            if isinstance(students, BaseException):
+                raise students
+            if isinstance(progress, BaseException):
+                self.logger.warning(f"Could not fetch assignment progress for {course_id}: {progress}")
+                progress = []
+            
+            return self._section_tasks(section, course_id, assignment['id'], students,
+                                       self._remote_fingerprints(progress), incremental)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to process section {section}: {e}")
+            return []
+    
+    def _download_threaded(self, all_tasks: List[Tuple], workers: Optional[int] = None) -> List[Dict]:
+        """Download with a thread per in-flight student
         
-        # Download with concurrent execution
+        There is a thread for every slot the window can grow to; the window
+        itself decides how many of them talk to Codio at once.
+        """
         results = []
-        with ThreadPoolExecutor(max_workers=self.config.max_concurrency) as executor:
+        with ThreadPoolExecutor(max_workers=workers or self.limiter.maximum) as executor:
             future_to_task = {
-                executor.submit(self.download_student_project, section, student, assignment_id, course_id): (section, student['name'])
-                for section, student, assignment_id, course_id in all_tasks
+                executor.submit(self.download_student_project, section, student, assignment_id, course_id,
+                                previous, remote_fp): (section, student['name'])
+                for section, student, assignment_id, course_id, previous, remote_fp in all_tasks
             }
             
             with tqdm(total=len(all_tasks), desc="Downloading projects") as pbar:
@@ -411,14 +1074,361 @@ class AboutMeDownloader:
                     except Exception as e:
                         self.logger.error(f"Download task failed for {student_name} ({section}): {e}")
                     finally:
+                        pbar.set_postfix_str(self.limiter.postfix(), refresh=False)
                         pbar.update(1)
         
-        # Write manifest
-        manifest_path = self.config.build_dir / 'manifest.json'
-        with open(manifest_path, 'w') as f:
-            json.dump(results, f, indent=2)
+        return results
+    
+    def _download_two_phase(self, all_tasks: List[Tuple]) -> List[Dict]:
+        """Start every export up front, then poll them together and download as they finish"""
+        results = []
+        jobs = []
+        resumable = []
+        for task in all_tasks:
+            section, student, assignment_id, course_id, previous, remote_fp = task
+            ident = self._student_identity(section, student)
+            unchanged = self._unchanged_result(ident, previous, remote_fp)
+            if unchanged:
+                results.append(unchanged)
+                continue
+            if self._already_extracted(ident) or self._resume_from(ident['key'], ident['spool'])[0]:
+                # Their export already finished in the interrupted run
+                resumable.append(task)
+                continue
+            jobs.append({
+                'ident': ident, 'previous': previous, 'remote_fp': remote_fp,
+                'course_id': course_id, 'assignment_id': assignment_id, 'student_id': ident['id']
+            })
+        
+        def on_ready(job: Dict, url: str) -> Dict:
+            ident = job['ident']
+            self.logger.info(f"Downloading {ident['name']} ({ident['section']}) -> {ident['slug']}")
+            with tracing.span('student', 'student', section=ident['section'], slug=ident['slug']):
+                try:
+                    staging_dir = self._prepare_staging(ident)
+                    self._fetch_export(ident['key'], ident['name'], ident['spool'], staging_dir, lambda: url)
+                    return self._finalize_student(ident, job['previous'], job['remote_fp'])
+                except Exception as e:
+                    return self._error_result(ident, e)
+        
+        def on_error(job: Dict, error: Exception) -> Dict:
+            return self._error_result(job['ident'], error)
+        
+        if resumable:
+            self.logger.info(f"Resuming {len(resumable)} interrupted downloads")
+            results.extend(self._download_threaded(resumable))
+        
+        scheduler = ExportScheduler(self.codio_api, max_workers=self.limiter.maximum)
+        with tqdm(total=len(all_tasks), initial=len(results), desc="Downloading projects") as pbar:
+            for result in scheduler.run(jobs, on_ready, on_error):
+                results.append(result)
+                pbar.set_postfix_str(self.limiter.postfix(), refresh=False)
+                pbar.update(1)
+        
+        return results
+    
+    def _match_bulk_dirs(self, bulk_root: Path, students: List[Dict]) -> Dict[str, Path]:
+        """Map Codio student id -> that student's folder in a bulk export"""
+        def normalize(text: str) -> str:
+            return re.sub(r'[^a-z0-9]', '', str(text).lower())
+        
+        def match(entries: List[Path]) -> Dict[str, Path]:
+            matches = {}
+            claimed = set()
+            for student in students:
+                candidates = {normalize(student['id'])}
+                for field in ('username', 'login', 'name'):
+                    if student.get(field):
+                        candidates.add(normalize(student[field]))
+                if student.get('email'):
+                    candidates.add(normalize(student['email'].split('@')[0]))
+                candidates.discard('')
+                
+                # Exact folder-name match first, then a folder name that embeds the Codio id
+                found = [p for p in entries if normalize(p.name) in candidates]
+                if not found:
+                    found = [p for p in entries if normalize(student['id']) in normalize(p.name)]
+                if len(found) == 1 and found[0] not in claimed:
+                    matches[student['id']] = found[0]
+                    claimed.add(found[0])
+            return matches
+        
+        entries = [p for p in bulk_root.iterdir() if p.is_dir() and not p.name.startswith('.')]
+        matches = match(entries)
+        # Some archives wrap everything in a single assignment folder (even for one student)
+        if len(entries) == 1 and len(matches) < len(students):
+            wrapped = match([p for p in entries[0].iterdir() if p.is_dir()])
+            if len(wrapped) > len(matches):
+                matches = wrapped
+        return matches
+    
+    def _download_section_bulk(self, section: str, course_id: str, assignment_id: str,
+                               tasks: List[Tuple]) -> Tuple[List[Dict], List[Tuple]]:
+        """Download one section from a single bulk export
+        
+        Returns manifest entries for the students found in the archive and the
+        tasks that still need a per-student export.
+        """
+        results = []
+        to_fetch = []
+        for task in tasks:
+            _, student, _, _, previous, remote_fp = task
+            unchanged = self._unchanged_result(self._student_identity(section, student), previous, remote_fp)
+            if unchanged:
+                results.append(unchanged)
+            else:
+                to_fetch.append(task)
+        
+        if not to_fetch:
+            return results, []
+        
+        bulk_root = self.config.build_dir / '.bulk' / section
+        bulk_key = f"bulk:{section}"
+        try:
+            entry = self.journal.state(bulk_key) or {}
+            if entry.get('state') == 'extracted' and bulk_root.exists():
+                self.logger.info(f"Resuming section {section} from its extracted bulk export")
+            else:
+                self.logger.info(f"Bulk exporting {len(to_fetch)} students in section {section}")
+                self._fetch_export(
+                    bulk_key, f"bulk export of section {section}",
+                    self.config.build_dir / '.partial' / f"{section}.bulk.zst", bulk_root,
+                    lambda: self.codio_api.export_assignment(course_id, assignment_id)
+                )
+            matches = self._match_bulk_dirs(bulk_root, [task[1] for task in to_fetch])
+            bulk_mtimes = (self.journal.state(bulk_key) or {}).get('source_mtimes', {})
+        except Exception as e:
+            self.logger.error(f"Bulk export failed for section {section}, falling back per student: {e}")
+            shutil.rmtree(bulk_root, ignore_errors=True)
+            return results, to_fetch
+        
+        missing = []
+        for task in to_fetch:
+            _, student, _, _, previous, remote_fp = task
+            project_dir = matches.get(student['id'])
+            if project_dir is None:
+                missing.append(task)
+                continue
+            
+            ident = self._student_identity(section, student)
+            try:
+                staging_dir = self._prepare_staging(ident)
+                staging_dir.rmdir()
+                source_mtime = bulk_mtimes.get(project_dir.relative_to(bulk_root).as_posix())
+                shutil.move(str(project_dir), str(staging_dir))
+                results.append(self._finalize_student(ident, previous, remote_fp, source_mtime))
+            except Exception as e:
+                results.append(self._error_result(ident, e))
+        
+        shutil.rmtree(bulk_root, ignore_errors=True)
+        if missing:
+            self.logger.warning(f"{len(missing)} students missing from bulk export of section {section}")
+        return results, missing
+    
+    def _download_bulk(self, all_tasks: List[Tuple]) -> List[Dict]:
+        """One bulk export per section, with per-student fallback for anyone missing"""
+        sections = {}
+        for task in all_tasks:
+            section, _, assignment_id, course_id, _, _ = task
+            sections.setdefault((section, course_id, assignment_id), []).append(task)
+        
+        results = []
+        fallback = []
+        with ThreadPoolExecutor(max_workers=max(1, len(sections))) as executor:
+            futures = [
+                executor.submit(self._download_section_bulk, section, course_id, assignment_id, tasks)
+                for (section, course_id, assignment_id), tasks in sections.items()
+            ]
+            for future in as_completed(futures):
+                section_results, missing = future.result()
+                results.extend(section_results)
+                fallback.extend(missing)
+        
+        if fallback:
+            self.logger.info(f"Downloading {len(fallback)} students individually")
+            results.extend(self._download_threaded(fallback))
+        
+        return results
+    
+    async def _download_all_async(self, incremental: bool) -> List[Dict]:
+        """Fetch every section's metadata concurrently, then download on one event loop"""
+        max_in_flight = self.config.async_max_in_flight
+        
+        async with AsyncCodioAPI(self.client_id, self.client_secret,
+                                 max_connections=max_in_flight,
+                                 exclude_globs=self.config.exclude_globs,
+                                 asset_store=self.asset_store,
+                                 read_size=self.transport.read_size,
+                                 limiter=self.limiter) as api:
+            section_tasks = await asyncio.gather(*[
+                self._collect_section_async(api, section, course_id, incremental)
+                for section, course_id in self._sections().items()
+            ])
+            all_tasks = [task for tasks in section_tasks for task in tasks]
+            self.logger.info(f"Total students to download: {len(all_tasks)}")
+            results, all_tasks = self._split_resumed(all_tasks)
+            
+            in_flight = asyncio.Semaphore(max_in_flight)
+            coroutines = [
+                self._download_student_project_async(api, in_flight, *task)
+                for task in all_tasks
+            ]
+            
+            with tqdm(total=len(coroutines), desc="Downloading projects") as pbar:
+                for next_result in asyncio.as_completed(coroutines):
+                    results.append(await next_result)
+                    pbar.set_postfix_str(self.limiter.postfix(), refresh=False)
+                    pbar.update(1)
+            
+            retry = self._failed_tasks(all_tasks, results)
+            if retry:
+                workers = self._start_retry_pass(retry)
+                in_flight = asyncio.Semaphore(workers)
+                retried = await asyncio.gather(*[
+                    self._download_student_project_async(api, in_flight, *task) for task in retry
+                ])
+                results = self._merge_retried(results, retried)
         
-        self.logger.info(f"Downloaded {len(results)} student projects")
+        return results
+    
+    def _failed_tasks(self, all_tasks: List[Tuple], results: List[Dict]) -> List[Tuple]:
+        """Tasks for the students whose download failed in this run"""
+        failed = {student_key(r['section'], r['codio_id']) for r in results if 'errors' in r}
+        return [task for task in all_tasks if student_key(task[0], task[1]['id']) in failed]
+    
+    def _start_retry_pass(self, retry: List[Tuple]) -> int:
+        """Narrow the window for the retry pass and return its worker count"""
+        workers = max(1, min(self.limiter.limit, self.limiter.settings['retry_workers']))
+        self.limiter.resize(workers)
+        self.logger.info(f"Retrying {len(retry)} failed students with {workers} workers")
+        return workers
+    
+    def _merge_retried(self, results: List[Dict], retried: List[Dict]) -> List[Dict]:
+        """Replace the failed entries with their retry results"""
+        by_key = {student_key(r['section'], r['codio_id']): r for r in retried}
+        recovered = sum(1 for r in retried if 'errors' not in r)
+        self.logger.info(f"Retry pass recovered {recovered} of {len(retried)} students")
+        return [by_key.get(student_key(r['section'], r['codio_id']), r) for r in results]
+    
+    def _retry_failed(self, all_tasks: List[Tuple], results: List[Dict]) -> List[Dict]:
+        """Give every failed student one more try, a few at a time, once the main pass is done"""
+        retry = self._failed_tasks(all_tasks, results)
+        if not retry:
+            return results
+        workers = self._start_retry_pass(retry)
+        return self._merge_retried(results, self._download_threaded(retry, workers))
+    
+    def _split_resumed(self, all_tasks: List[Tuple]) -> Tuple[List[Dict], List[Tuple]]:
+        """Manifest entries the journal already finished, and the tasks still to run"""
+        results = []
+        remaining = []
+        for task in all_tasks:
+            section, student = task[0], task[1]
+            entry = self.journal.state(student_key(section, student['id'])) or {}
+            result = entry.get('result')
+            if (entry.get('state') == 'scanned' and result and 'errors' not in result
+                    and (self.config.project_root / result['local_path']).exists()):
+                self.store.save_student(result, self.run_id)
+                results.append(result)
+            else:
+                remaining.append(task)
+        
+        if results:
+            self.logger.info(f"Resume: {len(results)} students already finished, {len(remaining)} to go")
+        return results, remaining
+    
+    def download_all_students(self, incremental: bool = False, resume: bool = False,
+                              run_filter: Optional[RunFilter] = None) -> List[Dict]:
+        """Download all student projects from all sections
+        
+        In incremental mode the build directory is kept and students whose
+        fingerprint matches the previous manifest are not re-extracted. With
+        ``resume`` an interrupted run continues from the download journal.
+        A ``run_filter`` downloads only the matching students and merges them
+        into the existing build/ and state store.
+        """
+        self.run_filter = run_filter
+        if run_filter is not None:
+            import_manifest_json(self.config, self.store)
+            run_filter.bind(self.store)
+            self.logger.info(f"Starting targeted download of {run_filter} ({self.download_mode} mode)")
+        else:
+            self.logger.info(f"Starting download of all student projects ({self.download_mode} mode)")
+        
+        if resume and not self.journal.load():
+            self.logger.info("No download journal to resume from; starting a fresh download")
+            resume = False
+        elif resume and self.journal.completed:
+            self.logger.info("The last download finished; starting a fresh download")
+            resume = False
+        
+        if incremental:
+            self.logger.info(f"Incremental mode: {self.store.student_count()} students from the last download")
+        elif resume:
+            self.logger.info(f"Resuming the interrupted download ({len(self.journal.states)} journalled)")
+            # Continue any archives the interrupted run spooled, and spool this run's too
+            self.spool_archives = True
+        elif run_filter is not None:
+            # Everyone else's projects and entries stay as they are
+            self.logger.info(f"Targeted mode: merging into {self.store.student_count()} students")
+        else:
+            # Clean build directory
+            if self.config.build_dir.exists():
+                shutil.rmtree(self.config.build_dir)
+            self.store.clear_students()
+        self.config.build_dir.mkdir(parents=True, exist_ok=True)
+        targeted = str(run_filter) if run_filter is not None else None
+        self.journal.start(resume=resume, mode=self.download_mode, incremental=incremental, filter=targeted)
+        self.run_id = self.store.start_run('download', mode=self.download_mode,
+                                           incremental=incremental, resume=resume, filter=targeted)
+        
+        try:
+            if self.download_mode == 'async':
+                results = asyncio.run(self._download_all_async(incremental))
+            else:
+                all_tasks = self._collect_tasks(incremental)
+                self.logger.info(f"Total students to download: {len(all_tasks)}")
+                results, all_tasks = self._split_resumed(all_tasks)
+                if self.download_mode == 'two_phase':
+                    results += self._download_two_phase(all_tasks)
+                elif self.download_mode == 'bulk' and run_filter is None:
+                    results += self._download_bulk(all_tasks)
+                else:
+                    if self.download_mode == 'bulk':
+                        # A bulk export is a whole section; a few students are cheaper one by one
+                        self.logger.info(f"Targeted run: downloading {len(all_tasks)} students "
+                                         f"individually instead of bulk exporting their sections")
+                    results += self._download_threaded(all_tasks)
+                results = self._retry_failed(all_tasks, results)
+        except BaseException as e:
+            self.store.finish_run(self.run_id, 'failed', error=repr(e))
+            raise
+        
+        # Students a full run did not see are no longer on a roster
+        if run_filter is None:
+            pruned = self.store.prune_students(self.run_id)
+            if pruned:
+                self.logger.info(f"Removed {pruned} students no longer on any roster")
+            if self.asset_store is not None:
+                # The store outlives build/; drop objects no project or site file links to
+                objects, freed = self.asset_store.prune()
+                if objects:
+                    self.logger.info(f"Asset store: pruned {objects} unused objects ({freed / 1024 / 1024:.1f} MB)")
+        elif not results:
+            self.logger.warning(f"No students matched {run_filter}")
+        write_manifest(self.config, self.store)
+        self.journal.finish()
+        
+        unchanged = sum(1 for r in results if r.get('changed') is False)
+        failed = sum(1 for r in results if 'errors' in r)
+        self.store.finish_run(self.run_id, 'ok', students=len(results), unchanged=unchanged, failed=failed,
+                              http=self.transport.stats(), concurrency=self.limiter.stats())
+        self.logger.info(f"Downloaded {len(results) - unchanged} student projects ({unchanged} unchanged)")
+        self.logger.info(f"Concurrency: {self.limiter.summary()}")
+        if self.codio_api is not None:
+            self.logger.info(f"HTTP: {self.transport.summary()}")
+        if self.asset_store is not None:
+            self.logger.info(f"Asset store: {self.asset_store.summary()}")
         return results
 
 
@@ -429,6 +1439,11 @@ class SiteBuilder:
         self.config = config
         self.logger = logger
         
+        # Hard-link files out of build/ (which already shares content via the asset store)
+        self.copy_function = link_or_copy if config.dedup_assets else shutil.copy2
+        self._scanner = None
+        self.store = StateStore(config.state_db, logger)
+        
         # Setup Jinja2 environment
         self.jinja_env = Environment(
             loader=FileSystemLoader(str(self.config.templates_dir)),
@@ -444,34 +1459,151 @@ class SiteBuilder:
             shutil.rmtree(self.config.site_dir)
         self.config.site_dir.mkdir(parents=True, exist_ok=True)
         
-        # Copy each student's project
-        for student in tqdm(manifest, desc="Copying projects"):
-            if not student.get('local_path') or 'errors' in student:
+        # Copy each student's files, straight from the inventory
+        made_dirs = set()
+        desired = self._desired_files(manifest).items()
+        for rel, (source, _) in tqdm(traced_by_student(desired, 'copy'), total=len(desired), desc="Copying projects"):
+            dest = self.config.site_dir / rel
+            if dest.parent not in made_dirs:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(dest.parent)
+            self.copy_function(source, dest)
+    
+    def _project_source(self, student: Dict) -> Optional[Tuple[Path, str]]:
+        """Directory whose contents are published for a student (and its inventory prefix), or None"""
+        if not student.get('local_path') or 'errors' in student:
+            return None
+        
+        source_dir = self.config.project_root / student['local_path']
+        if not source_dir.exists():
+            return None
+        
+        # Publish from the subdirectory holding the entry page, if there is one
+        if student.get('entry_page_path'):
+            project_source = source_dir / student['entry_page_path']
+            if project_source.exists():
+                return project_source, student['entry_page_path']
+        return source_dir, ''
+    
+    def _student_inventory(self, student: Dict, source_dir: Path) -> List[Dict]:
+        """Inventory recorded at download time (scanned now for older manifests)"""
+        if 'inventory' in student:
+            return student['inventory']
+        if self._scanner is None:
+            self._scanner = InventoryScanner()
+        self.logger.debug(f"No inventory in manifest for {student['slug']}; scanning")
+        return self._scanner.scan(source_dir)
+    
+    def _desired_files(self, manifest: List[Dict]) -> Dict[str, Tuple[Path, Dict]]:
+        """Map site-relative path -> (source file, inventory entry) for every published student file"""
+        files = {}
+        for student in manifest:
+            source = self._project_source(student)
+            if source is None:
                 continue
-                
+            project_source, subdir = source
             source_dir = self.config.project_root / student['local_path']
-            dest_dir = self.config.site_dir / student['section'] / student['slug']
             
-            if source_dir.exists():
-                dest_dir.parent.mkdir(parents=True, exist_ok=True)
-                
-                # If there's an entry page in a subdirectory, copy from that subdirectory
-                # Otherwise copy the entire student directory
-                if student.get('entry_page_path') and student.get('entry_page_path') != '':
-                    # Copy from the subdirectory containing the project
-                    project_source = source_dir / student['entry_page_path']
-                    if project_source.exists():
-                        shutil.copytree(project_source, dest_dir, dirs_exist_ok=True)
-                        self.logger.debug(f"Copied project from {project_source} to {dest_dir}")
-                    else:
-                        # Fallback: copy entire directory
-                        shutil.copytree(source_dir, dest_dir, dirs_exist_ok=True)
-                else:
-                    # Copy entire directory (entry page is in root)
-                    shutil.copytree(source_dir, dest_dir, dirs_exist_ok=True)
+            prefix = f"{student['section']}/{student['slug']}"
+            for entry in entries_under(self._student_inventory(student, source_dir), subdir):
+                path = project_source / entry['path']
+                if entry['type'] == 'symlink':
+                    # Publish the link target's content, as copytree did
+                    path = path.resolve()
+                files[f"{prefix}/{entry['path']}"] = (path, entry)
+        return files
+    
+    def sync_student_projects(self, manifest: List[Dict], staging_dir: Path,
+                              only: Optional[Set[str]] = None) -> Dict[str, list]:
+        """Assemble the new site tree in staging_dir, copying only files whose source changed
+        
+        Unchanged files are hard-linked from the current site/, so anything later
+        stages did to them is kept. With ``only`` just those <section>/<slug>
+        directories are synced; the rest of the state is kept for
+        carry_over_site. Returns the new build state.
+        """
+        self.logger.info("Syncing student projects into the site directory")
+        
+        state_path = self.config.site_state_path
+        previous = {}
+        if state_path.exists() and self.config.site_dir.exists():
+            with open(state_path) as f:
+                previous = json.load(f)
+        
+        state = {}
+        if only is not None:
+            manifest = [student for student in manifest if f"{student['section']}/{student['slug']}" in only]
+            state = {rel: signature for rel, signature in previous.items() if student_prefix(rel) not in only}
+            previous = {rel: signature for rel, signature in previous.items() if rel not in state}
+        
+        desired = self._desired_files(manifest)
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+        made_dirs = set()
+        
+        for rel, (source, entry) in traced_by_student(desired.items(), 'copy'):
+            signature = [entry['size'], entry['mtime_ns'], entry['sha256']]
+            dest = staging_dir / rel
+            if dest.parent not in made_dirs:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(dest.parent)
+            
+            current = self.config.site_dir / rel
+            if previous.get(rel) == signature and current.exists():
+                link_or_copy(current, dest)
+                counts['unchanged'] += 1
+            else:
+                self.copy_function(source, dest)
+                counts['updated' if rel in previous else 'added'] += 1
+            state[rel] = signature
+        
+        counts['removed'] = len(set(previous) - set(desired))
+        
+        self.logger.info(
+            f"Site sync: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+        )
+        return state
+    
+    def carry_over_site(self, staging_dir: Path, skip: Set[str]) -> int:
+        """Hard-link the current site/ into staging_dir, except the <section>/<slug> directories in skip
+        
+        Carried files are the finished output of earlier builds (optimized,
+        minified, rewritten), so a targeted build leaves them exactly as they are.
+        """
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(self.config.site_dir):
+            rel_dir = Path(dirpath).relative_to(self.config.site_dir).as_posix()
+            if rel_dir == '.':
+                # Reports written into site/ by older versions are left behind
+                dirnames[:] = [d for d in dirnames if d != 'reports']
+            elif rel_dir.count('/') == 0:
+                dirnames[:] = [d for d in dirnames if f"{rel_dir}/{d}" not in skip]
+            dest_dir = staging_dir / rel_dir
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            for name in filenames:
+                # The index is rendered afresh (and written in place, so it must not be a link)
+                if rel_dir == '.' and name == 'index.html':
+                    continue
+                link_or_copy(Path(dirpath) / name, dest_dir / name)
+                count += 1
+        return count
     
-    def build_index_page(self, manifest: List[Dict]) -> None:
+    def write_dedup_report(self) -> Dict:
+        """Record how many bytes hard-linking saved across build/ and site/"""
+        report = dedup_report([self.config.build_dir, self.config.site_dir])
+        with open(self.config.build_dir / 'dedup_report.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        self.logger.info(
+            f"Dedup: {report['files']} files, {report['logical_bytes'] / 1024 / 1024:.1f} MB logical, "
+            f"{report['physical_bytes'] / 1024 / 1024:.1f} MB on disk "
+            f"({report['saved_bytes'] / 1024 / 1024:.1f} MB saved)"
+        )
+        return report
+    
+    def build_index_page(self, manifest: List[Dict], output_dir: Optional[Path] = None) -> None:
         """Build the main index page"""
+        output_dir = output_dir or self.config.site_dir
         self.logger.info("Building main index page")
         
         # Organize students by section
@@ -492,39 +1624,169 @@ class SiteBuilder:
         # Sort sections
         sorted_sections = sorted(sections_data.items())
         
+        # Reproducible builds show a content-derived date and stamp instead of the wall clock
+        if self.config.reproducible_build:
+            stamp = build_stamp(manifest, self.config.site_title)
+            generation_time = time.strftime('%B %d, %Y', time.gmtime(source_date_epoch(manifest)))
+        else:
+            stamp = None
+            generation_time = time.strftime('%B %d, %Y at %I:%M %p')
+        
         # Render template
-        template = self.jinja_env.get_template('index.html.j2')
-        html_content = template.render(
-            site_title=self.config.site_title,
-            sections=sorted_sections,
-            pages_base_url=self.config.pages_base_url,
-            generation_time=time.strftime('%B %d, %Y at %I:%M %p')
-        )
+        with tracing.span('render.index', 'build'):
+            template = self.jinja_env.get_template('index.html.j2')
+            html_content = template.render(
+                site_title=self.config.site_title,
+                sections=sorted_sections,
+                pages_base_url=self.config.pages_base_url,
+                generation_time=generation_time,
+                build_stamp=stamp
+            )
         
         # Write index.html
-        index_path = self.config.site_dir / 'index.html'
+        index_path = output_dir / 'index.html'
         with open(index_path, 'w', encoding='utf-8') as f:
             f.write(html_content)
         
         # Create .nojekyll file
-        nojekyll_path = self.config.site_dir / '.nojekyll'
+        nojekyll_path = output_dir / '.nojekyll'
         nojekyll_path.touch()
     
-    def build_site(self) -> None:
-        """Build the complete site"""
-        # Load manifest
-        manifest_path = self.config.build_dir / 'manifest.json'
-        if not manifest_path.exists():
-            raise FileNotFoundError("No manifest.json found. Run download first.")
+    def _post_process(self, manifest: List[Dict], output_dir: Path, only: Optional[Set[str]] = None) -> None:
+        """Run the optimization stages over a freshly assembled site tree (or only some students in it)"""
+        image_settings = self.config.image_optimization
+        if image_settings.get('enabled', True):
+            # Source hashes come from the inventory, so images are not re-read to hash them
+            known_hashes = {rel: entry['sha256'] for rel, (_, entry) in self._desired_files(manifest).items()}
+            optimizer = ImageOptimizer(image_settings, self.config.image_cache_dir, self.logger)
+            with tracing.span('build.images', 'build'):
+                optimizer.optimize_site(output_dir, known_hashes, only)
         
-        with open(manifest_path) as f:
-            manifest = json.load(f)
+        # Minify before the <img> rewrite so the rewriter's recorded output is final
+        minify_settings = self.config.minify
+        if minify_settings.get('enabled', False):
+            minifier = AssetMinifier(minify_settings, self.config.cache_dir / 'minify', self.logger)
+            with tracing.span('build.minify', 'build'):
+                minifier.minify_site(output_dir, only)
+        
+        responsive_settings = self.config.responsive_images
+        if responsive_settings.get('enabled', True):
+            rewriter = ResponsiveImageRewriter(
+                responsive_settings,
+                self.config.cache_dir / 'html',
+                self.config.cache_dir / 'html_rewrite_state.json',
+                self.logger
+            )
+            with tracing.span('build.responsive_images', 'build'):
+                rewriter.rewrite_site(output_dir, only)
+    
+    def audit_page_weight(self, manifest: List[Dict], output_dir: Path,
+                          only: Optional[Set[str]] = None) -> Optional[Dict]:
+        """Weigh every entry page (or only some students') and write reports/page_weight.{json,html}"""
+        settings = self.config.page_weight
+        if not settings.get('enabled', True):
+            return None
+        auditor = PageWeightAuditor(settings, self.config.pages_base_url, self.config.reports_dir,
+                                    self.logger, self.jinja_env)
+        with tracing.span('build.page_weight', 'build'):
+            return auditor.audit(output_dir, manifest, only)
+    
+    def build_site(self, incremental: Optional[bool] = None, run_filter: Optional[RunFilter] = None) -> None:
+        """Build the complete site
         
-        # Copy projects and build index
-        self.copy_student_projects(manifest)
-        self.build_index_page(manifest)
+        Incremental builds assemble the new tree next to site/ and swap it in,
+        so a half-built site/ is never visible. A ``run_filter`` rebuilds only
+        the matching students and carries everyone else over from site/.
+        """
+        if incremental is None:
+            incremental = self.config.incremental_build
         
+        # Load manifest
+        manifest = load_manifest(self.config, self.store)
+        
+        only = None
+        if run_filter is not None:
+            run_filter.bind(self.store, recovered=True)
+            if self.config.site_dir.exists():
+                only = set(self.store.roster(**run_filter.query()))
+                self.logger.info(f"Targeted build of {len(only)} students ({run_filter})")
+            else:
+                self.logger.warning("No site/ to merge a targeted build into; building every student")
+        
+        run_id = self.store.start_run('build', incremental=incremental, students=len(manifest),
+                                      filter=str(run_filter) if only is not None else None)
+        try:
+            if only is not None:
+                self._build_targeted(manifest, only)
+            else:
+                self._build(manifest, incremental)
+        except BaseException as e:
+            self.store.finish_run(run_id, 'failed', error=repr(e))
+            raise
+        self.store.finish_run(run_id, 'ok')
         self.logger.info("Site build complete")
+    
+    def _build(self, manifest: List[Dict], incremental: bool) -> None:
+        """Assemble, post-process and audit the site for build_site"""
+        if incremental:
+            staging_dir = self.config.site_dir.with_name(f".{self.config.site_dir.name}.next")
+            if staging_dir.exists():
+                shutil.rmtree(staging_dir)
+            staging_dir.mkdir(parents=True)
+            
+            with tracing.span('build.sync', 'build'):
+                state = self.sync_student_projects(manifest, staging_dir)
+            self.build_index_page(manifest, staging_dir)
+            self._post_process(manifest, staging_dir)
+            weight_report = self.audit_page_weight(manifest, staging_dir)
+            if self.config.reproducible_build:
+                normalize_mtimes(staging_dir, source_date_epoch(manifest))
+            swap_directories(staging_dir, self.config.site_dir)
+            write_json_atomic(self.config.site_state_path, state)
+        else:
+            # Copy projects and build index
+            self.copy_student_projects(manifest)
+            self.build_index_page(manifest)
+            self._post_process(manifest, self.config.site_dir)
+            weight_report = self.audit_page_weight(manifest, self.config.site_dir)
+            if self.config.reproducible_build:
+                normalize_mtimes(self.config.site_dir, source_date_epoch(manifest))
+            state_path = self.config.site_state_path
+            if state_path.exists():
+                state_path.unlink()
+        
+        if self.config.dedup_assets:
+            self.write_dedup_report()
+        self._check_budget(weight_report)
+    
+    def _build_targeted(self, manifest: List[Dict], only: Set[str]) -> None:
+        """Rebuild some students' directories (and the index) into a copy of site/, then swap it in"""
+        staging_dir = self.config.site_dir.with_name(f".{self.config.site_dir.name}.next")
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        staging_dir.mkdir(parents=True)
+        
+        with tracing.span('build.sync', 'build'):
+            carried = self.carry_over_site(staging_dir, only)
+            state = self.sync_student_projects(manifest, staging_dir, only)
+        self.logger.info(f"Carried over {carried} files from the current site")
+        self.build_index_page(manifest, staging_dir)
+        self._post_process(manifest, staging_dir, only)
+        weight_report = self.audit_page_weight(manifest, staging_dir, only)
+        if self.config.reproducible_build:
+            normalize_mtimes(staging_dir, source_date_epoch(manifest))
+        swap_directories(staging_dir, self.config.site_dir)
+        write_json_atomic(self.config.site_state_path, state)
+        self._check_budget(weight_report)
+    
+    def _check_budget(self, weight_report: Optional[Dict]) -> None:
+        """Warn (or fail, with fail_on_budget) when entry pages are over the page-weight budget"""
+        if weight_report and weight_report['over_budget']:
+            message = (f"{weight_report['over_budget']} entry pages over the page-weight budget - see "
+                       f"{self.config.reports_dir / 'page_weight.html'}")
+            if self.config.page_weight.get('fail_on_budget', False):
+                raise RuntimeError(message)
+            self.logger.warning(message)
 
 
 class SitePublisher:
@@ -534,15 +1796,42 @@ class SitePublisher:
         self.config = config
         self.logger = logger
     
-    def publish_to_github_pages(self) -> None:
-        """Publish site using ghp-import"""
+    def publish_to_github_pages(self, run_filter: Optional[RunFilter] = None) -> None:
+        """Publish site to the gh-pages branch
+        
+        The whole (merged) site is published; the git publisher only hashes files
+        that changed, so a targeted run just names its students in the commit.
+        """
         self.logger.info("Publishing site to GitHub Pages")
         
         if not self.config.site_dir.exists():
             raise FileNotFoundError("Site directory not found. Run build first.")
         
+        message = f"{self.config.school_year}: publish About Me projects"
+        if run_filter is not None:
+            message += f" ({run_filter})"
+        
+        if self.config.publisher['method'] == 'ghp-import':
+            self._publish_with_ghp_import(message)
+            return
+        
+        settings = self.config.publisher
+        publisher = GitPagesPublisher(
+            self.config.cache_dir / 'pages.git',
+            settings['remote'],
+            self.config.github_config['branch'],
+            self.logger,
+            author_name=settings['author_name'],
+            author_email=settings['author_email']
+        )
+        commit = publisher.publish(self.config.site_dir, message)
+        if commit:
+            self.logger.info("Successfully published to GitHub Pages")
+            self.logger.info(f"Site URL: {self.config.pages_base_url}")
+    
+    def _publish_with_ghp_import(self, commit_message: str) -> None:
+        """Publish site using ghp-import (force-pushes a fresh snapshot)"""
         github_config = self.config.github_config
-        commit_message = f"{self.config.school_year}: publish About Me projects"
         
         # Use ghp-import to publish
         cmd = [
@@ -550,7 +1839,7 @@ class SitePublisher:
             '-n',  # Add .nojekyll
             '-p',  # Push to origin
             '-f',  # Force update
-            '-r', f"https://github.com/{github_config['owner']}/{github_config['repo']}.git",
+            '-r', self.config.publisher['remote'],
             '-b', github_config['branch'],
             '-m', commit_message,
             str(self.config.site_dir)
@@ -575,41 +1864,91 @@ class SiteValidator:
     def __init__(self, config: PublishConfig, logger: logging.Logger):
         self.config = config
         self.logger = logger
+        
+        settings = config.validation
+        self.max_workers = settings['max_workers']
+        self.per_host = settings['per_host']
+        self.abort_after_failures = settings['abort_after_failures']
+        
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+        self.store = StateStore(config.state_db, logger)
+        
+        # Every check (and the deployment wait) reuses keep-alive connections, one per worker
+        self.transport = HTTPTransport(self.max_workers, config.http)
+    
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
     
     @retry(stop=stop_after_attempt(10), wait=wait_exponential(multiplier=1, min=2, max=30))
     def wait_for_deployment(self) -> None:
         """Wait for GitHub Pages deployment to be ready"""
         self.logger.info("Waiting for GitHub Pages deployment...")
         
-        response = requests.head(self.config.pages_base_url, timeout=10)
+        response = self.transport.head(self.config.pages_base_url, timeout=10)
         if response.status_code != 200:
             raise requests.RequestException(f"Site not ready: {response.status_code}")
         
         self.logger.info("Site is deployed and accessible")
     
-    def validate_student_links(self) -> Dict:
-        """Validate all student project links"""
-        self.logger.info("Validating student project links")
+    def _check_url(self, url: str) -> Tuple[str, str]:
+        """HEAD one URL; returns (status, message)"""
+        with self._host_limit(url), tracing.span('validate.request', 'validate', url=url) as span:
+            try:
+                response = self.transport.head(url, timeout=self.config.timeouts['http_seconds'])
+            except Exception as e:
+                span['error'] = str(e)
+                return 'fail', str(e)
+            span['status'] = response.status_code
+        if 200 <= response.status_code < 400:
+            return 'pass', f"HTTP {response.status_code}"
+        return 'fail', f"HTTP {response.status_code}"
+    
+    def validate_student_links(self, base_url: Optional[str] = None,
+                               run_filter: Optional[RunFilter] = None) -> Dict:
+        """Validate all student project links
         
-        # Load manifest
-        manifest_path = self.config.build_dir / 'manifest.json'
-        with open(manifest_path) as f:
-            manifest = json.load(f)
+        Checks run concurrently over the shared transport. Once abort_after_failures
+        checks have failed, the remaining ones are skipped. A ``run_filter``
+        checks only the matching students and merges them into the last report.
+        """
+        base_url = base_url or self.config.pages_base_url
+        self.logger.info(f"Validating student project links against {base_url}")
+        
+        roster = None
+        if run_filter is not None:
+            import_manifest_json(self.config, self.store)
+            run_filter.bind(self.store, recovered=True)
+            roster = set(self.store.roster())
+        # Inventories are not needed to build the URLs
+        manifest = load_manifest(self.config, self.store, inventory=False, run_filter=run_filter)
+        if run_filter is not None:
+            self.logger.info(f"Checking {len(manifest)} students ({run_filter})")
+        run_id = self.store.start_run('validate', base_url=base_url,
+                                      filter=str(run_filter) if run_filter is not None else None)
         
         validation_results = {
             'total': 0,
             'passed': 0,
             'failed': 0,
+            'skipped': 0,
             'missing_entry': 0,
             'details': []
         }
         
-        for student in tqdm(manifest, desc="Validating links"):
+        checks = []
+        details = []
+        for student in manifest:
             if 'errors' in student or not student.get('entry_page_file'):
                 validation_results['missing_entry'] += 1
-                validation_results['details'].append({
+                details.append({
                     'student': student['display_name_short'],
                     'section': student['section'],
+                    'slug': student['slug'],
                     'status': 'missing_entry',
                     'url': None,
                     'message': 'No entry page found'
@@ -618,38 +1957,55 @@ class SiteValidator:
             
             # Build URL
             url = urljoin(
-                self.config.pages_base_url + '/',
+                base_url + '/',
                 f"{student['section']}/{student['slug']}/{student['entry_page_file']}"
             )
             
             validation_results['total'] += 1
-            
-            try:
-                response = requests.head(url, timeout=self.config.timeouts['http_seconds'])
-                if 200 <= response.status_code < 400:
-                    validation_results['passed'] += 1
-                    status = 'pass'
-                    message = f"HTTP {response.status_code}"
-                else:
-                    validation_results['failed'] += 1
-                    status = 'fail'
-                    message = f"HTTP {response.status_code}"
-            except Exception as e:
-                validation_results['failed'] += 1
-                status = 'fail'
-                message = str(e)
-            
-            validation_results['details'].append({
+            details.append({
                 'student': student['display_name_short'],
                 'section': student['section'],
-                'status': status,
+                'slug': student['slug'],
+                'status': 'skipped',
                 'url': url,
-                'message': message
+                'message': 'Not checked (validation aborted)'
             })
+            checks.append(details[-1])
+        
+        aborted = False
+        failures = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._check_url, detail['url']): detail for detail in checks}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Validating links"):
+                detail = futures[future]
+                if future.cancelled():
+                    continue
+                detail['status'], detail['message'] = future.result()
+                if detail['status'] == 'pass':
+                    validation_results['passed'] += 1
+                    continue
+                
+                validation_results['failed'] += 1
+                failures += 1
+                if self.abort_after_failures and failures >= self.abort_after_failures and not aborted:
+                    aborted = True
+                    self.logger.warning(f"{failures} links failed - skipping the remaining checks")
+                    for pending in futures:
+                        pending.cancel()
+        
+        validation_results['skipped'] = sum(1 for detail in checks if detail['status'] == 'skipped')
+        validation_results['details'] = details
+        self.store.save_validation(run_id, details)
+        self.store.finish_run(run_id, 'aborted' if aborted else 'ok', http=self.transport.stats(),
+                              **{name: validation_results[name] for name in
+                                 ('total', 'passed', 'failed', 'skipped', 'missing_entry')})
+        self.logger.info(f"HTTP: {self.transport.summary()}")
         
         # Save validation report
-        reports_dir = self.config.site_dir / 'reports'
-        reports_dir.mkdir(exist_ok=True)
+        reports_dir = self.config.reports_dir
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        if run_filter is not None:
+            validation_results = self._merge_report(reports_dir / 'validation_report.json', details, roster)
         
         with open(reports_dir / 'validation_report.json', 'w') as f:
             json.dump(validation_results, f, indent=2)
@@ -661,9 +2017,10 @@ Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
 Total student projects: {validation_results['total']}
 Successful links: {validation_results['passed']}
 Failed links: {validation_results['failed']} 
+Skipped (aborted): {validation_results['skipped']}
 Missing entry pages: {validation_results['missing_entry']}
 
-Site URL: {self.config.pages_base_url}
+Site URL: {base_url}
 """
         
         with open(reports_dir / 'validation_report.txt', 'w') as f:
@@ -673,11 +2030,65 @@ Site URL: {self.config.pages_base_url}
         
         return validation_results
     
-    def validate_site(self) -> None:
-        """Run complete site validation"""
+    def _merge_report(self, report_path: Path, details: List[Dict], roster: Set[str]) -> Dict:
+        """The last validation report with a targeted run's checks replacing those students' results"""
+        checked = {f"{detail['section']}/{detail['slug']}" for detail in details}
+        previous = []
+        if report_path.exists():
+            with open(report_path) as f:
+                previous = json.load(f).get('details', [])
+        # Results from before slugs were recorded cannot be matched, so they are dropped
+        kept = [detail for detail in previous if f"{detail['section']}/{detail.get('slug')}" in roster - checked]
+        merged = sorted(kept + details, key=lambda detail: (detail['section'], detail['slug']))
+        
+        counts = {status: sum(1 for detail in merged if detail['status'] == status)
+                  for status in ('pass', 'fail', 'skipped', 'missing_entry')}
+        return {
+            'total': len(merged) - counts['missing_entry'],
+            'passed': counts['pass'],
+            'failed': counts['fail'],
+            'skipped': counts['skipped'],
+            'missing_entry': counts['missing_entry'],
+            'details': merged
+        }
+    
+    def validate_offline(self, run_filter: Optional[RunFilter] = None) -> Dict:
+        """Check every local reference in site/ without deploying it
+        
+        A ``run_filter`` checks only the matching students' pages and merges
+        them into the last report.
+        """
+        if not self.config.site_dir.exists():
+            raise FileNotFoundError("Site directory not found. Run build first.")
+        
+        only = None
+        if run_filter is not None:
+            import_manifest_json(self.config, self.store)
+            run_filter.bind(self.store, recovered=True)
+            only = set(self.store.roster(**run_filter.query()))
+            self.logger.info(f"Checking references of {len(only)} students ({run_filter})")
+        crawler = SiteCrawler(self.config.site_dir, self.config.reports_dir, self.config.pages_base_url, self.logger)
+        report = crawler.crawl(only)
+        if report['broken_references']:
+            self.logger.warning(
+                f"{report['broken_references']} broken references - see "
+                f"{self.config.reports_dir / 'broken_references.txt'}"
+            )
+        return report
+    
+    def validate_site(self, local: bool = False, run_filter: Optional[RunFilter] = None) -> None:
+        """Run complete site validation
+        
+        With local=True the links are checked against site/ served from this
+        machine instead of GitHub Pages (no network needed).
+        """
         try:
-            self.wait_for_deployment()
-            self.validate_student_links()
+            if local:
+                with serve_directory(self.config.site_dir) as base_url:
+                    self.validate_student_links(base_url, run_filter)
+            else:
+                self.wait_for_deployment()
+                self.validate_student_links(run_filter=run_filter)
         except Exception as e:
             self.logger.error(f"Validation failed: {e}")
             # Don't raise - validation failures shouldn't stop the pipeline
@@ -687,6 +2098,30 @@ def main():
     parser = argparse.ArgumentParser(description='Publish Grade 7 About Me projects to GitHub Pages')
     parser.add_argument('--config', type=Path, required=True, help='Configuration file path')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only re-download students whose Codio project changed since the last run')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted download from build/download_journal.jsonl')
+    parser.add_argument('--full-build', action='store_true',
+                       help='Rebuild site/ from scratch instead of syncing changed files')
+    parser.add_argument('--download-mode', choices=DOWNLOAD_MODES,
+                       help='Override download_mode from the config file')
+    parser.add_argument('--offline', action='store_true',
+                       help='Validate by checking every reference in site/ on disk (no deploy needed)')
+    parser.add_argument('--local', action='store_true',
+                       help='Validate against site/ served locally instead of GitHub Pages')
+    parser.add_argument('--section', action='append', metavar='SECTION',
+                       help='Only process this section (repeatable); results merge into the existing site')
+    parser.add_argument('--student', action='append', metavar='SLUG_OR_ID',
+                       help='Only process this student, by slug or Codio id (repeatable)')
+    parser.add_argument('--only-failed', action='store_true',
+                       help='Only process students whose last download failed')
+    parser.add_argument('--trace', action='store_true',
+                       help='Record per-stage and per-student timings as Chrome trace JSON')
+    parser.add_argument('--trace-file', type=Path,
+                       help='Where to write the trace (default logs/trace_<time>.json)')
+    parser.add_argument('--profile', choices=tracing.PROFILE_MODES,
+                       help='With --trace, attach cProfile (cpu) and/or tracemalloc (memory) summaries to each stage')
     parser.add_argument('command', choices=['all', 'download', 'build', 'publish', 'validate'],
                        help='Command to run')
     
@@ -698,33 +2133,64 @@ def main():
     
     # Load configuration
     config = PublishConfig(args.config)
+    unknown = sorted(set(args.section or []) - set(config.sections))
+    if unknown:
+        parser.error(f"unknown section {', '.join(unknown)} (configured: {', '.join(config.sections)})")
     logger = setup_logging(config.project_root, args.verbose)
     
+    # One filter for every stage, so `all --only-failed` builds the students its download retried
+    run_filter = None
+    if args.section or args.student or args.only_failed:
+        run_filter = RunFilter(args.section, args.student, args.only_failed)
+    
     logger.info(f"Starting About Me publisher for {config.school_year}")
     logger.info(f"Command: {args.command}")
     
+    if args.trace or args.trace_file:
+        trace_path = args.trace_file or config.project_root / 'logs' / f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        tracing.enable(trace_path, profile=args.profile)
+    
     try:
         if args.command in ['all', 'download']:
-            downloader = AboutMeDownloader(config, logger)
-            downloader.download_all_students()
+            with tracing.stage('download'):
+                downloader = AboutMeDownloader(config, logger, download_mode=args.download_mode)
+                downloader.download_all_students(
+                    incremental=args.incremental or config.incremental_download,
+                    resume=args.resume,
+                    run_filter=run_filter
+                )
         
         if args.command in ['all', 'build']:
-            builder = SiteBuilder(config, logger)
-            builder.build_site()
+            with tracing.stage('build'):
+                builder = SiteBuilder(config, logger)
+                builder.build_site(incremental=False if args.full_build else None, run_filter=run_filter)
+        
+        if args.command == 'all' or (args.command == 'validate' and args.offline):
+            # Catch broken references before spending minutes on a deploy
+            with tracing.stage('offline_check'):
+                report = SiteValidator(config, logger).validate_offline(run_filter)
+            if (args.command == 'all' and report['broken_references']
+                    and config.validation['fail_on_broken_references']):
+                raise RuntimeError("Broken references found; fix them or disable fail_on_broken_references")
         
         if args.command in ['all', 'publish']:
-            publisher = SitePublisher(config, logger)
-            publisher.publish_to_github_pages()
+            with tracing.stage('publish'):
+                publisher = SitePublisher(config, logger)
+                publisher.publish_to_github_pages(run_filter)
         
-        if args.command in ['all', 'validate']:
-            validator = SiteValidator(config, logger)
-            validator.validate_site()
+        if args.command == 'all' or (args.command == 'validate' and not args.offline):
+            with tracing.stage('validate'):
+                validator = SiteValidator(config, logger)
+                validator.validate_site(local=args.local, run_filter=run_filter)
         
         logger.info("Pipeline completed successfully")
         
     except Exception as e:
         logger.error(f"Pipeline failed: {e}")
         sys.exit(1)
+    finally:
+        # Written even when a stage fails - that is when the trace is most useful
+        tracing.finish(logger)
 
 
 if __name__ == '__main__':
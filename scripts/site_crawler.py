@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Offline Link and Asset Crawler for About Me Projects (25-26)
+
+Checks every local reference in the built site before it is published:
+<img src>, srcset, <a href>, stylesheets, scripts, media, inline styles and
+CSS url()/@import. References are resolved against an index of the files in
+site/ that is case-sensitive like GitHub Pages, so "photo.JPG" referenced as
+"photo.jpg" is reported even though it works on a Mac or Windows laptop.
+
+Pages are parsed in parallel, one task per student, and the results are written
+to reports/broken_references.json (and .txt) grouped by student.
+"""
+
+import json
+import logging
+import os
+import posixpath
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+
+HTML_EXTENSIONS = {'.html', '.htm'}
+CSS_EXTENSIONS = {'.css'}
+
+# Attributes holding a single URL, by tag ('*' = any tag)
+URL_ATTRIBUTES = {
+    'a': ['href'],
+    'link': ['href'],
+    'img': ['src'],
+    'script': ['src'],
+    'iframe': ['src'],
+    'embed': ['src'],
+    'audio': ['src'],
+    'video': ['src', 'poster'],
+    'source': ['src'],
+    'track': ['src'],
+    'input': ['src'],
+    'object': ['data'],
+    '*': ['background']
+}
+
+_CSS_URL = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)', re.I | re.S)
+_CSS_IMPORT = re.compile(r'@import\s+([\'"])(.*?)\1', re.I)
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+
+
+def css_references(css: str) -> List[Tuple[int, str]]:
+    """(line, url) for every URL referenced by a stylesheet"""
+    # Blank out comments but keep their newlines so line numbers stay right
+    css = _CSS_COMMENT.sub(lambda m: '\n' * m.group().count('\n'), css)
+    return sorted(
+        (css.count('\n', 0, m.start()) + 1, m.group(2))
+        for regex in (_CSS_URL, _CSS_IMPORT) for m in regex.finditer(css)
+    )
+
+
+class _ReferenceParser(HTMLParser):
+    """Collects (line, url) for every URL-bearing attribute and inline style"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.references: List[Tuple[int, str]] = []
+        self.in_style = False
+    
+    def handle_starttag(self, tag, attrs):
+        line = self.getpos()[0]
+        names = URL_ATTRIBUTES.get(tag, []) + URL_ATTRIBUTES['*']
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in names:
+                self.references.append((line, value))
+            elif name == 'srcset':
+                for candidate in value.split(','):
+                    url = candidate.strip().split(' ')[0]
+                    if url:
+                        self.references.append((line, url))
+            elif name == 'style':
+                self.references += [(line, url) for _, url in css_references(value)]
+        if tag == 'style':
+            self.in_style = True
+    
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self.in_style = False
+    
+    def handle_data(self, data):
+        if self.in_style:
+            line = self.getpos()[0]
+            self.references += [(line + offset - 1, url) for offset, url in css_references(data)]
+
+
+def resolve_reference(page_rel: str, url: str, base_path: str) -> Optional[str]:
+    """Site-relative path a local reference points to, '' if it leaves the site, None if not local"""
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or url.startswith('#') or not parts.path:
+        return None
+    path = unquote(parts.path)
+    
+    if path.startswith('/'):
+        # Root-relative: only valid when it goes through the Pages project path
+        if base_path and (path == base_path or path.startswith(base_path + '/')):
+            path = path[len(base_path):]
+        elif base_path:
+            return ''
+        target = posixpath.normpath(path.lstrip('/') or '.')
+    else:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), path))
+    
+    if target == '..' or target.startswith('../'):
+        return ''
+    if path.endswith('/'):
+        target = posixpath.join(target, 'index.html') if target != '.' else 'index.html'
+    return target
+
+
+def _check_reference(target: str, files: FrozenSet[str], folded: Dict[str, str]) -> Optional[str]:
+    """Why a resolved reference is broken, or None if it is fine"""
+    if target in files:
+        return None
+    if target == '.' or posixpath.join(target, 'index.html') in files:
+        return None
+    actual = folded.get(target.lower())
+    if actual:
+        return f"case mismatch (file is {actual})"
+    return "missing file"
+
+
+def _crawl_student(site_dir: str, pages: List[str], files: FrozenSet[str],
+                   base_path: str) -> List[Dict]:
+    """Process-pool worker: check every reference in one student's pages and stylesheets"""
+    root = Path(site_dir)
+    folded = {}
+    for name in files:
+        folded.setdefault(name.lower(), name)
+    
+    broken = []
+    for page_rel in pages:
+        text = (root / page_rel).read_text(encoding='utf-8', errors='replace')
+        if Path(page_rel).suffix.lower() in CSS_EXTENSIONS:
+            references = css_references(text)
+        else:
+            parser = _ReferenceParser()
+            parser.feed(text)
+            parser.close()
+            references = parser.references
+        
+        for line, url in references:
+            target = resolve_reference(page_rel, url, base_path)
+            if target is None:
+                continue
+            reason = "points outside the site" if target == '' else _check_reference(target, files, folded)
+            if reason:
+                broken.append({'page': page_rel, 'line': line, 'reference': url, 'reason': reason})
+    return broken
+
+
+def _student_key(rel: str) -> str:
+    """Group a site-relative path by <section>/<slug> (site-level pages under 'site')"""
+    parts = rel.split('/')
+    return '/'.join(parts[:2]) if len(parts) > 2 else 'site'
+
+
+class SiteCrawler:
+    """Resolves every local reference in the built site against its real file names"""
+    
+    def __init__(self, site_dir: Path, reports_dir: Path, pages_base_url: str, logger: logging.Logger,
+                 max_workers: Optional[int] = None):
+        self.site_dir = site_dir
+        self.reports_dir = reports_dir
+        self.base_path = urlsplit(pages_base_url).path.rstrip('/')
+        self.logger = logger
+        self.max_workers = max_workers or os.cpu_count()
+    
+    def build_index(self) -> FrozenSet[str]:
+        """Site-relative POSIX paths of every file under site_dir"""
+        files = set()
+        for dirpath, _, filenames in os.walk(self.site_dir):
+            rel_dir = os.path.relpath(dirpath, self.site_dir)
+            for filename in filenames:
+                rel = filename if rel_dir == '.' else f"{rel_dir}/{filename}"
+                files.add(rel.replace(os.sep, '/'))
+        return frozenset(files)
+    
+    def crawl(self, only: Optional[Set[str]] = None) -> Dict:
+        """Check the site and write reports/broken_references.{json,txt}
+        
+        ``only`` limits a targeted run to some <section>/<slug> directories. Their
+        references still resolve against every file in site/, and the results
+        replace those students' entries in the last report.
+        """
+        start = time.time()
+        files = self.build_index()
+        
+        pages_by_student: Dict[str, List[str]] = {}
+        for rel in sorted(files):
+            if Path(rel).suffix.lower() in HTML_EXTENSIONS | CSS_EXTENSIONS:
+                key = _student_key(rel)
+                if only is None or key in only:
+                    pages_by_student.setdefault(key, []).append(rel)
+        
+        broken: Dict[str, List[Dict]] = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(_crawl_student, str(self.site_dir), pages, files, self.base_path): key
+                for key, pages in pages_by_student.items()
+            }
+            for future in as_completed(futures):
+                results = future.result()
+                if results:
+                    broken[futures[future]] = results
+        if only is not None:
+            self._carry_over(broken, only, files)
+        
+        report = {
+            'pages': sum(len(pages) for pages in pages_by_student.values()),
+            'files': len(files),
+            'students_with_broken_references': len(broken),
+            'broken_references': sum(len(items) for items in broken.values()),
+            'students': dict(sorted(broken.items()))
+        }
+        self._write_report(report)
+        
+        self.logger.info(
+            f"Offline check: {report['pages']} pages, {report['broken_references']} broken references "
+            f"in {report['students_with_broken_references']} projects ({time.time() - start:.1f}s)"
+        )
+        return report
+    
+    def _carry_over(self, broken: Dict[str, List[Dict]], only: Set[str], files: FrozenSet[str]) -> None:
+        """Add the last report's results for students a targeted crawl skipped (if still in the site)"""
+        report_path = self.reports_dir / 'broken_references.json'
+        if not report_path.exists():
+            return
+        with open(report_path) as f:
+            previous = json.load(f).get('students', {})
+        present = {_student_key(rel) for rel in files}
+        for key, items in previous.items():
+            if key not in only and key in present:
+                broken.setdefault(key, items)
+    
+    def _write_report(self, report: Dict) -> None:
+        reports_dir = self.reports_dir
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        
+        with open(reports_dir / 'broken_references.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        lines = [
+            f"Broken references: {report['broken_references']} "
+            f"in {report['students_with_broken_references']} projects",
+            ''
+        ]
+        for student, items in report['students'].items():
+            lines.append(f"{student}:")
+            for item in items:
+                lines.append(f"  {item['page']}:{item['line']}  {item['reference']}  - {item['reason']}")
+            lines.append('')
+        
+        with open(reports_dir / 'broken_references.txt', 'w') as f:
+            f.write('\n'.join(lines))
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Run-State Store for About Me Projects (25-26)
+
+A local SQLite database (state/about_me.db by default) holding the pipeline's
+state across runs:
+- students    One row per student on the current roster (indexed by section/slug
+              and status), with the rest of the manifest entry as JSON
+- files       Each student's inventory (path, size, mtime, type, SHA-256)
+- runs        Every download/build/validate run with its outcome
+- attempts    Each student's outcome in each download run
+- validation  Each link check from each validate run
+
+Students are written one transaction at a time from the download workers, so a
+crash never leaves a half-written student. build/manifest.json is exported from
+the store after every download for tools that read it.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    command TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    details TEXT
+);
+
+CREATE TABLE IF NOT EXISTS students (
+    key TEXT PRIMARY KEY,
+    section TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    codio_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    content_hash TEXT,
+    fingerprint TEXT,
+    entry_page TEXT,
+    updated REAL NOT NULL,
+    run_id INTEGER REFERENCES runs(id),
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS students_section_slug ON students (section, slug, codio_id);
+CREATE INDEX IF NOT EXISTS students_status ON students (status);
+
+CREATE TABLE IF NOT EXISTS files (
+    student_key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (student_key, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    student_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    changed INTEGER,
+    error TEXT,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_student ON attempts (student_key, finished);
+CREATE INDEX IF NOT EXISTS attempts_run ON attempts (run_id);
+
+CREATE TABLE IF NOT EXISTS validation (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    section TEXT NOT NULL,
+    student TEXT NOT NULL,
+    url TEXT,
+    status TEXT NOT NULL,
+    message TEXT,
+    checked REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS validation_run_status ON validation (run_id, status);
+"""
+
+# Students fetched per query when streaming the roster
+PAGE_SIZE = 500
+
+
+
+def student_status(entry: Dict) -> str:
+    """'failed' (download error), 'no_entry' (nothing to link to) or 'ok'"""
+    if 'errors' in entry:
+        return 'failed'
+    if not entry.get('entry_page_file'):
+        return 'no_entry'
+    return 'ok'
+
+
+class StateStore:
+    """SQLite run-state database shared by every stage and worker thread"""
+    
+    def __init__(self, path: Path, logger: logging.Logger):
+        self.path = path
+        self.logger = logger
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # One connection serialized by a lock: SQLite takes one writer at a time anyway
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('PRAGMA foreign_keys=ON')
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+    
+    def _transaction(self):
+        # sqlite3 connections commit on success and roll back on error as context managers
+        self._conn.execute('BEGIN IMMEDIATE')
+        return self._conn
+    
+    # ------------------------------------------------------------------ runs
+    
+    def start_run(self, command: str, **details) -> int:
+        """Record the start of a run and return its id"""
+        with self._lock, self._transaction() as conn:
+            cursor = conn.execute('INSERT INTO runs (command, started, details) VALUES (?, ?, ?)',
+                                  (command, time.time(), json.dumps(details)))
+            return cursor.lastrowid
+    
+    def finish_run(self, run_id: int, status: str = 'ok', **details) -> None:
+        """Record how a run ended; details are merged into those given at the start"""
+        with self._lock, self._transaction() as conn:
+            row = conn.execute('SELECT details FROM runs WHERE id = ?', (run_id,)).fetchone()
+            merged = {**json.loads(row['details'] or '{}'), **details}
+            conn.execute('UPDATE runs SET finished = ?, status = ?, details = ? WHERE id = ?',
+                         (time.time(), status, json.dumps(merged), run_id))
+    
+    def last_run(self, command: str) -> Optional[Dict]:
+        """Status and details of the latest run of a command, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM runs WHERE command = ? ORDER BY id DESC LIMIT 1',
+                                     (command,)).fetchone()
+        if row is None:
+            return None
+        return {**dict(row), 'details': json.loads(row['details'] or '{}')}
+    
+    # -------------------------------------------------------------- students
+    
+    def save_student(self, entry: Dict, run_id: Optional[int] = None) -> None:
+        """Insert or replace one student's row, inventory and attempt in a single transaction"""
+        key = f"{entry['section']}/{entry['codio_id']}"
+        status = student_status(entry)
+        inventory = entry.get('inventory')
+        # The whole entry is kept as JSON (minus the inventory); columns repeat what is queried
+        record = {name: value for name, value in entry.items() if name != 'inventory'}
+        now = time.time()
+        
+        with self._lock, self._transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO students (key, section, slug, codio_id, status, content_hash, '
+                'fingerprint, entry_page, updated, run_id, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, entry['section'], entry['slug'], entry['codio_id'], status, entry.get('content_hash'),
+                 entry.get('fingerprint'), entry.get('entry_page'), now, run_id, json.dumps(record))
+            )
+            if inventory is not None or status == 'failed':
+                conn.execute('DELETE FROM files WHERE student_key = ?', (key,))
+                conn.executemany(
+                    'INSERT INTO files (student_key, path, size, mtime_ns, type, sha256) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(key, f['path'], f['size'], f['mtime_ns'], f['type'], f.get('sha256')) for f in inventory or []]
+                )
+            if run_id is not None:
+                conn.execute(
+                    'INSERT INTO attempts (run_id, student_key, status, changed, error, finished) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (run_id, key, status, entry.get('changed'), '; '.join(entry.get('errors', [])) or None, now)
+                )
+    
+    def clear_students(self) -> None:
+        """Forget the current roster (a full download starts from an empty build/)"""
+        with self._lock, self._transaction() as conn:
+            conn.execute('DELETE FROM files')
+            conn.execute('DELETE FROM students')
+    
+    def prune_students(self, run_id: int) -> int:
+        """Drop students the given download run did not see (no longer on the roster)"""
+        with self._lock, self._transaction() as conn:
+            stale = [row['key'] for row in conn.execute(
+                'SELECT key FROM students WHERE run_id IS NOT ?', (run_id,))]
+            for key in stale:
+                conn.execute('DELETE FROM files WHERE student_key = ?', (key,))
+                conn.execute('DELETE FROM students WHERE key = ?', (key,))
+        return len(stale)
+    
+    def _entries(self, rows: List[sqlite3.Row], inventory: bool) -> List[Dict]:
+        """Manifest entries for student rows, with their inventories read in one query"""
+        entries = [json.loads(row['record']) for row in rows]
+        keys = [row['key'] for row in rows if row['status'] != 'failed']
+        if not inventory or not keys:
+            return entries
+        
+        files: Dict[str, List[Dict]] = {}
+        with self._lock:
+            # Each key is a range scan of the (student_key, path) primary key
+            cursor = self._conn.execute(
+                f"SELECT student_key, path, size, mtime_ns, type, sha256 FROM files "
+                f"WHERE student_key IN ({', '.join('?' * len(keys))}) ORDER BY student_key, path",
+                keys
+            )
+            for f in cursor:
+                files.setdefault(f['student_key'], []).append(
+                    {'path': f['path'], 'size': f['size'], 'mtime_ns': f['mtime_ns'],
+                     'type': f['type'], 'sha256': f['sha256']}
+                )
+        # No rows means no inventory was recorded; the builder then scans the project itself
+        for row, entry in zip(rows, entries):
+            if row['key'] in files:
+                entry['inventory'] = files[row['key']]
+        return entries
+    
+    def _entry(self, row: sqlite3.Row, inventory: bool) -> Dict:
+        return self._entries([row], inventory)[0]
+    
+    def student(self, key: str, inventory: bool = True) -> Optional[Dict]:
+        """Manifest entry for a student key ("section/codio_id"), or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM students WHERE key = ?', (key,)).fetchone()
+        return self._entry(row, inventory) if row else None
+    
+    def find(self, section: str, slug: str, inventory: bool = True) -> Optional[Dict]:
+        """Manifest entry for a student by section and slug, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM students WHERE section = ? AND slug = ?',
+                                     (section, slug)).fetchone()
+        return self._entry(row, inventory) if row else None
+    
+    @staticmethod
+    def _filters(sections: Optional[Iterable[str]] = None, names: Optional[Iterable[str]] = None,
+                 keys: Optional[Iterable[str]] = None, status: Optional[str] = None) -> Tuple[List[str], List]:
+        """WHERE clauses and parameters for the student filters (each None means any)"""
+        clauses, params = [], []
+        for column, values in (('section', sections), ('key', keys)):
+            if values is not None:
+                values = sorted(values)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params += values
+        if names is not None:
+            # A name is a slug or a Codio id
+            names = sorted(names)
+            marks = ', '.join('?' * len(names))
+            clauses.append(f"(slug IN ({marks}) OR codio_id IN ({marks}))")
+            params += names + names
+        if status is not None:
+            clauses.append('status = ?')
+            params.append(status)
+        return clauses, params
+    
+    def students(self, sections: Optional[Iterable[str]] = None, names: Optional[Iterable[str]] = None,
+                 keys: Optional[Iterable[str]] = None, status: Optional[str] = None,
+                 inventory: bool = True) -> Iterator[Dict]:
+        """Manifest entries in (section, slug) order, optionally filtered - streamed, not loaded at once"""
+        clauses, params = self._filters(sections, names, keys, status)
+        
+        last = None
+        while True:
+            # Page by (section, slug, codio_id) so no cursor stays open across yields
+            page_clauses, page_params = list(clauses), list(params)
+            if last is not None:
+                page_clauses.append('(section, slug, codio_id) > (?, ?, ?)')
+                page_params += last
+            where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ''
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT * FROM students {where} ORDER BY section, slug, codio_id LIMIT ?",
+                    (*page_params, PAGE_SIZE)
+                ).fetchall()
+            yield from self._entries(rows, inventory)
+            if len(rows) < PAGE_SIZE:
+                return
+            last = [rows[-1]['section'], rows[-1]['slug'], rows[-1]['codio_id']]
+    
+    def roster(self, sections: Optional[Iterable[str]] = None, names: Optional[Iterable[str]] = None,
+               keys: Optional[Iterable[str]] = None) -> List[str]:
+        """<section>/<slug> of every student (or the filtered ones), without reading their records"""
+        clauses, params = self._filters(sections, names, keys)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT section, slug FROM students {where} ORDER BY section, slug", params
+            ).fetchall()
+        return [f"{row['section']}/{row['slug']}" for row in rows]
+    
+    def locate(self, name: str) -> List[str]:
+        """Keys of the students whose slug or Codio id is name (in any section)"""
+        with self._lock:
+            rows = self._conn.execute('SELECT key FROM students WHERE slug = ? OR codio_id = ? ORDER BY key',
+                                      (name, name)).fetchall()
+        return [row['key'] for row in rows]
+    
+    def recovered(self) -> List[str]:
+        """Keys of students whose latest download succeeded where the one before it failed"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.key FROM students s WHERE s.status != 'failed' AND "
+                "(SELECT a.status FROM attempts a WHERE a.student_key = s.key "
+                "ORDER BY a.id DESC LIMIT 1 OFFSET 1) = 'failed' ORDER BY s.key"
+            ).fetchall()
+        return [row['key'] for row in rows]
+    
+    def student_count(self, status: Optional[str] = None) -> int:
+        with self._lock:
+            if status is None:
+                return self._conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
+            return self._conn.execute('SELECT COUNT(*) FROM students WHERE status = ?', (status,)).fetchone()[0]
+    
+    def import_manifest(self, manifest: List[Dict]) -> None:
+        """Seed the store from a manifest.json written before the store existed"""
+        for entry in manifest:
+            self.save_student(entry)
+    
+    def export_manifest(self, path: Path) -> int:
+        """Write build/manifest.json from the store, one student at a time; returns the count"""
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        count = 0
+        with open(tmp_path, 'w') as f:
+            f.write('[')
+            for entry in self.students():
+                f.write(',\n' if count else '\n')
+                f.write('\n'.join('  ' + line for line in json.dumps(entry, indent=2).splitlines()))
+                count += 1
+            f.write('\n]' if count else ']')
+        tmp_path.replace(path)
+        return count
+    
+    # ------------------------------------------------------------ validation
+    
+    def save_validation(self, run_id: int, details: List[Dict]) -> None:
+        """Store every check from one validate run"""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                'INSERT INTO validation (run_id, section, student, url, status, message, checked) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, d['section'], d['student'], d.get('url'), d['status'], d.get('message'), now)
+                 for d in details]
+            )
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Pipeline Tracing for About Me Projects (25-26)
+
+Records timed spans for each pipeline stage and each per-student operation
+(export, polls, download, extract, scan, copy, render, link checks) and writes
+them as Chrome trace JSON, which opens in chrome://tracing or
+https://ui.perfetto.dev. Rate-limiter and poll sleeps are added up as counters,
+the adaptive concurrency window is recorded as it moves, and each stage can
+carry a cProfile and/or tracemalloc summary.
+
+Tracing is process-wide and off by default: until enable() is called, span()
+and the other helpers do nothing, so instrumented code pays almost nothing.
+"""
+
+import asyncio
+import cProfile
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+
+PROFILE_MODES = ['cpu', 'memory', 'all']
+
+# Functions / allocation sites kept in each stage's profile summary
+PROFILE_TOP = 15
+
+
+class Tracer:
+    """Collects Chrome trace events for one run"""
+    
+    def __init__(self, path: Path, profile: Optional[str] = None):
+        self.path = path
+        self.profile_cpu = profile in ('cpu', 'all')
+        self.profile_memory = profile in ('memory', 'all')
+        self.pid = os.getpid()
+        self.events: List[Dict] = []
+        self.sleeps: Dict[str, float] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._track_ids: Dict[Any, int] = {}
+        self._next_track = itertools.count(1)
+    
+    def now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+    
+    def track(self) -> int:
+        """Timeline row for the caller: its thread, or its asyncio task"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = task if task is not None else threading.get_ident()
+        track = self._track_ids.get(key)
+        if track is None:
+            with self._lock:
+                track = self._track_ids.get(key)
+                if track is None:
+                    track = self._track_ids[key] = next(self._next_track)
+                    name = task.get_name() if task is not None else threading.current_thread().name
+                    self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid,
+                                        'tid': track, 'args': {'name': name}})
+        return track
+    
+    def complete(self, name: str, cat: str, start_us: float, dur_us: float, args: Dict) -> None:
+        self.events.append({
+            'name': name, 'cat': cat, 'ph': 'X', 'ts': round(start_us, 1), 'dur': round(dur_us, 1),
+            'pid': self.pid, 'tid': self.track(), 'args': args
+        })
+    
+    def add_sleep(self, source: str, seconds: float) -> None:
+        with self._lock:
+            total = self.sleeps[source] = self.sleeps.get(source, 0.0) + seconds
+            self.events.append({
+                'name': f"sleep.{source}", 'ph': 'C', 'ts': round(self.now_us(), 1), 'pid': self.pid,
+                'args': {'seconds': round(total, 3)}
+            })
+    
+    def counter(self, name: str, values: Dict) -> None:
+        with self._lock:
+            self.events.append({
+                'name': name, 'ph': 'C', 'ts': round(self.now_us(), 1), 'pid': self.pid, 'args': values
+            })
+    
+    def write(self) -> Path:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        trace = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'sleep_seconds': {name: round(total, 3) for name, total in self.sleeps.items()}}
+        }
+        with open(self.path, 'w') as f:
+            json.dump(trace, f)
+        return self.path
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable(path: Path, profile: Optional[str] = None) -> Tracer:
+    """Start recording spans for this process"""
+    global _tracer
+    _tracer = Tracer(path, profile)
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def span(name: str, cat: str = 'pipeline', **args) -> Iterator[Dict]:
+    """Time a block; the yielded dict can be filled with results (bytes, counts)"""
+    tracer = _tracer
+    if tracer is None:
+        yield args
+        return
+    start = tracer.now_us()
+    try:
+        yield args
+    except BaseException as e:
+        args['error'] = repr(e)
+        raise
+    finally:
+        tracer.complete(name, cat, start, tracer.now_us() - start, args)
+
+
+def record(name: str, cat: str, start: float, seconds: float, **args) -> None:
+    """Add a span measured by the caller (start from time.perf_counter())"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.complete(name, cat, (start - tracer._origin) * 1e6, seconds * 1e6, args)
+
+
+def counter(name: str, **values) -> None:
+    """Record the current value of a counter (e.g. the concurrency window)"""
+    if _tracer is not None:
+        _tracer.counter(name, values)
+
+
+def add_sleep(source: str, seconds: float) -> None:
+    """Count time spent deliberately sleeping (rate limiting, poll intervals)"""
+    if _tracer is not None and seconds > 0:
+        _tracer.add_sleep(source, seconds)
+
+
+def _cpu_summary(profiler: cProfile.Profile) -> List[Dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(filename)}:{line}({function})",
+            'calls': calls,
+            'tottime': round(tottime, 4),
+            'cumtime': round(cumtime, 4)
+        })
+    rows.sort(key=lambda row: -row['cumtime'])
+    return rows[:PROFILE_TOP]
+
+
+def _memory_summary(before: tracemalloc.Snapshot) -> Dict:
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    top = after.compare_to(before, 'lineno')[:PROFILE_TOP]
+    return {
+        'peak_bytes': peak,
+        'top_allocations': [
+            {'site': str(stat.traceback), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+            for stat in top
+        ]
+    }
+
+
+@contextmanager
+def stage(name: str) -> Iterator[Dict]:
+    """Span for a pipeline stage, with cProfile/tracemalloc summaries when requested
+    
+    cProfile only sees the calling thread; worker threads show up as spans instead.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield {}
+        return
+    
+    profiler = cProfile.Profile() if tracer.profile_cpu else None
+    before = None
+    if tracer.profile_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+    
+    with span(name, 'stage') as args:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield args
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                args['cpu_profile'] = _cpu_summary(profiler)
+            if before is not None:
+                args['memory'] = _memory_summary(before)
+
+
+def finish(logger: logging.Logger) -> Optional[Path]:
+    """Write the trace file and log where the time went"""
+    global _tracer
+    tracer = _tracer
+    if tracer is None:
+        return None
+    _tracer = None
+    
+    stages = [event for event in tracer.events if event.get('cat') == 'stage']
+    for event in stages:
+        logger.info(f"Trace: {event['name']} took {event['dur'] / 1e6:.1f}s")
+    for source, total in sorted(tracer.sleeps.items()):
+        logger.info(f"Trace: {total:.1f}s spent sleeping in {source}")
+    path = tracer.write()
+    logger.info(f"Trace written to {path} ({len(tracer.events)} events) - open it in https://ui.perfetto.dev")
+    return path
+
+
+class CountingReader(io.RawIOBase):
+    """Wraps a stream to count the bytes read and the seconds spent reading"""
+    
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.bytes = 0
+        self.seconds = 0.0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        start = time.perf_counter()
+        data = self.stream.read(len(buffer))
+        self.seconds += time.perf_counter() - start
+        n = len(data)
+        buffer[:n] = data
+        self.bytes += n
+        return n
@@ -0,0 +1,67 @@
+"""Shared fixtures: scripts/ on sys.path and a scratch project against the fake Codio server"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from urllib.request import urlopen
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import benchmark  # noqa: E402
+
+
+class FakeProject:
+    """A scratch project (config, build/, site/, state/) wired to a running fake Codio server"""
+    
+    def __init__(self, root: Path, ready: dict, options: argparse.Namespace):
+        self.root = root
+        self.base_url = ready['ready']
+        self.config_path = benchmark.write_config(root, ready['courses'], options)
+        self.env = {
+            **os.environ,
+            'CODIO_API_BASE_URL': f"{self.base_url}/api/v1",
+            'CODIO_OAUTH_URL': f"{self.base_url}/oauth/token",
+            'CODIO_CLIENT_ID': 'test',
+            'CODIO_CLIENT_SECRET': 'test',
+            'CODIO_RATE_LIMIT_STATE': str(root / 'rate_limit.json'),
+            'CODIO_BURST_RATE_LIMIT': '1000',
+            'CODIO_DAILY_LIMIT': str(10 ** 9)
+        }
+    
+    def configure(self, **settings) -> None:
+        """Merge settings into the project's config file"""
+        with open(self.config_path) as f:
+            config = yaml.safe_load(f)
+        config.update(settings)
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+    
+    def run(self, *command: str) -> None:
+        """Run one publish_about_me.py command, failing the test if it fails"""
+        benchmark.run_stage(self.config_path, self.env, *command)
+    
+    def stats(self) -> dict:
+        """The fake server's request counters"""
+        with urlopen(f"{self.base_url}/_stats") as response:
+            return json.load(response)
+
+
+@pytest.fixture
+def fake_project(tmp_path):
+    """Eight students in four sections, served by a fake Codio server for this test only"""
+    options = argparse.Namespace(
+        sections=4, project_kb=50, latency=0.0, p429=0.0, p401=0.0, rate_limit='none',
+        export_polls=1, p_drop=0.0, bandwidth_kbps=0, max_in_flight=0,
+        concurrency=4, fixed=False, mode='threaded'
+    )
+    server, ready = benchmark.start_fake_server(options, 8)
+    try:
+        yield FakeProject(tmp_path, ready, options)
+    finally:
+        server.terminate()
+        server.wait()
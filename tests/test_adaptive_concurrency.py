@@ -0,0 +1,121 @@
+"""AdaptiveLimiter: AIMD growth and back-off, bounds, and threads and coroutines sharing a window"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import adaptive_concurrency
+from adaptive_concurrency import AdaptiveLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable time.monotonic() for the limiter"""
+    now = [100.0]
+    monkeypatch.setattr(adaptive_concurrency.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def request(limiter, clock, seconds: float = 0.1, outcome: str = 'ok') -> None:
+    """One request through the limiter, taking `seconds` of fake time"""
+    with limiter.slot() as slot:
+        clock[0] += seconds
+        if outcome != 'ok':
+            slot['outcome'] = outcome
+
+
+def test_healthy_responses_widen_the_window(clock):
+    limiter = AdaptiveLimiter(4, {'max': 6})
+    for _ in range(5):
+        request(limiter, clock)
+    assert limiter.limit == 5   # about one slot per window's worth of responses
+    for _ in range(50):
+        request(limiter, clock)
+    assert limiter.limit == 6   # never past max
+    assert limiter.stats()['peak_window'] == 6
+
+
+def test_slow_responses_pause_growth(clock):
+    limiter = AdaptiveLimiter(4, {'latency_tolerance': 2.0})
+    for _ in range(4):
+        request(limiter, clock, 0.1)
+    window = limiter.window
+    for _ in range(8):
+        request(limiter, clock, 1.0)
+    assert limiter.window == window
+
+
+def test_throttling_halves_the_window_once_per_round_trip(clock):
+    limiter = AdaptiveLimiter(16, {'min': 2})
+    # Four requests in flight when the server starts answering 429
+    slots = [limiter.slot() for _ in range(4)]
+    results = [slot.__enter__() for slot in slots]
+    clock[0] += 0.1
+    for slot, result in zip(slots, results):
+        result['outcome'] = 'throttled'
+        slot.__exit__(None, None, None)
+    assert limiter.limit == 8
+    
+    # Requests sent after the cut may cut again, down to min
+    for _ in range(3):
+        request(limiter, clock, outcome='timeout')
+    assert limiter.limit == 2
+    stats = limiter.stats()
+    assert (stats['throttled'], stats['timeout'], stats['decreases']) == (4, 3, 4)
+
+
+def test_errors_are_recorded_without_resizing(clock):
+    limiter = AdaptiveLimiter(4)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError('boom')
+    assert limiter.stats()['error'] == 1 and limiter.limit == 4 and limiter.in_flight == 0
+
+
+def test_fixed_window_does_not_adapt(clock):
+    limiter = AdaptiveLimiter(3, {'adaptive': False})
+    for _ in range(20):
+        request(limiter, clock)
+    request(limiter, clock, outcome='throttled')
+    assert (limiter.minimum, limiter.limit, limiter.maximum) == (3, 3, 3)
+    
+    limiter.resize(1)
+    assert limiter.limit == 1
+
+
+def test_threads_and_coroutines_share_one_window():
+    limiter = AdaptiveLimiter(3, {'adaptive': False})
+    peak = [0]
+    lock = threading.Lock()
+    
+    def observe():
+        with lock:
+            peak[0] = max(peak[0], limiter.in_flight)
+    
+    def thread_worker():
+        for _ in range(20):
+            with limiter.slot():
+                observe()
+                time.sleep(0.002)
+    
+    async def coroutine_worker():
+        for _ in range(20):
+            async with limiter.slot_async():
+                observe()
+                await asyncio.sleep(0.002)
+    
+    async def main():
+        # Threads hold most of the window, so coroutines mostly wait on slots a thread frees
+        threads = [threading.Thread(target=thread_worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        await asyncio.wait_for(asyncio.gather(*(coroutine_worker() for _ in range(3))), 20)
+        for thread in threads:
+            await asyncio.to_thread(thread.join)
+    
+    asyncio.run(main())
+    assert peak[0] <= 3
+    assert limiter.in_flight == 0
+    assert limiter.stats()['requests'] == 120
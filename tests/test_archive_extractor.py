@@ -0,0 +1,77 @@
+"""ArchiveExtractor: streaming zstd/tar extraction, exclusions, links and unsafe members"""
+
+import io
+import logging
+import tarfile
+
+import zstandard
+
+from codio_downloader_images import ArchiveExtractor, ExcludeMatcher
+
+
+def make_archive(members, compress: bool = True) -> io.BytesIO:
+    """A tar (zstd-compressed by default) from (name, data-or-None, mtime, link-target) tuples"""
+    raw = io.BytesIO()
+    with tarfile.open(fileobj=raw, mode='w') as tar:
+        for name, data, mtime, link in members:
+            info = tarfile.TarInfo(name)
+            info.mtime = mtime
+            if link:
+                info.type, info.linkname = tarfile.LNKTYPE, link
+                tar.addfile(info)
+            elif data is None:
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            else:
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+    payload = raw.getvalue()
+    return io.BytesIO(zstandard.ZstdCompressor().compress(payload) if compress else payload)
+
+
+def files_under(root) -> dict:
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in root.rglob('*') if path.is_file()}
+
+
+def test_streamed_zstd_archive(tmp_path, caplog):
+    archive = make_archive([
+        ('./', None, 0, None),
+        ('./index.html', b'<h1>Hi</h1>', 100, None),
+        ('./images/me.jpg', b'jpeg', 300, None),
+        ('./images/copy.jpg', None, 300, 'images/me.jpg'),
+        ('./.guides/content.md', b'guide', 900, None),
+        ('./lib/cache/a.pyc', b'x', 900, None)
+    ])
+    with caplog.at_level(logging.WARNING):
+        mtimes = ArchiveExtractor(exclude_globs=['*.pyc']).extract_stream(archive, tmp_path / 'out')
+    
+    assert files_under(tmp_path / 'out') == {'index.html': b'<h1>Hi</h1>', 'images/me.jpg': b'jpeg',
+                                             'images/copy.jpg': b'jpeg'}
+    images = tmp_path / 'out' / 'images'
+    assert (images / 'copy.jpg').stat().st_ino == (images / 'me.jpg').stat().st_ino
+    assert mtimes == {'': 300, 'images': 300}
+    assert caplog.records == []
+
+
+def test_plain_tar_and_unsafe_members(tmp_path, caplog):
+    archive = make_archive([
+        ('index.html', b'ok', 1, None),
+        ('../escape.txt', b'no', 1, None),
+        ('/etc/passwd', b'no', 1, None),
+        ('copy.txt', None, 1, 'missing.txt')
+    ], compress=False)
+    with caplog.at_level(logging.WARNING):
+        ArchiveExtractor().extract_stream(archive, tmp_path / 'out')
+    
+    assert files_under(tmp_path / 'out') == {'index.html': b'ok'}
+    assert not (tmp_path / 'escape.txt').exists()
+    assert len(caplog.records) == 3
+
+
+def test_configured_excludes_add_to_the_defaults():
+    matcher = ExcludeMatcher(['node_modules', '*.pyc', '.git'])
+    assert matcher.patterns == ['.git', '.guides', '.codio', 'node_modules', '*.pyc']
+    assert matcher.excludes('.codio/settings.json')
+    assert matcher.excludes('app/node_modules/x/index.js')
+    assert matcher.excludes('lib/a.pyc')
+    assert not matcher.excludes('images/node.png')
@@ -0,0 +1,55 @@
+"""AssetStore: one object per distinct content, hard links with a copy fallback, pruning"""
+
+import hashlib
+import io
+import os
+
+import asset_store
+from asset_store import OBJECT_MTIME, AssetStore, dedup_report, link_or_copy
+
+
+def test_identical_files_share_one_object(tmp_path):
+    store = AssetStore(tmp_path / 'objects')
+    first = store.add_stream(io.BytesIO(b'starter'), tmp_path / 'build' / 'a' / 'style.css')
+    second = store.add_stream(io.BytesIO(b'starter'), tmp_path / 'build' / 'b' / 'style.css')
+    store.add_stream(io.BytesIO(b'mine'), tmp_path / 'build' / 'b' / 'me.txt')
+    
+    assert first == second == hashlib.sha256(b'starter').hexdigest()
+    obj = store.object_path(first)
+    assert obj.read_bytes() == b'starter'
+    assert obj.stat().st_nlink == 3
+    assert obj.stat().st_mtime == OBJECT_MTIME
+    assert store.stats == {'files': 3, 'bytes': 18, 'new_objects': 2, 'new_bytes': 11}
+    assert not list((tmp_path / 'objects').glob('.tmp-*'))
+    
+    report = dedup_report([tmp_path / 'build'])
+    assert report['files'] == 3 and report['unique_files'] == 2
+    assert report['saved_bytes'] == len(b'starter')
+
+
+def test_link_falls_back_to_a_copy(tmp_path, monkeypatch):
+    def no_links(src, dest):
+        raise OSError('cross-device link')
+    
+    monkeypatch.setattr(asset_store.os, 'link', no_links)
+    monkeypatch.setattr(asset_store, '_reflink', lambda src, dest: False)
+    src = tmp_path / 'src.txt'
+    src.write_text('content')
+    dest = tmp_path / 'dest.txt'
+    dest.write_text('stale')
+    
+    link_or_copy(src, dest)
+    assert dest.read_text() == 'content'
+    assert dest.stat().st_ino != src.stat().st_ino
+
+
+def test_prune_removes_only_unlinked_objects(tmp_path):
+    store = AssetStore(tmp_path / 'objects')
+    kept = store.add_stream(io.BytesIO(b'kept'), tmp_path / 'site' / 'kept.txt')
+    gone = store.add_stream(io.BytesIO(b'gone!'), tmp_path / 'site' / 'gone.txt')
+    os.unlink(tmp_path / 'site' / 'gone.txt')
+    
+    assert store.prune() == (1, 5)
+    assert store.object_path(kept).exists()
+    assert not store.object_path(gone).exists()
+    assert store.prune() == (0, 0)
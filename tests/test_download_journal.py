@@ -0,0 +1,71 @@
+"""Download journal replay, and --resume picking up an interrupted download"""
+
+import json
+import logging
+
+from download_journal import DownloadJournal
+
+
+def write_lines(path, records, torn: str = ''):
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records) + torn)
+
+
+def test_replay_keeps_the_latest_state_per_key(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    write_lines(path, [
+        {'event': 'run', 'resume': False},
+        {'key': 'S1/a', 'state': 'exported', 'url': 'http://old'},
+        {'key': 'S1/a', 'state': 'downloaded', 'bytes': 10},
+        {'key': 'S1/a', 'state': 'exported', 'url': 'http://new'},
+        {'key': 'S1/b', 'state': 'exported', 'url': 'http://b'},
+        {'key': 'S1/b', 'state': 'extracted', 'source_mtimes': {'': 5}},
+    ], torn='{"key": "S1/b", "state": "sca')
+    
+    journal = DownloadJournal(path, logging.getLogger('test'))
+    assert journal.load()
+    assert journal.completed is False
+    # A new export starts the student over; later states merge into it
+    assert journal.state('S1/a') == {'key': 'S1/a', 'state': 'exported', 'url': 'http://new'}
+    assert journal.state('S1/b')['state'] == 'extracted'
+    assert journal.state('S1/b')['url'] == 'http://b'
+
+
+def test_finished_run_is_marked_complete(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = DownloadJournal(path, logging.getLogger('test'))
+    journal.start(mode='threaded')
+    journal.record('S1/a', 'scanned', result={'slug': 'a'})
+    journal.finish()
+    
+    replayed = DownloadJournal(path, logging.getLogger('test'))
+    assert replayed.load()
+    assert replayed.completed
+    assert replayed.state('S1/a')['result'] == {'slug': 'a'}
+
+
+def test_resume_reuses_finished_students_and_exports(fake_project):
+    fake_project.run('download')
+    journal_path = fake_project.root / 'build' / 'download_journal.jsonl'
+    records = [json.loads(line) for line in journal_path.read_text().splitlines()]
+    students = sorted({record['key'] for record in records if 'key' in record})
+    assert len(students) == 8
+    
+    # Interrupt the run after two students' exports finished but before they downloaded
+    interrupted = set(students[:2])
+    kept = [record for record in records
+            if record.get('event') != 'complete'
+            and not (record.get('key') in interrupted and record.get('state') != 'exported')]
+    write_lines(journal_path, kept)
+    before = fake_project.stats()
+    
+    fake_project.run('--resume', 'download')
+    after = fake_project.stats()
+    
+    export_endpoint = '/courses/:id/assignments/:id/students/:id/download'
+    assert after['by_endpoint'][export_endpoint] == before['by_endpoint'][export_endpoint]
+    assert after['downloads'] - before['downloads'] == len(interrupted)
+    
+    manifest = json.loads((fake_project.root / 'build' / 'manifest.json').read_text())
+    assert len(manifest) == 8
+    assert not any('errors' in student for student in manifest)
+    assert all(student['source_mtime'] for student in manifest)
@@ -0,0 +1,50 @@
+"""Every download_mode fetches the same projects as a threaded download"""
+
+import json
+
+
+def downloaded(project) -> dict:
+    """Each student's files and their hashes, keyed by section/slug"""
+    manifest = json.loads((project.root / 'build' / 'manifest.json').read_text())
+    assert not any('errors' in student for student in manifest)
+    return {
+        f"{student['section']}/{student['slug']}": {entry['path']: entry['sha256'] for entry in student['inventory']}
+        for student in manifest
+    }
+
+
+def download_in_mode(project, mode: str) -> dict:
+    """Download once threaded, then again in `mode`; returns both results and the second run's requests"""
+    project.run('download')
+    threaded = downloaded(project)
+    before = project.stats()
+    project.configure(download_mode=mode)
+    project.run('download')
+    after = project.stats()
+    requests = {endpoint: count - before['by_endpoint'].get(endpoint, 0)
+                for endpoint, count in after['by_endpoint'].items()}
+    return threaded, downloaded(project), requests
+
+
+def test_async_mode(fake_project):
+    threaded, result, requests = download_in_mode(fake_project, 'async')
+    assert len(result) == 8
+    assert result == threaded
+    assert requests['/courses/:id/assignments/:id/students/:id/download'] == 8
+
+
+def test_two_phase_mode(fake_project):
+    threaded, result, requests = download_in_mode(fake_project, 'two_phase')
+    assert result == threaded
+    # Every export is submitted once, and each task is polled until it is ready
+    assert requests['/courses/:id/assignments/:id/students/:id/download'] == 8
+    assert requests['/tasks/:id'] >= 8
+
+
+def test_bulk_mode(fake_project):
+    threaded, result, requests = download_in_mode(fake_project, 'bulk')
+    assert result == threaded
+    # One archive per section instead of one export per student
+    assert requests['/courses/:id/assignments/:id/download'] == 4
+    assert requests['/courses/:id/assignments/:id/students/:id/download'] == 0
+
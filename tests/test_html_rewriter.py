@@ -0,0 +1,69 @@
+"""ResponsiveImageRewriter: width/height only where no stylesheet sizes the image"""
+
+import logging
+import re
+
+import pytest
+
+from html_rewriter import ResponsiveImageRewriter, _sizing_subjects
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def rewrite(tmp_path, page: str, stylesheet: str = '') -> str:
+    """Rewrite one student page next to a 1200x800 photo and return the result"""
+    student_dir = tmp_path / 'site' / 'S1' / 'amy'
+    student_dir.mkdir(parents=True)
+    Image.new('RGB', (1200, 800), 'red').save(student_dir / 'me.jpg')
+    (student_dir / 'style.css').write_text(stylesheet)
+    (student_dir / 'index.html').write_text(page)
+    
+    rewriter = ResponsiveImageRewriter({'workers': 1}, tmp_path / 'cache', tmp_path / 'state.json',
+                                       logging.getLogger('test'))
+    rewriter.rewrite_site(tmp_path / 'site')
+    return (student_dir / 'index.html').read_text()
+
+
+def img_tags(html: str):
+    return re.findall(r'<img[^>]*>', html)
+
+
+def test_dimensions_added_without_css(tmp_path):
+    html = rewrite(tmp_path, '<p>Hi</p><img src="me.jpg">')
+    assert 'width="1200"' in html and 'height="800"' in html
+
+
+def test_class_rule_keeps_attributes_off_matching_images(tmp_path):
+    html = rewrite(
+        tmp_path,
+        '<link rel="stylesheet" href="style.css"><img src="me.jpg" class="photo round"><img src="me.jpg">',
+        '.photo { width: 300px }'
+    )
+    styled, plain = img_tags(html)
+    assert 'height=' not in styled and 'width=' not in styled
+    assert 'width="1200"' in plain and 'height="800"' in plain
+
+
+def test_max_width_rule_on_img_keeps_attributes_off(tmp_path):
+    html = rewrite(tmp_path, '<style>@media (min-width: 600px) { main img { max-width: 100% } }</style>'
+                             '<img src="me.jpg" id="me">')
+    assert 'height=' not in img_tags(html)[0]
+
+
+def test_unrelated_rules_do_not_block_dimensions(tmp_path):
+    html = rewrite(
+        tmp_path,
+        '<link rel="stylesheet" href="style.css"><img src="me.jpg" class="photo">',
+        'p { line-height: 2 } .card { width: 50% } #banner { height: 80px }'
+    )
+    assert 'width="1200"' in html and 'height="800"' in html
+
+
+def test_sizing_subjects():
+    css = '/* .x{width:1px} */ .photo{width:300px} p{line-height:2} #me img.big:hover{height:1em} a, *{min-width:0}'
+    assert _sizing_subjects(css) == [
+        (None, {'photo'}, set()),
+        ('img', {'big'}, set()),
+        ('a', set(), set()),
+        (None, set(), set())
+    ]
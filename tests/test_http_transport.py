@@ -0,0 +1,89 @@
+"""HTTPTransport: keep-alive connections reused across requests and threads, counted per host"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_transport import HTTPTransport
+from state_store import StateStore
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        body = b'x' * 1000
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_HEAD(self):
+        self.server.peers.add(self.client_address)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    server.daemon_threads = True
+    server.peers = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_share_one_connection(server):
+    transport = HTTPTransport(pool_size=4)
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    for _ in range(10):
+        assert transport.get(url).content == b'x' * 1000
+    for _ in range(5):
+        assert transport.head(url).status_code == 200
+    transport.close()
+    
+    assert transport.stats() == {'127.0.0.1': {'requests': 15, 'connections': 1, 'reused': 14}}
+    assert len(server.peers) == 1
+    assert transport.summary() == '127.0.0.1 15 requests over 1 connections (93% reused)'
+
+
+def test_concurrent_workers_are_bounded_by_the_pool(server):
+    transport = HTTPTransport(pool_size=4, settings={'socket_buffer_kb': 256})
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        statuses = list(pool.map(lambda _: transport.get(url).status_code, range(100)))
+    transport.close()
+    
+    assert statuses == [200] * 100
+    stats = transport.stats()['127.0.0.1']
+    assert stats['requests'] == 100
+    assert stats['connections'] <= 4 and len(server.peers) == stats['connections']
+
+
+def test_no_requests_yet():
+    transport = HTTPTransport(pool_size=1, settings={'socket_buffer_kb': None})
+    assert transport.stats() == {} and transport.summary() == 'no requests'
+    assert transport.read_size == 1024 * 1024
+
+
+def test_download_reuses_connections_to_codio(fake_project):
+    fake_project.run('download')
+    store = StateStore(fake_project.root / 'state' / 'about_me.db', logging.getLogger('test'))
+    http = store.last_run('download')['details']['http']
+    store.close()
+    
+    # API calls and archive downloads for eight students, mostly over reused connections
+    counts = http['127.0.0.1']
+    assert counts['requests'] >= 36
+    assert counts['reused'] > counts['connections'] * 3
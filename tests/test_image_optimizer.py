@@ -0,0 +1,73 @@
+"""ImageOptimizer: downscaling, HEIC conversion and the result cache (including failures)"""
+
+import logging
+
+import pytest
+
+from image_optimizer import ImageOptimizer
+
+Image = pytest.importorskip('PIL.Image')
+
+SETTINGS = {'max_dimension': 400, 'min_bytes': 0, 'workers': 1}
+
+
+def optimize(tmp_path):
+    optimizer = ImageOptimizer(SETTINGS, tmp_path / 'cache', logging.getLogger('test'))
+    return optimizer.optimize_site(tmp_path / 'site')
+
+
+@pytest.fixture
+def student_dir(tmp_path):
+    path = tmp_path / 'site' / 'S1' / 'amy'
+    path.mkdir(parents=True)
+    Image.effect_noise((1200, 900), 64).convert('RGB').save(path / 'big.jpg', quality=95)
+    return path
+
+
+def test_large_photo_is_downscaled_once(tmp_path, student_dir):
+    original = (student_dir / 'big.jpg').read_bytes()
+    first = optimize(tmp_path)
+    assert (first['processed'], first['cached']) == (1, 0)
+    with Image.open(student_dir / 'big.jpg') as img:
+        assert img.size == (400, 300)
+    
+    # The optimized output is itself recognized as done
+    second = optimize(tmp_path)
+    assert (second['processed'], second['cached']) == (0, 1)
+    
+    # The original coming back (a fresh download) is served from the cache
+    (student_dir / 'big.jpg').unlink()
+    (student_dir / 'big.jpg').write_bytes(original)
+    third = optimize(tmp_path)
+    assert (third['processed'], third['cached']) == (0, 1)
+    with Image.open(student_dir / 'big.jpg') as img:
+        assert img.size == (400, 300)
+
+
+def test_heic_becomes_jpeg_and_references_follow(tmp_path, student_dir):
+    pytest.importorskip('pillow_heif')
+    Image.new('RGB', (800, 600), 'blue').save(student_dir / 'me.heic')
+    (student_dir / 'index.html').write_bytes(b'<img src="me.heic">\r\n<p>caf\xe9</p>\r\n')
+    
+    stats = optimize(tmp_path)
+    assert stats['heic_converted'] == 1
+    assert not (student_dir / 'me.heic').exists()
+    with Image.open(student_dir / 'me.jpg') as img:
+        assert (img.format, img.size) == ('JPEG', (400, 300))
+    assert (student_dir / 'index.html').read_bytes() == b'<img src="me.jpg">\r\n<p>caf\xe9</p>\r\n'
+
+
+def test_broken_image_is_not_retried(tmp_path, student_dir, caplog):
+    (student_dir / 'broken.jpg').write_bytes(b'not a jpeg' * 100)
+    with caplog.at_level(logging.WARNING):
+        first = optimize(tmp_path)
+    assert (first['processed'], first['failed']) == (2, 1)
+    assert 'broken.jpg' in caplog.text
+    
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        second = optimize(tmp_path)
+    assert (second['processed'], second['failed']) == (0, 1)
+    assert caplog.text == ''
+    assert (student_dir / 'broken.jpg').read_bytes() == b'not a jpeg' * 100
+    assert not list((tmp_path / 'cache').glob('*.tmp'))
@@ -0,0 +1,59 @@
+"""InventoryScanner: one pass per project, reusing digests recorded by the asset store"""
+
+import hashlib
+import io
+import json
+import shutil
+
+import inventory
+from asset_store import AssetStore
+from inventory import InventoryScanner, entries_under, inventory_fingerprint
+
+
+def test_scan_records_every_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(inventory, 'MMAP_THRESHOLD', 4)
+    (tmp_path / 'images').mkdir()
+    (tmp_path / 'index.html').write_bytes(b'<h1>')
+    (tmp_path / 'images' / 'me.jpg').write_bytes(b'jpeg bytes')
+    (tmp_path / 'link.html').symlink_to('index.html')
+    (tmp_path / 'dangling').symlink_to('nowhere')
+    
+    scanner = InventoryScanner(max_workers=2)
+    entries = scanner.scan(tmp_path)
+    scanner.close()
+    assert [(e['path'], e['type'], e['size']) for e in entries] == [
+        ('images/me.jpg', 'file', 10), ('index.html', 'file', 4), ('link.html', 'symlink', 4)
+    ]
+    assert entries[0]['sha256'] == hashlib.sha256(b'jpeg bytes').hexdigest()
+    assert entries_under(entries, 'images') == [{**entries[0], 'path': 'me.jpg'}]
+    assert inventory_fingerprint(entries) != inventory_fingerprint(entries[1:])
+
+
+def test_store_digests_are_reused(tmp_path, monkeypatch):
+    store = AssetStore(tmp_path / 'objects')
+    project = tmp_path / 'project'
+    store.add_stream(io.BytesIO(b'stored'), project / 'style.css')
+    (project / 'notes.txt').write_bytes(b'written directly')
+    shutil.copy(project / 'style.css', project / 'copy.css')  # same content, its own inode
+    
+    hashed = []
+    real_digest = inventory.file_digest
+    monkeypatch.setattr(inventory, 'file_digest', lambda path, size: hashed.append(path) or real_digest(path, size))
+    entries = {e['path']: e['sha256'] for e in InventoryScanner().scan(project, store.digests)}
+    
+    assert sorted(hashed) == [str(project / 'copy.css'), str(project / 'notes.txt')]
+    assert entries['style.css'] == entries['copy.css'] == hashlib.sha256(b'stored').hexdigest()
+    
+    # Once pruned, the object's inode is forgotten
+    shutil.rmtree(project)
+    store.prune()
+    assert store.digests == {}
+
+
+def test_download_inventory_matches_the_files(fake_project):
+    fake_project.run('download')
+    manifest = json.loads((fake_project.root / 'build' / 'manifest.json').read_text())
+    for student in manifest:
+        student_dir = fake_project.root / student['local_path']
+        for entry in student['inventory']:
+            assert entry['sha256'] == hashlib.sha256((student_dir / entry['path']).read_bytes()).hexdigest()
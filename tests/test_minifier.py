@@ -0,0 +1,39 @@
+"""Unused-CSS pruning: usage collection from markup, scripts and inline handlers"""
+
+from minifier import _project_usage, prune_css, selector_may_match
+
+
+def usage_of(tmp_path, html: str, js: str = ''):
+    (tmp_path / 'index.html').write_text(html)
+    if js:
+        (tmp_path / 'app.js').write_text(js)
+    return _project_usage(tmp_path)
+
+
+def test_markup_classes_ids_and_tags(tmp_path):
+    usage = usage_of(tmp_path, '<div class="card big" id="me"><span>Hi</span></div>')
+    assert {'card', 'big'} <= usage['classes']
+    assert 'me' in usage['ids']
+    assert {'div', 'span', 'body'} <= usage['tags']
+
+
+def test_inline_handlers_count_as_script(tmp_path):
+    usage = usage_of(
+        tmp_path,
+        '<button onclick="document.body.classList.toggle(\'dark-mode\')">Theme</button>'
+        '<a href="javascript:show(\'menu-open\')">Menu</a>'
+    )
+    assert {'dark-mode', 'menu-open'} <= usage['words']
+    assert selector_may_match('body.dark-mode button', usage)
+    assert selector_may_match('nav.menu-open', usage) is False  # no <nav> on the page
+
+
+def test_script_files_and_blocks(tmp_path):
+    usage = usage_of(tmp_path, '<script>el.className = "shown"</script>', 'x.classList.add("faded")')
+    assert {'shown', 'faded'} <= usage['words']
+
+
+def test_prune_css_keeps_only_reachable_rules(tmp_path):
+    usage = usage_of(tmp_path, '<p class="intro" onmouseover="this.classList.add(\'glow\')">Hi</p>')
+    css = '.intro{color:red}.glow{color:gold}.unused{color:blue}@media (max-width:600px){.unused{x:y}p{margin:0}}'
+    assert prune_css(css, usage) == '.intro{color:red}.glow{color:gold}@media (max-width:600px){p{margin:0}}'
@@ -0,0 +1,103 @@
+"""PageWeightAuditor: what an entry page loads, the srcset candidate chosen, and budgets"""
+
+import gzip
+import json
+import logging
+
+import pytest
+
+from page_weight import PageWeightAuditor, _slot_width, srcset_choice
+
+SRCSET = 'me-200w.jpg 200w, me-400w.jpg 400w, me-800w.jpg 800w, me.jpg 1600w'
+
+
+@pytest.mark.parametrize('sizes, viewport, ratio, expected', [
+    ('', 1366, 1.0, 'me.jpg'),                                     # 100vw: 1366 px needs the 1600w file
+    ('300px', 1366, 1.0, 'me-400w.jpg'),                           # smallest candidate covering 300 px
+    ('300px', 1366, 2.0, 'me-800w.jpg'),                           # ... or 600 device pixels
+    ('(max-width: 600px) 100vw, 25vw', 1366, 1.0, 'me-400w.jpg'),  # 341.5 px on a laptop
+    ('(max-width: 600px) 100vw, 25vw', 375, 1.0, 'me-400w.jpg'),   # 375 px on a phone
+    ('100px', 1366, 3.0, 'me-400w.jpg'),
+    ('10px', 1366, 1.0, 'me-200w.jpg')
+])
+def test_srcset_choice_width_descriptors(sizes, viewport, ratio, expected):
+    assert srcset_choice(SRCSET, sizes, viewport, ratio) == expected
+
+
+def test_srcset_choice_density_descriptors():
+    assert srcset_choice('a.jpg, b.jpg 2x, c.jpg 3x', '', 1366, 1.0) == 'a.jpg'
+    assert srcset_choice('a.jpg, b.jpg 2x', '', 1366, 2.0) == 'b.jpg'
+    assert srcset_choice('a.jpg, b.jpg 2x', '', 1366, 4.0) == 'b.jpg'   # nothing covers: the largest
+    assert srcset_choice('a.jpg 10q', '', 1366, 1.0) is None
+    assert _slot_width('(min-width: 800px) 50vw, 300px', 1000) == 500
+
+
+def write(root, rel: str, data: bytes) -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def audit(tmp_path, **settings) -> dict:
+    manifest = [{'section': 'S1', 'slug': 'amy', 'entry_page_file': 'index.html', 'display_name_short': 'Amy A'},
+                {'section': 'S1', 'slug': 'ben', 'entry_page_file': 'index.html', 'display_name_short': 'Ben B'},
+                {'section': 'S2', 'slug': 'cal', 'errors': ['download failed']}]
+    auditor = PageWeightAuditor({'workers': 1, **settings}, 'https://example.github.io/about-me',
+                                tmp_path / 'reports', logging.getLogger('test'))
+    return auditor.audit(tmp_path / 'site', manifest)
+
+
+@pytest.fixture
+def site(tmp_path):
+    site = tmp_path / 'site'
+    page = ('<head><link rel="stylesheet" href="style.css"><script src="app.js"></script>'
+            '<script src="late.js" defer></script></head>'
+            f'<body><img src="me.jpg" srcset="{SRCSET}" sizes="300px"><img src="missing.png"></body>')
+    write(site, 'S1/amy/index.html', page.encode())
+    write(site, 'S1/amy/style.css', b'@import "theme.css"; body { background: url(bg.png) }')
+    write(site, 'S1/amy/theme.css', b'h1 { font-family: x; src: url(font.woff2) }')
+    write(site, 'S1/amy/font.woff2', b'F' * 3000)
+    write(site, 'S1/amy/bg.png', b'P' * 5000)
+    write(site, 'S1/amy/app.js', b'console.log(1)')
+    write(site, 'S1/amy/late.js', b'console.log(2)')
+    for name, size in (('me-200w.jpg', 200), ('me-400w.jpg', 400), ('me-800w.jpg', 800), ('me.jpg', 1600)):
+        write(site, f'S1/amy/{name}', b'J' * size * 10)
+    write(site, 'S1/ben/index.html', b'<p>Hi</p>')
+    return site
+
+
+def test_page_loads_are_weighed(tmp_path, site):
+    report = audit(tmp_path)
+    assert report['pages'] == 2 and report['over_budget'] == 0
+    amy = next(result for result in report['students'] if result['slug'] == 'amy')
+    assert amy['requests'] == 8   # page, 2 stylesheets, font, background, 2 scripts, one srcset candidate
+    assert [asset['path'] for asset in amy['largest_assets'][:2]] == ['S1/amy/bg.png', 'S1/amy/me-400w.jpg']
+    assert amy['by_type']['image'] == 5000 + 4000
+    assert amy['by_type']['font'] == 3000
+    assert amy['by_type']['html'] == len(gzip.compress((site / 'S1/amy/index.html').read_bytes(), mtime=0))
+    assert amy['render_blocking'] == ['style.css', 'app.js']
+    assert report['students'][0]['slug'] == 'amy'   # heaviest first
+    assert report['sections']['S1']['pages'] == 2
+    assert json.loads((tmp_path / 'reports' / 'page_weight.json').read_text()) == report
+
+
+def test_budgets_are_enforced(tmp_path, site):
+    write(site, 'S1/ben/index.html', b'<img src="data:image/png;base64,' + b'A' * 2000 + b'">')
+    report = audit(tmp_path, max_page_bytes=10_000, max_asset_bytes=4_500, max_inline_bytes=1_000,
+                   max_render_blocking=1)
+    violations = {result['slug']: result['violations'] for result in report['students']}
+    page_weight, *others = violations['amy']
+    assert page_weight.startswith('page weight ') and page_weight.endswith(' over 10,000 B')
+    assert others == ['1 assets over 4,500 B', '2 render-blocking resources']
+    assert violations['ben'] == ['1 inline data: URIs over 1,000 B']
+    assert report['over_budget'] == 2
+    assert report['budgets']['max_render_blocking'] == 1
+
+
+def test_fail_on_budget_stops_the_build(fake_project):
+    fake_project.configure(page_weight={'max_page_bytes': 1000, 'fail_on_budget': True})
+    fake_project.run('download')
+    with pytest.raises(RuntimeError, match='over the page-weight budget'):
+        fake_project.run('build')
+    report = json.loads((fake_project.root / 'reports' / 'page_weight.json').read_text())
+    assert report['over_budget'] == report['pages'] == 8
@@ -0,0 +1,114 @@
+"""GitPagesPublisher against a local bare repository standing in for GitHub"""
+
+import logging
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from pages_publisher import GitPagesPublisher
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+EPOCH = 1_700_000_000
+
+
+def git(repo, *args: str) -> bytes:
+    return subprocess.run(['git', '--git-dir', str(repo), *args], capture_output=True, check=True).stdout
+
+
+def rev(repo, revision: str) -> str:
+    return git(repo, 'rev-parse', revision).decode().strip()
+
+
+def published(remote, branch: str = 'gh-pages') -> dict:
+    """Every file on the remote branch and its content"""
+    names = git(remote, 'ls-tree', '-r', '-z', '--name-only', branch).decode().split('\0')[:-1]
+    return {name: git(remote, 'show', f"{branch}:{name}") for name in names}
+
+
+def write_site(site, files: dict) -> None:
+    """Write files as a reproducible build would, all with the same mtime"""
+    for rel, text in files.items():
+        path = site / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        os.utime(path, (EPOCH, EPOCH))
+
+
+@pytest.fixture
+def remote(tmp_path):
+    path = tmp_path / 'remote.git'
+    subprocess.run(['git', 'init', '--bare', '-q', str(path)], check=True)
+    return path
+
+
+def publisher_for(tmp_path, remote, name: str = 'pages.git') -> GitPagesPublisher:
+    return GitPagesPublisher(tmp_path / 'cache' / name, str(remote), 'gh-pages', logging.getLogger('test'))
+
+
+def test_publishes_incrementally_on_top_of_the_branch(tmp_path, remote, caplog):
+    site = tmp_path / 'site'
+    write_site(site, {'index.html': 'home', 'S1/amy/index.html': 'amy', 'S1/amy/me.jpg': 'jpeg'})
+    publisher = publisher_for(tmp_path, remote)
+    
+    first = publisher.publish(site, 'first')
+    assert published(remote) == {'.nojekyll': b'', 'index.html': b'home',
+                                 'S1/amy/index.html': b'amy', 'S1/amy/me.jpg': b'jpeg'}
+    
+    # Nothing changed: no commit, and nothing hashed again
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        assert publisher.publish(site, 'again') is None
+    assert '0 hashed, 3 reused' in caplog.text
+    
+    write_site(site, {'S1/amy/index.html': 'Amy!'})
+    second = publisher.publish(site, 'second')
+    assert rev(remote, 'gh-pages') == second
+    assert rev(remote, 'gh-pages^') == first
+    assert published(remote)['S1/amy/index.html'] == b'Amy!'
+
+
+def test_same_size_same_mtime_rewrite_is_published(tmp_path, remote):
+    site = tmp_path / 'site'
+    write_site(site, {'index.html': 'version one'})
+    publisher = publisher_for(tmp_path, remote)
+    publisher.publish(site, 'first')
+    
+    # Rewritten in place: same size, same (build-epoch) mtime, same inode
+    inode = (site / 'index.html').stat().st_ino
+    write_site(site, {'index.html': 'version two'})
+    assert (site / 'index.html').stat().st_ino == inode
+    
+    assert publisher.publish(site, 'second')
+    assert published(remote)['index.html'] == b'version two'
+
+
+def test_publishers_on_two_machines_build_on_each_other(tmp_path, remote):
+    site = tmp_path / 'site'
+    write_site(site, {'index.html': 'home'})
+    laptop = publisher_for(tmp_path, remote)
+    laptop.publish(site, 'first')
+    
+    # Another machine (no local repo yet) publishes on top of the existing branch
+    write_site(site, {'index.html': 'desktop'})
+    other = publisher_for(tmp_path, remote, 'desktop.git').publish(site, 'second')
+    
+    # The laptop fetches the new tip before committing, so its push is a fast-forward
+    write_site(site, {'index.html': 'laptop'})
+    third = laptop.publish(site, 'third')
+    assert rev(remote, f"{third}^") == other
+    assert git(remote, 'rev-list', '--count', 'gh-pages') == b'3\n'
+    assert published(remote)['index.html'] == b'laptop'
+
+
+def test_publish_command_pushes_the_built_site(fake_project, remote):
+    fake_project.configure(publisher={'remote': str(remote)})
+    fake_project.run('download')
+    fake_project.run('build')
+    fake_project.run('publish')
+    
+    site = fake_project.root / 'site'
+    site_files = {path.relative_to(site).as_posix(): path.read_bytes() for path in site.rglob('*') if path.is_file()}
+    assert published(remote) == {'.nojekyll': b'', **site_files}
@@ -0,0 +1,110 @@
+"""RateLimiter: burst window, daily quota, shared state file; AsyncRateLimiter off the event loop"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import codio_downloader_images
+from codio_downloader_images import AsyncRateLimiter, RateLimiter
+
+DAY = 86400
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable time.time() for the limiter"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(codio_downloader_images.time, 'time', lambda: now[0])
+    return now
+
+
+def test_daily_limit_defers_to_the_next_day(clock):
+    limiter = RateLimiter(burst_limit=1000, window=10, daily_limit=3)
+    delays = [limiter.reserve() for _ in range(7)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3:6] == [pytest.approx(DAY)] * 3
+    assert delays[6] == pytest.approx(2 * DAY)
+
+
+def test_daily_limit_stays_in_force_after_the_reset(clock):
+    limiter = RateLimiter(burst_limit=1000, window=10, daily_limit=3)
+    for _ in range(5):
+        limiter.reserve()  # 3 today, 2 already booked into tomorrow
+    
+    clock[0] += DAY
+    assert limiter.daily_count == 5
+    assert limiter.reserve() == 0.0            # tomorrow's third slot
+    assert limiter.daily_count == 3
+    assert limiter.reserve() == pytest.approx(DAY)
+    
+    # A quiet stretch of several days clears the count entirely
+    clock[0] += 5 * DAY
+    assert limiter.reserve() == 0.0
+    assert limiter.daily_count == 1
+
+
+def test_burst_window_spaces_requests(clock):
+    limiter = RateLimiter(burst_limit=2, window=10, daily_limit=1000)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(10.1)
+
+
+def test_async_limiter_keeps_the_event_loop_free(tmp_path):
+    limiter = RateLimiter(burst_limit=1000, window=10, daily_limit=1000, state_path=tmp_path / 'rate_limit.json')
+    async_limiter = AsyncRateLimiter(limiter)
+    locked, release = threading.Event(), threading.Event()
+    
+    def hold_budget():
+        """Another thread (or process) in the middle of a slow reservation"""
+        with limiter._lock:
+            locked.set()
+            release.wait(5)
+    
+    async def main():
+        ticks = 0
+        waiter = asyncio.ensure_future(async_limiter.wait_if_needed())
+        blocker = asyncio.ensure_future(async_limiter.block_for(0.01))
+        deadline = time.monotonic() + 0.2
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not waiter.done() and not blocker.done()
+        release.set()
+        await asyncio.wait_for(asyncio.gather(waiter, blocker), 5)
+        return ticks
+    
+    holder = threading.Thread(target=hold_budget)
+    holder.start()
+    locked.wait(5)
+    try:
+        assert asyncio.run(main()) >= 10
+    finally:
+        release.set()
+        holder.join()
+    assert limiter.daily_count == 1
+    assert limiter.blocked_until > 0
+
+
+def test_state_file_shares_the_daily_budget(clock, tmp_path):
+    state_path = tmp_path / 'rate_limit.json'
+    first = RateLimiter(burst_limit=1000, window=10, daily_limit=2, state_path=state_path)
+    second = RateLimiter(burst_limit=1000, window=10, daily_limit=2, state_path=state_path)
+    assert first.reserve() == 0.0
+    assert second.reserve() == 0.0
+    assert first.reserve() == pytest.approx(DAY)
+
+
+def test_concurrent_reservations_are_all_counted(tmp_path):
+    limiter = RateLimiter(burst_limit=10 ** 6, window=10, daily_limit=10 ** 6, state_path=tmp_path / 'rate_limit.json')
+    threads = [threading.Thread(target=lambda: [limiter.reserve() for _ in range(25)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    reloaded = RateLimiter(burst_limit=10 ** 6, window=10, daily_limit=10 ** 6, state_path=tmp_path / 'rate_limit.json')
+    reloaded.reserve()
+    assert reloaded.daily_count == 8 * 25 + 1
@@ -0,0 +1,46 @@
+"""Reproducible builds: the same projects give a byte-identical site/, store objects untouched"""
+
+import os
+import re
+from pathlib import Path
+
+from asset_store import OBJECT_MTIME
+
+
+def snapshot(site_dir: Path) -> dict:
+    """Every file's bytes and mtime, keyed by its path in site/"""
+    return {
+        path.relative_to(site_dir).as_posix(): (path.read_bytes(), path.stat().st_mtime)
+        for path in sorted(site_dir.rglob('*')) if path.is_file()
+    }
+
+
+def test_rebuild_from_a_fresh_download_is_identical(fake_project):
+    fake_project.configure(reproducible_build=True)
+    fake_project.run('download')
+    fake_project.run('build')
+    first = snapshot(fake_project.root / 'site')
+    
+    # A full download wipes build/ and extracts every archive again
+    fake_project.run('download')
+    fake_project.run('build')
+    second = snapshot(fake_project.root / 'site')
+    
+    assert first.keys() == second.keys()
+    assert first == second
+    index = (fake_project.root / 'site' / 'index.html').read_text()
+    assert re.search(r'[A-Z][a-z]+ \d\d, \d{4}', index)
+
+
+def test_build_leaves_store_objects_alone(fake_project):
+    fake_project.configure(reproducible_build=True, dedup_assets=True)
+    fake_project.run('download')
+    fake_project.run('build')
+    
+    objects = [path for path in (fake_project.root / 'cache' / 'objects').rglob('*') if path.is_file()]
+    assert objects
+    assert {path.stat().st_mtime for path in objects} == {OBJECT_MTIME}
+    
+    # Files shared with the store keep its mtime; everything else gets the build date
+    mtimes = {os.stat(path).st_mtime for path in (fake_project.root / 'site').rglob('*.html')}
+    assert len(mtimes - {OBJECT_MTIME}) == 1
@@ -0,0 +1,101 @@
+"""RunFilter: --section, --student and --only-failed, resolved against the state store"""
+
+import json
+import logging
+
+import pytest
+
+from publish_about_me import RunFilter
+from state_store import StateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(tmp_path / 'about_me.db', logging.getLogger('test'))
+    run_id = store.start_run('download')
+    for section, slug, codio_id, failed in [('7A', 'amy', 'a1', False), ('7A', 'ben', 'b2', True),
+                                            ('7B', 'cal', 'c3', True), ('7B', 'dan', 'd4', False)]:
+        record = {'section': section, 'slug': slug, 'codio_id': codio_id, 'entry_page_file': 'index.html'}
+        if failed:
+            record['errors'] = ['download failed']
+        store.save_student(record, run_id)
+    yield store
+    store.close()
+
+
+def test_sections_and_students(store):
+    run_filter = RunFilter(sections=['7A'], students=['amy', 'd4'])
+    run_filter.bind(store)
+    assert str(run_filter) == 'section 7A; student amy, d4'
+    assert run_filter.located == {'7A', '7B'}
+    assert run_filter.wants_section('7A') and not run_filter.wants_section('7B')
+    assert run_filter.matches('7A', 'amy', 'a1')
+    assert not run_filter.matches('7A', 'ben', 'b2')
+    assert store.roster(**run_filter.query()) == ['7A/amy']
+
+
+def test_named_students_limit_the_sections_fetched(store):
+    run_filter = RunFilter(students=['cal'])
+    run_filter.bind(store)
+    assert not run_filter.wants_section('7A') and run_filter.wants_section('7B')
+    
+    # A student the store has never seen could be in any section
+    unknown = RunFilter(students=['cal', 'new-kid'])
+    unknown.bind(store)
+    assert unknown.located is None and unknown.wants_section('7A')
+
+
+def test_only_failed_and_recovered(store):
+    run_filter = RunFilter(only_failed=True)
+    run_filter.bind(store)
+    assert run_filter.failed == {'7A/b2', '7B/c3'}
+    assert store.roster(**run_filter.query()) == ['7A/ben', '7B/cal']
+    assert run_filter.matches_entry({'section': '7B', 'slug': 'cal', 'codio_id': 'c3'})
+    
+    # Ben is fixed by a targeted download; a later build still includes him
+    store.save_student({'section': '7A', 'slug': 'ben', 'codio_id': 'b2', 'entry_page_file': 'index.html'},
+                       store.start_run('download'))
+    later = RunFilter(only_failed=True)
+    later.bind(store, recovered=True)
+    assert later.failed == {'7A/b2', '7B/c3'}
+    assert str(later) == 'failed students'
+    
+    # Binding is resolved once, so every stage of `all` sees the same students
+    run_filter.bind(store, recovered=True)
+    assert run_filter.failed == {'7A/b2', '7B/c3'}
+
+
+def test_targeted_run_merges_into_the_site(fake_project):
+    fake_project.run('download')
+    fake_project.run('build')
+    site = fake_project.root / 'site'
+    manifest = json.loads((fake_project.root / 'build' / 'manifest.json').read_text())
+    target = manifest[0]
+    # Every other student's published files are carried over untouched
+    others = {path: path.stat().st_ino for path in site.glob('S*/*/**/*')
+              if path.is_file() and path.parent.relative_to(site).parts[:2] != (target['section'], target['slug'])}
+    assert others
+    before = fake_project.stats()
+    
+    fake_project.run('--student', target['slug'], 'download')
+    fake_project.run('--student', target['slug'], 'build')
+    after = fake_project.stats()
+    
+    export = '/courses/:id/assignments/:id/students/:id/download'
+    assert after['by_endpoint'][export] - before['by_endpoint'][export] == 1
+    assert (site / target['section'] / target['slug'] / 'index.html').is_file()
+    assert {path: path.stat().st_ino for path in others} == others
+    assert len(json.loads((fake_project.root / 'build' / 'manifest.json').read_text())) == 8
+
+
+def test_targeted_bulk_run_exports_students_individually(fake_project):
+    fake_project.configure(download_mode='bulk')
+    fake_project.run('download')
+    before = fake_project.stats()
+    fake_project.run('--section', 'S1', 'download')
+    after = fake_project.stats()
+    
+    student_exports = '/courses/:id/assignments/:id/students/:id/download'
+    assert after['by_endpoint'][student_exports] - before['by_endpoint'].get(student_exports, 0) == 2
+    assert after['by_endpoint']['/courses/:id/assignments/:id/download'] == 4
+    assert len(json.loads((fake_project.root / 'build' / 'manifest.json').read_text())) == 8
@@ -0,0 +1,86 @@
+"""SiteCrawler: case-sensitive resolution of every local reference, and targeted crawls"""
+
+import json
+import logging
+
+from site_crawler import SiteCrawler, css_references, resolve_reference
+
+
+def write(root, rel: str, text: str = '') -> None:
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def crawl(tmp_path, only=None) -> dict:
+    crawler = SiteCrawler(tmp_path / 'site', tmp_path / 'reports', 'https://example.github.io/about-me',
+                          logging.getLogger('test'), max_workers=1)
+    return crawler.crawl(only)
+
+
+def test_resolve_reference():
+    assert resolve_reference('S1/amy/index.html', 'images/me.jpg?v=2#top', '') == 'S1/amy/images/me.jpg'
+    assert resolve_reference('S1/amy/index.html', 'my%20photo.jpg', '') == 'S1/amy/my photo.jpg'
+    assert resolve_reference('S1/amy/index.html', 'https://example.com/x.png', '') is None
+    assert resolve_reference('S1/amy/index.html', '#bio', '') is None
+    assert resolve_reference('S1/amy/index.html', '../../../etc/passwd', '') == ''
+    assert resolve_reference('S1/amy/index.html', '/about-me/S1/amy/', '/about-me') == 'S1/amy/index.html'
+    assert resolve_reference('S1/amy/index.html', '/S1/amy/', '/about-me') == ''
+
+
+def test_css_references_skip_comments():
+    css = '/* url(old.png)\n */ body { background: url("bg.png") }\n@import \'theme.css\';'
+    assert css_references(css) == [(2, 'bg.png'), (3, 'theme.css')]
+
+
+def test_case_mismatches_and_missing_files(tmp_path):
+    site = tmp_path / 'site'
+    write(site, 'index.html', '<a href="S1/amy/">Amy</a>')
+    write(site, 'S1/amy/index.html',
+          '<link rel="stylesheet" href="style.css">\n'
+          '<img src="Photo.jpg" srcset="photo.jpg 1x, gone-2x.jpg 2x">\n'
+          '<a href="../../../outside.html">x</a>')
+    write(site, 'S1/amy/style.css', 'h1 { background: url(images/BG.PNG) }')
+    write(site, 'S1/amy/photo.jpg')
+    write(site, 'S1/amy/images/bg.png')
+    write(site, 'S2/ben/index.html', '<img src="me.jpg">')
+    write(site, 'S2/ben/me.jpg')
+    
+    report = crawl(tmp_path)
+    problems = {(item['page'], item['reference']): item['reason'] for item in report['students']['S1/amy']}
+    assert problems == {
+        ('S1/amy/index.html', 'Photo.jpg'): 'case mismatch (file is S1/amy/photo.jpg)',
+        ('S1/amy/index.html', 'gone-2x.jpg'): 'missing file',
+        ('S1/amy/index.html', '../../../outside.html'): 'points outside the site',
+        ('S1/amy/style.css', 'images/BG.PNG'): 'case mismatch (file is S1/amy/images/bg.png)'
+    }
+    assert list(report['students']) == ['S1/amy']
+    assert (report['pages'], report['broken_references']) == (4, 4)
+    assert json.loads((tmp_path / 'reports' / 'broken_references.json').read_text()) == report
+    assert 'S1/amy/index.html:2  Photo.jpg' in (tmp_path / 'reports' / 'broken_references.txt').read_text()
+
+
+def test_targeted_crawl_merges_into_the_last_report(tmp_path):
+    site = tmp_path / 'site'
+    for student in ('S1/amy', 'S2/ben', 'S2/cal'):
+        write(site, f'{student}/index.html', '<img src="missing.jpg">')
+    crawl(tmp_path)
+    
+    # Amy fixes her page and Cal leaves; Ben is not checked again
+    write(site, 'S1/amy/missing.jpg')
+    (site / 'S2' / 'cal' / 'index.html').unlink()
+    report = crawl(tmp_path, only={'S1/amy'})
+    assert report['pages'] == 1
+    assert list(report['students']) == ['S2/ben']
+
+
+def test_validate_offline_honours_the_run_filter(fake_project):
+    fake_project.run('download')
+    fake_project.run('build')
+    site = fake_project.root / 'site'
+    for student_dir in sorted(site.glob('S*/*/')):
+        (student_dir / 'index.html').write_text('<img src="nowhere.png">')
+    
+    fake_project.run('--section', 'S1', '--offline', 'validate')
+    report = json.loads((fake_project.root / 'reports' / 'broken_references.json').read_text())
+    assert sorted(report['students']) == sorted(f"S1/{path.name}" for path in site.glob('S1/*/'))
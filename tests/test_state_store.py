@@ -0,0 +1,97 @@
+"""StateStore: streamed paging, filters in SQL, failure recovery and the manifest export"""
+
+import json
+import logging
+
+import pytest
+
+import state_store
+from state_store import StateStore
+
+
+def entry(section: str, slug: str, codio_id: str, failed: bool = False) -> dict:
+    record = {'section': section, 'slug': slug, 'codio_id': codio_id, 'display_name_short': slug.title(),
+              'entry_page_file': 'index.html'}
+    if failed:
+        record['errors'] = ['export timed out']
+    else:
+        record['inventory'] = [{'path': 'index.html', 'size': len(slug), 'mtime_ns': 1, 'type': 'file',
+                                'sha256': f"hash-{slug}"}]
+    return record
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(tmp_path / 'state' / 'about_me.db', logging.getLogger('test'))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def roster(store):
+    run_id = store.start_run('download')
+    for index, slug in enumerate(['hal', 'amy', 'gus', 'ben', 'fay', 'cal', 'eve', 'dan']):
+        store.save_student(entry(f"S{index % 2 + 1}", slug, f"id{index}", failed=slug in ('cal', 'eve')), run_id)
+    store.finish_run(run_id, students=8)
+    return run_id
+
+
+def test_students_are_streamed_in_pages(store, roster, monkeypatch):
+    monkeypatch.setattr(state_store, 'PAGE_SIZE', 3)
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    
+    students = list(store.students())
+    assert [(s['section'], s['slug']) for s in students] == [
+        ('S1', 'eve'), ('S1', 'fay'), ('S1', 'gus'), ('S1', 'hal'),
+        ('S2', 'amy'), ('S2', 'ben'), ('S2', 'cal'), ('S2', 'dan')
+    ]
+    # Failed students carry their errors and no inventory
+    assert 'inventory' not in students[0] and students[0]['errors']
+    assert students[1]['inventory'][0]['sha256'] == 'hash-fay'
+    # Three pages of students, each with one query for its inventories
+    assert sum(s.startswith('SELECT * FROM students') for s in statements) == 3
+    assert sum(s.startswith('SELECT student_key') for s in statements) == 3
+    
+    assert all('inventory' not in s for s in store.students(inventory=False))
+
+
+def test_filters_run_in_sql(store, roster):
+    assert [s['slug'] for s in store.students(sections=['S2'], status='ok')] == ['amy', 'ben', 'dan']
+    assert [s['slug'] for s in store.students(names=['gus', 'id1'])] == ['gus', 'amy']
+    assert [s['slug'] for s in store.students(keys=['S2/id5', 'S1/id6'], inventory=False)] == ['eve', 'cal']
+    assert list(store.students(sections=[])) == []
+    assert store.roster() == ['S1/eve', 'S1/fay', 'S1/gus', 'S1/hal', 'S2/amy', 'S2/ben', 'S2/cal', 'S2/dan']
+    assert store.roster(sections=['S1'], names=['fay', 'amy']) == ['S1/fay']
+    assert store.locate('dan') == ['S2/id7']
+    assert store.student_count() == 8 and store.student_count('failed') == 2
+
+
+def test_recovered_students(store, roster):
+    # Cal is fixed by a later targeted run; Eve fails again; Amy fails for the first time
+    run_id = store.start_run('download', filter='failed students')
+    store.save_student(entry('S2', 'cal', 'id5'), run_id)
+    store.save_student(entry('S1', 'eve', 'id6', failed=True), run_id)
+    store.save_student(entry('S2', 'amy', 'id1', failed=True), run_id)
+    
+    assert store.recovered() == ['S2/id5']
+    assert [s['slug'] for s in store.students(status='failed', inventory=False)] == ['eve', 'amy']
+    assert store.student('S2/id5')['inventory'][0]['sha256'] == 'hash-cal'
+    
+    # Pruning against a run drops every student it did not see
+    assert store.prune_students(run_id) == 5
+    assert store.find('S1', 'hal') is None
+
+
+def test_manifest_export_round_trip(store, roster, tmp_path):
+    path = tmp_path / 'manifest.json'
+    assert store.export_manifest(path) == 8
+    manifest = json.loads(path.read_text())
+    assert manifest == list(store.students())
+    
+    fresh = StateStore(tmp_path / 'fresh.db', logging.getLogger('test'))
+    fresh.import_manifest(manifest)
+    assert list(fresh.students()) == manifest
+    assert fresh.last_run('download') is None
+    assert store.last_run('download')['details'] == {'students': 8}
+    fresh.close()